@@ -0,0 +1,142 @@
+"""
+Adjournment analytics over the full hearing history.
+
+Hearings are stored grouped by case, oldest first (preprocessing.clean_hearings),
+so the next hearing of row i is row i + 1 when both belong to the same case. A
+hearing counts as adjourned when its case was heard again; its gap is the
+number of days to that next hearing (from businessondate). Gaps, per-case
+counts and per-group rates all come from one pass of array arithmetic over the
+rows, and the group tables are cached per dataset version. By judge, a hearing
+counts once for each judge on its bench (benches.bench_pairs), as in the
+workload tables, so division benches count for every judge on them.
+"""
+import numpy as np
+import pandas as pd
+
+from benches import BENCH_COLUMNS, bench_table
+from caches import cached
+from preprocessing import hearing_offsets
+from profiling import timed
+
+# -------------------------------
+# Groupings for adjournment rates
+# -------------------------------
+# Label -> hearing columns; a hearing counts once under each advocate column, and
+# once for each judge named in its bench columns
+DIMENSIONS = {
+    "Judge": BENCH_COLUMNS,
+    "Purpose of Hearing": ("purposeofhearing",),
+    "Court Hall": ("courthallnumber",),
+    "Advocate": ("petitioneradvocate", "respondentadvocate"),
+}
+
+# Groups with fewer hearings are left out of rankings by rate
+MIN_HEARINGS = 20
+
+
+# -------------------------------
+# Per hearing and per case
+# -------------------------------
+def next_hearing_gaps(hearings):
+    """(adjourned, gap_days) arrays aligned with `hearings`; gaps are NaN without a next dated hearing."""
+    cnr = hearings["cnr_number"].to_numpy()
+    adjourned = np.zeros(len(cnr), dtype=bool)
+    adjourned[:-1] = cnr[1:] == cnr[:-1]
+    if "business_on_date" not in hearings.columns:
+        return adjourned, np.full(len(cnr), np.nan)
+    dates = hearings["business_on_date"]
+    gaps = (dates.shift(-1) - dates).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    return adjourned, np.where(adjourned, gaps, np.nan)
+
+
+@timed("adjournments.case_adjournments")
+def case_adjournments(hearings):
+    """One row per case: cnr_number, adjournments (hearings after the first) and longest_gap_days."""
+    cnr, offsets = hearing_offsets(hearings["cnr_number"].to_numpy())
+    _, gaps = next_hearing_gaps(hearings)
+    # fmax skips NaN; a case with a single hearing has no gap
+    longest = np.fmax.reduceat(gaps, offsets[:-1]) if len(gaps) else np.empty(0)
+    return pd.DataFrame({
+        "cnr_number": cnr,
+        "adjournments": np.diff(offsets) - 1,
+        "longest_gap_days": longest,
+    })
+
+
+# -------------------------------
+# Rates by group
+# -------------------------------
+def rate_frame(values, hearings, adjourned, gap_sum, gap_count, longest):
+    """The table both query backends return: one row per group, most adjourned hearings first."""
+    hearings = np.asarray(hearings, dtype=np.int64)
+    adjourned = np.asarray(adjourned, dtype=np.int64)
+    gap_count = np.asarray(gap_count, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_gap = np.where(gap_count > 0, np.asarray(gap_sum, dtype=float) / gap_count, np.nan)
+    frame = pd.DataFrame({
+        "value": pd.Series(values).astype(str).to_numpy(),
+        "hearings": hearings,
+        "adjourned": adjourned,
+        "adjournment_rate": adjourned / hearings,
+        "mean_gap_days": mean_gap,
+        "longest_gap_days": np.asarray(longest, dtype=float),
+        "dated_gaps": gap_count.astype(np.int64),
+    })
+    return frame.sort_values(["adjourned", "value"], ascending=[False, True], ignore_index=True)
+
+
+def rate_table(values, adjourned, gaps):
+    """rate_frame() for the distinct non-missing `values`, counted with bincounts."""
+    codes, uniques = pd.factorize(pd.Series(values), sort=True)
+    keep = codes >= 0
+    codes, adjourned, gaps = codes[keep], adjourned[keep], gaps[keep]
+    n = len(uniques)
+    dated = ~np.isnan(gaps)
+    longest = np.full(n, np.nan)
+    np.fmax.at(longest, codes[dated], gaps[dated])
+    return rate_frame(
+        uniques,
+        np.bincount(codes, minlength=n),
+        np.bincount(codes, weights=adjourned, minlength=n),
+        np.bincount(codes[dated], weights=gaps[dated], minlength=n),
+        np.bincount(codes[dated], minlength=n),
+        longest,
+    )
+
+
+@timed("adjournments.adjournment_rates")
+@cached("aggregate", max_entries=64, copy=True)
+def adjournment_rates(_hearings, dimension, dataset_version, selection=None):
+    """
+    rate_table() for one DIMENSIONS entry of `_hearings`, or None without its columns.
+
+    Cached on (dimension, dataset version, partition selection), the selection
+    `_hearings` was read with.
+    """
+    columns = [c for c in DIMENSIONS[dimension] if c in _hearings.columns]
+    if not columns:
+        return None
+    adjourned, gaps = next_hearing_gaps(_hearings)
+    if dimension == "Judge":
+        pairs = bench_table(_hearings, dataset_version, selection)
+        rows = pairs["rows"]
+        return rate_table(pairs["names"][pairs["judges"]], adjourned[rows], gaps[rows])
+    values = np.concatenate([_hearings[c].to_numpy(dtype=object) for c in columns])
+    repeat = len(columns)
+    return rate_table(values, np.tile(adjourned, repeat), np.tile(gaps, repeat))
+
+
+def combined_rate(rates, values):
+    """One rate_frame() row summing the rows of `values` (the spellings of one name), or None if none is listed."""
+    rows = rates[rates["value"].isin(values)]
+    if rows.empty:
+        return None
+    hearings, adjourned, dated = rows["hearings"].sum(), rows["adjourned"].sum(), rows["dated_gaps"].sum()
+    return pd.Series({
+        "hearings": hearings,
+        "adjourned": adjourned,
+        "adjournment_rate": adjourned / hearings,
+        "mean_gap_days": (rows["mean_gap_days"].fillna(0) * rows["dated_gaps"]).sum() / dated if dated else np.nan,
+        "longest_gap_days": rows["longest_gap_days"].max(),
+        "dated_gaps": dated,
+    })
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from preprocessing import prepared_data
+from profiling import timed
+
+DEFAULT_CONTAMINATION = 0.05
+
+
+# ------------------------------------------------------
+# MODEL INPUT
+# ------------------------------------------------------
+# Derived from the dates like Case_Duration, or from the hearings (see
+# adjournments.py), so shown but not used as features
+DERIVED_COLUMNS = ("disposal_days", "filing_year", "adjournments", "longest_gap_days")
+
+
+def prepare_cases(cases: pd.DataFrame) -> pd.DataFrame:
+    """
+    Model input from prepared cases (preprocessing.clean_cases): Case_Duration
+    in days and missing numbers filled with their column median. Returns a new
+    frame; `cases` may be a shared read-only one.
+    """
+    cases = cases.copy()
+    if "date_filed" in cases.columns and "decision_date" in cases.columns:
+        cases["Case_Duration"] = (cases["decision_date"] - cases["date_filed"]).dt.days
+    else:
+        cases["Case_Duration"] = np.nan
+
+    numeric_cols = cases.select_dtypes(include=[np.number]).columns
+    for col in numeric_cols:
+        median_val = cases[col].median()
+        cases[col] = cases[col].fillna(0 if np.isnan(median_val) else median_val)
+
+    return cases
+
+
+def feature_columns(cases: pd.DataFrame) -> list:
+    """The model's features: numeric columns of prepare_cases() output except DERIVED_COLUMNS."""
+    return [c for c in cases.select_dtypes(include=[np.number]).columns if c not in DERIVED_COLUMNS]
+
+
+# ------------------------------------------------------
+# ISOLATION FOREST ANOMALY DETECTION
+# ------------------------------------------------------
+@timed("model.isolation_forest")
+def detect_anomalies(cases: pd.DataFrame, contamination=DEFAULT_CONTAMINATION) -> pd.DataFrame:
+    """Run Isolation Forest anomaly detection on feature_columns()."""
+    from sklearn.ensemble import IsolationForest
+
+    numeric_cols = feature_columns(cases)
+    if not numeric_cols:
+        return cases
+
+    iso = IsolationForest(
+        n_estimators=200,
+        contamination=contamination,
+        random_state=42
+    )
+    iso.fit(cases[numeric_cols])
+
+    cases.loc[:, "Anomaly"] = iso.predict(cases[numeric_cols])
+    cases.loc[:, "Anomaly_Flag"] = (cases["Anomaly"] == -1)
+    cases.loc[:, "Anomaly_Score"] = iso.decision_function(cases[numeric_cols])
+
+    return cases
+
+
+@cached("model", max_entries=8, copy=True, spinner="Fitting anomaly model...")
+def anomaly_frame(dataset_version, contamination=DEFAULT_CONTAMINATION):
+    """Scored prepared cases for one contamination rate; fitted once per dataset version."""
+    cases, _, _ = prepared_data(dataset_version)
+    return detect_anomalies(prepare_cases(cases), contamination)
@@ -2,9 +2,11 @@ import os
 import sys
 import io
 import streamlit as st
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
-import base64
-from pathlib import Path
+from preprocessing import dataset_version
+from queries import backend
+from profiling import begin_page
+from warmup import wait_until_ready
+from helpers.assets import LOGO_PATH, home_html
 import warnings
 
 # Suppress all deprecation and cache warnings
@@ -23,16 +25,6 @@ class WarningFilter(io.StringIO):
 # Store original stderr
 _original_stderr = sys.stderr
 
-# -------------------------------------------------
-# LOAD LOGO
-# -------------------------------------------------
-base_dir = Path(__file__).parent
-logo_path = base_dir / "logo.png"
-
-with open(logo_path, "rb") as f:
-    logo_bytes = f.read()
-
-logo_b64 = base64.b64encode(logo_bytes).decode()
 # -------------------------------------------------
 # PAGE CONFIG — FULL WIDTH + SIDEBAR HIDDEN
 # -------------------------------------------------
@@ -40,124 +32,14 @@ st.set_page_config(
     page_title="Nyayadrishti",
     layout="wide",
     initial_sidebar_state="collapsed",
-    page_icon=logo_path
+    page_icon=LOGO_PATH
 )
+begin_page("Home")
 
 # -------------------------------------------------
 # GLOBAL STYLING
 # -------------------------------------------------
-st.markdown(f"""
-<style>
-
-/* Remove default Streamlit top padding */
-header[data-testid="stHeader"] {{
-    background: none !important;
-    height: 0px !important;
-}}
-
-/* Hide Streamlit sidebar COMPLETELY */
-[data-testid="stSidebar"], [data-testid="stSidebarNav"] {{
-    display: none !important;
-}}
- 
-/* Make page background clean */
-.stApp {{
-    background-color: #F8FAFC !important;
-    padding-top: 0 !important;
-}}
-
-/* Top-left logo */
-#top-left-logo {{
-    position: fixed;  /* keep the logo in place while scrolling */
-    top: 20px;
-    left: 22px;
-    width: 72px;
-    z-index: 9999;
-}}
-
-/* Login button style */
-[data-testid="stButton"] button {{
-    background-color: #0F172A !important;
-    color: #F8FAFC !important;         /* text color */
-    border-radius: 8px !important;
-    padding: 8px 18px !important;
-    border: 1px solid #1E293B !important;
-}}
-
-[data-testid="stButton"] button:hover {{
-    background-color: #1B2A41 !important;
-    color: white !important;
-}}
-
-/* Feature Cards */
-.feature-card {{
-    background: #152035;
-    border-radius: 16px;
-    padding: 28px;
-    border: 1px solid #0F172A;
-    height: 200px;
-
-    display: flex;
-    flex-direction: column;
-    justify-content: center;
-    align-items: center;
-
-    color: #F5E6C8 !important;
-    text-align: center;
-    font-family: 'Inter', sans-serif;
-
-    transition: 0.2s;
-}}
-
-.feature-card:hover {{
-    background: #1C2A42;
-    cursor: pointer;
-}}
-
-/* Feature Title */
-.feature-title {{
-    font-size: 22px;
-    font-weight: 700;
-    margin-bottom: 8px;
-    color: #F8FAFC !important;
-}}
-
-/* Feature Description */
-.feature-desc {{
-    font-size: 15px;
-    color: #F1F5F9 !important;
-}}
-
-/* Remove underline from links */
-a {{
-    text-decoration: none !important;
-}}
-
-/* Stats cards */
-.stat-card {{
-    background: white;
-    border-radius: 14px;
-    padding: 22px;
-    border: 1px solid #E2E8F0;
-    text-align:center;
-}}
-
-.stat-title {{
-    color:#64748B;
-    font-size:14px;
-}}
-
-.stat-value {{
-    color:#0F172A;
-    font-size:22px;
-    font-weight:bold;
-}}
-
-</style>
-
-<!-- Top-left logo -->
-<img id="top-left-logo" src="data:image/png;base64,{logo_b64}">
-""", unsafe_allow_html=True)
+st.markdown(home_html(), unsafe_allow_html=True)
 
 # -------------------------------------------------
 # LOGIN BUTTON (top-right)
@@ -200,21 +82,23 @@ st.markdown("<div style='height: 50px;'></div>", unsafe_allow_html=True)
 # -------------------------------------------------
 # LOAD DATA (Statistics)
 # -------------------------------------------------
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
+wait_until_ready()
+db = backend()
+version = dataset_version()
 
-merged = merge_data(cases, hearings)
-
-total_cases = len(cases)
-civil_cases = len(cases)
+stats = db.home_stats(version)
+total_cases = stats["total_cases"]
+civil_cases = total_cases
 criminal_cases = 0
-older_than_1 = len(cases[cases.get("disposal_days", 0) > 365])
+older_than_1 = stats["older_than_1"]
+
+forecast = db.backlog_forecast(version)
+projected_backlog = int(round(forecast["pending_forecast"][:, -1].sum()))
 
 # -------------------------------------------------
 # QUICK STATS
 # -------------------------------------------------
-c1, c2, c3, c4 = st.columns(4)
+c1, c2, c3, c4, c5 = st.columns(5)
 
 with c1:
     st.markdown(f"""
@@ -248,6 +132,14 @@ with c4:
     </div>
     """, unsafe_allow_html=True)
 
+with c5:
+    st.markdown(f"""
+    <div class='stat-card'>
+        <div class='stat-title'>Projected backlog (12 mo)</div>
+        <div class='stat-value'>{projected_backlog:,}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
 st.markdown("<div style='height: 60px;'></div>", unsafe_allow_html=True)
 
 # -------------------------------------------------
@@ -2,30 +2,47 @@
 
 import json
 import hashlib
-from pathlib import Path
 from typing import Dict, Optional
 
-PASSWORD_FILE = Path(__file__).parent / "passwords.json"
+from db import STATE_DIR
+
+PASSWORD_FILE = STATE_DIR / "passwords.json"
 
 def _hash_password(password: str) -> str:
     """Hash a password using SHA-256."""
     return hashlib.sha256(password.encode()).hexdigest()
 
+# In-memory copy of the password hashes, keyed by the file's (mtime, size)
+_password_cache = {"stamp": None, "passwords": {}}
+
+def _file_stamp():
+    try:
+        stat = PASSWORD_FILE.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
 def _load_passwords() -> Dict:
-    """Load passwords from JSON file."""
-    if PASSWORD_FILE.exists():
-        try:
-            with open(PASSWORD_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
+    """Load passwords from JSON file, re-reading it only when it has changed on disk."""
+    stamp = _file_stamp()
+    if stamp is None:
+        return {}
+    if stamp == _password_cache["stamp"]:
+        return _password_cache["passwords"]
+    try:
+        with open(PASSWORD_FILE, 'r') as f:
+            passwords = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    _password_cache["stamp"], _password_cache["passwords"] = stamp, passwords
+    return passwords
 
 def _save_passwords(passwords: Dict) -> None:
     """Save passwords to JSON file."""
     PASSWORD_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(PASSWORD_FILE, 'w') as f:
         json.dump(passwords, f, indent=2)
+    _password_cache["stamp"], _password_cache["passwords"] = _file_stamp(), passwords
 
 def user_exists(name: str) -> bool:
     """Check if a user has set a custom password."""
@@ -36,18 +53,28 @@ def is_first_login(name: str) -> bool:
     """Check if this is a user's first login."""
     return not user_exists(name)
 
-def verify_password(name: str, password: str, merged_df=None) -> bool:
+def account_key(key: str, spellings=()) -> str:
+    """
+    The key an account's password is stored under: the first of `key` (the
+    identity's match key, stable across dataset versions) and `spellings`
+    that already has a password, else `key`. Passwords set before names were
+    resolved are stored under the spelling typed at the time.
+    """
+    passwords = _load_passwords()
+    return next((s.lower() for s in (key, *spellings) if s.lower() in passwords), key.lower())
+
+def verify_password(name: str, password: str, merged_df=None, typed_name: Optional[str] = None) -> bool:
     """
     Verify if password is correct.
-    On first login, accepts default password (first 4 letters + "01").
-    After first login, requires custom password.
+    On first login, accepts default password (first 4 letters of `typed_name`,
+    or of `name`, + "01"). After first login, requires custom password.
     """
     name_lower = name.lower()
     passwords = _load_passwords()
     
     # First login: use default password
     if name_lower not in passwords:
-        default_password = name[:4].upper() + "01"
+        default_password = get_default_password(typed_name or name)
         return password == default_password
     
     # Subsequent logins: use custom password (hashed)
@@ -59,7 +86,7 @@ def set_password(name: str, password: str) -> bool:
     Stores hashed password in JSON file.
     """
     try:
-        passwords = _load_passwords()
+        passwords = dict(_load_passwords())
         passwords[name.lower()] = _hash_password(password)
         _save_passwords(passwords)
         return True
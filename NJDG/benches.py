@@ -0,0 +1,158 @@
+"""
+Hearings exploded into one row per (hearing, judge) with integer judge IDs.
+
+A hearing names its bench in `beforehonourablejudges` ("B.A.PATIL , ANAND
+BYRAREDDY") and again one judge per column in `beforehonourablejudgeone` ..
+`five`, which are not always complete. Each distinct value of those columns is
+split once and its rows are expanded to every judge in it, so a judge on a
+division bench is counted for the bench's hearings. Judge IDs index the sorted
+`names` array. The workload tables per judge, per day and per court hall are
+built with the pairs and cached per dataset version and partition selection.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from profiling import timed
+from user_directory import _PLACEHOLDERS, _SEPARATORS, normalize_name
+
+BENCH_COLUMNS = ("beforehonourablejudges", "beforehonourablejudgeone", "beforehonourablejudgetwo",
+                 "beforehonourablejudgethree", "beforehonourablejudgefour", "beforehonourablejudgefive")
+# Used only by sources without any of the bench columns
+FALLBACK_COLUMN = "njdg_judge_name"
+
+# Workload tables: by -> (table key, hearing column counted per judge, its label)
+WORKLOAD = {
+    "judge": ("per_judge", None, None),
+    "day": ("per_day", "business_on_date", "Date"),
+    "hall": ("per_hall", "courthallnumber", "Court Hall"),
+}
+
+
+def bench_columns(columns):
+    """The bench columns present in `columns`, or the fallback judge column."""
+    present = [c for c in BENCH_COLUMNS if c in columns]
+    return present or [c for c in (FALLBACK_COLUMN,) if c in columns]
+
+
+def bench_names(value):
+    """Normalized judge names of one bench value, placeholders dropped."""
+    names = (n.strip() for n in re.split(_SEPARATORS, normalize_name(value)))
+    return sorted({n for n in names if n not in _PLACEHOLDERS})
+
+
+def _distinct(keys):
+    """(sorted distinct keys, count of each), by sorting: faster than np.unique's hashing here."""
+    keys = np.sort(keys)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+    return keys[starts], np.diff(np.r_[starts, len(keys)])
+
+
+# -------------------------------
+# (hearing, judge) pairs
+# -------------------------------
+@timed("benches.bench_pairs")
+def bench_pairs(frame):
+    """
+    {"names", "rows", "judges", "order", "offsets"} for `frame`, or None
+    without a judge column.
+
+    `rows` (positional, ascending) and `judges` (IDs into `names`) are aligned,
+    one entry per distinct (row, judge). The rows of judge i are
+    rows[order[offsets[i]:offsets[i + 1]]].
+    """
+    columns = bench_columns(frame.columns)
+    if not columns:
+        return None
+    parts, part_names = [], []
+    for col in columns:
+        codes, uniques = pd.factorize(frame[col], use_na_sentinel=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for i, value in enumerate(uniques):
+            for name in bench_names(value):
+                parts.append(order[bounds[i]:bounds[i + 1]])
+                part_names.append(name)
+
+    names = np.array(sorted(set(part_names)), dtype=object)
+    if parts:
+        judges = np.repeat(np.searchsorted(names, part_names), [len(p) for p in parts])
+        # A judge named in several columns of one hearing counts once
+        pairs = _distinct(np.concatenate(parts).astype(np.int64) * len(names) + judges)[0]
+        rows, judges = pairs // len(names), pairs % len(names)
+    else:
+        rows, judges = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    judges = judges.astype(np.int32)
+    order = np.argsort(judges, kind="stable")
+    offsets = np.searchsorted(judges[order], np.arange(len(names) + 1))
+    return {"names": names, "rows": rows, "judges": judges, "order": order, "offsets": offsets}
+
+
+def judge_rows(pairs, name):
+    """Sorted positional rows of one judge (normalized name) in the frame `pairs` was built from."""
+    i = np.searchsorted(pairs["names"], name)
+    if i == len(pairs["names"]) or pairs["names"][i] != name:
+        return np.empty(0, dtype=np.int64)
+    return pairs["rows"][pairs["order"][pairs["offsets"][i]:pairs["offsets"][i + 1]]]
+
+
+# -------------------------------
+# Workload tables
+# -------------------------------
+def _pair_counts(names, judges, values, label):
+    """Hearings per (judge, value), sorted by judge then most hearings; missing values are left out."""
+    codes, uniques = pd.factorize(pd.Series(values), sort=True)
+    keep = codes >= 0
+    width = max(len(uniques), 1)
+    keys, counts = _distinct(judges[keep].astype(np.int64) * width + codes[keep])
+    frame = pd.DataFrame({"Judge": names[keys // width], label: uniques.take(keys % width), "Hearings": counts})
+    return frame.sort_values(["Judge", "Hearings", label], ascending=[True, False, True], ignore_index=True)
+
+
+def workload_tables(hearings, pairs):
+    """{"per_judge", "per_day", "per_hall"} frames counted over the (hearing, judge) pairs."""
+    names, rows, judges = pairs["names"], pairs["rows"], pairs["judges"]
+    n = len(names)
+    per_judge = pd.DataFrame({"Judge": names, "Hearings": np.bincount(judges, minlength=n)})
+    if "cnr_number" in hearings.columns:
+        cnr, uniques = pd.factorize(hearings["cnr_number"].to_numpy()[rows])
+        width = max(len(uniques), 1)
+        cases = _distinct(judges.astype(np.int64) * width + cnr)[0] // width
+        per_judge["Cases"] = np.bincount(cases, minlength=n)
+    per_judge = per_judge[per_judge["Hearings"] > 0].sort_values(
+        ["Hearings", "Judge"], ascending=[False, True], ignore_index=True)
+
+    tables = {"per_judge": per_judge}
+    for key, column, label in WORKLOAD.values():
+        if column is not None:
+            tables[key] = (_pair_counts(names, judges, hearings[column].to_numpy()[rows], label)
+                           if column in hearings.columns else None)
+    return tables
+
+
+@timed("benches.bench_table")
+@cached("index", max_entries=16)
+def bench_table(_hearings, dataset_version, selection=None):
+    """
+    bench_pairs() and workload_tables() of `_hearings`, shared read-only.
+
+    Cached on (dataset version, partition selection), the selection
+    `_hearings` was read with.
+    """
+    pairs = bench_pairs(_hearings)
+    return None if pairs is None else {**pairs, **workload_tables(_hearings, pairs)}
+
+
+def workload(table, by="judge", names=None):
+    """
+    One workload table of bench_table(), optionally only for the judge spelled
+    as `names` (normalized); None when it cannot be built.
+    """
+    if table is None:
+        return None
+    frame = table[WORKLOAD[by][0]]
+    if frame is None or names is None:
+        return frame
+    return frame[frame["Judge"].isin(names)].reset_index(drop=True)
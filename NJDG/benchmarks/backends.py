@@ -0,0 +1,158 @@
+"""
+Dashboard queries on a 10x dataset with the pandas and DuckDB backends.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.backends --scale 10
+
+Builds a partition store holding the sample data plus N - 1 synthetic High
+Courts (see benchmarks/partitions.py). For each backend a fresh process runs
+the queries behind the home page, Analytics (unfiltered and one state), the
+prediction pages and the judge / advocate dashboards, first cold and then again
+after dropping the derived cache layers (caches.py; the pandas frames, indexes
+and the DuckDB connection stay loaded). Reports each query's latency and
+the process's peak RSS. Results are written as JSON under benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.partitions import BASE_DIR, RESULTS_DIR, synthetic_court
+
+BACKENDS = ("pandas", "duckdb")
+JUDGE = "THE REGISTRAR (JUDICIAL)"
+ADVOCATE = "SREENIVASAN M Y"
+
+
+def build_store(scale):
+    """The sample CSVs as the built-in source plus `scale - 1` synthetic courts; returns the dataset version."""
+    import partitions
+    from preprocessing import _read_csvs, clean_source, csv_version, source_version, sync_store
+
+    sync_store(csv_version())
+    base_cases, base_hearings = clean_source(*_read_csvs(csv_version()))
+    for k in range(1, scale):
+        cases, hearings = synthetic_court(base_cases, base_hearings, k)
+        partitions.ingest(f"court{k:02d}", cases, hearings, fingerprint=str(k))
+    return source_version()
+
+
+def _queries(db, version):
+    from views import DASHBOARD_COLUMNS
+
+    state = ("High Court 01",)
+
+    def years():
+        return tuple(db.filing_years(version))
+
+    def year_keys():
+        # Partition values are strings, as the Analytics filter passes them
+        return tuple(str(int(y)) for y in years())
+
+    return {
+        "filing_years": years,
+        "home_stats": lambda: db.home_stats(version),
+        "backlog_forecast": lambda: db.backlog_forecast(version),
+        "case_metrics": lambda: db.case_metrics(version),
+        "case_metrics (one state)": lambda: db.case_metrics(version, state),
+        "stage_counts": lambda: db.stage_counts(version),
+        "judge_workload (one state)": lambda: db.judge_workload(version, state),
+        "judge_workload by day": lambda: db.judge_workload(version, by="day", judge=JUDGE),
+        "disposal_histogram": lambda: db.disposal_histogram(version),
+        "adjournments by judge": lambda: db.adjournment_rates(version, "Judge"),
+        "adjournments (one state)": lambda: db.adjournment_rates(version, "Advocate", state),
+        "survival by year": lambda: db.survival(version, "filing_year", years=year_keys()),
+        "survival by judge": lambda: db.survival(version, "beforehonourablejudges", years=year_keys()),
+        "error_surface": lambda: db.error_surface(version),
+        "prediction_rows": lambda: db.prediction_rows(version),
+        "has_role": lambda: db.has_role(version, JUDGE, "Judge"),
+        "name_candidates": lambda: db.name_candidates(version, "srinivasan m y", "Advocate"),
+        "judge_view": lambda: db.judge_view(version, JUDGE, DASHBOARD_COLUMNS),
+        "advocate_view": lambda: db.advocate_view(version, ADVOCATE),
+    }
+
+
+def run_backend(version):
+    """Runs in the child process: time every query cold, then with the derived caches dropped."""
+    from caches import invalidate
+    from queries import backend
+
+    db = backend()
+    passes = {}
+    for name in ("cold", "recomputed"):
+        if name == "recomputed":
+            invalidate("view", "aggregate", "model")
+        timings = {}
+        for query, func in _queries(db, version).items():
+            start = time.perf_counter()
+            func()
+            timings[query] = (time.perf_counter() - start) * 1000
+        passes[name] = timings
+    return {
+        "backend": db.name,
+        "queries_ms": passes,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _child(backend, state_dir, version):
+    env = dict(os.environ, NYAYADRISHTI_STATE_DIR=state_dir, NYAYADRISHTI_BACKEND=backend)
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.backends", "--child", version],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    if args.child:
+        print(json.dumps(run_backend(args.child)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Must be set before db.py is imported
+        os.environ["NYAYADRISHTI_STATE_DIR"] = state_dir
+        start = time.perf_counter()
+        version = build_store(args.scale)
+        build_seconds = time.perf_counter() - start
+        from partitions import manifest
+
+        sources = manifest()["sources"].values()
+        results = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "cases": sum(s["cases"] for s in sources),
+            "hearings": sum(s["hearings"] for s in sources),
+            "store_build_seconds": build_seconds,
+            "backends": [_child(backend, state_dir, version) for backend in BACKENDS],
+        }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"backends_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{results['scale']}x: {results['cases']:,} cases, {results['hearings']:,} hearings "
+          f"(store built in {results['store_build_seconds']:.1f} s)")
+    names = list(results["backends"][0]["queries_ms"]["cold"])
+    header = "".join(f"{b['backend'] + ' ' + p:>20}" for b in results["backends"] for p in ("cold", "recomputed"))
+    print(f"{'query':<28}{header}")
+    for name in names:
+        cells = "".join(f"{b['queries_ms'][p][name]:>17.1f} ms" for b in results["backends"]
+                        for p in ("cold", "recomputed"))
+        print(f"{name:<28}{cells}")
+    for b in results["backends"]:
+        print(f"{b['backend']}: peak RSS {b['peak_rss_mb']:.0f} MB")
+    print(f"Saved to {path}")
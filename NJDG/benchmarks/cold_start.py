@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark for each page.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.cold_start --trials 3
+
+For every page and trial a fresh `streamlit run app.py` server is started, so
+module imports, st.cache_* and the static assets all start cold. One websocket
+session then opens the page and records:
+
+    server_ready_ms   process start until /_stcore/health answers
+    first_paint_ms    rerun request until the first element is rendered
+    script_ms         rerun request until the script finishes
+    warm_script_ms    the same page rerun again in the same server
+
+plus which heavy native libraries (scikit-learn, matplotlib, scipy) the server
+had mapped when the page finished. Medians are printed and the full results are
+written as JSON under benchmarks/results/.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.load_test import BASE_DIR, RESULTS_DIR, AppSession, _free_port, start_server
+
+PAGES = ["app", "Login", "Analytics", "AI_Predictions", "Anomaly_Detection"]
+HEAVY_LIBRARIES = ["sklearn", "matplotlib", "scipy"]
+
+
+def _loaded_libraries(pid):
+    """Heavy libraries with a shared object mapped into the server process (Linux)."""
+    try:
+        with open(f"/proc/{pid}/maps") as f:
+            maps = f.read()
+    except OSError:
+        return None
+    return [lib for lib in HEAVY_LIBRARIES if f"/{lib}/" in maps]
+
+
+async def _open_page(port, page):
+    session = AppSession(port)
+    await session.connect()
+    try:
+        # The main script is addressed by an empty page name
+        script = await session.rerun("" if page == "app" else page)
+        first_paint = session.first_delta
+        await session.settle()
+        warm = await session.rerun()
+        return first_paint, script, warm
+    finally:
+        await session.close()
+
+
+def measure(page):
+    with tempfile.TemporaryDirectory() as state_dir:
+        port = _free_port()
+        start = time.perf_counter()
+        server = start_server(port, state_dir)
+        ready = time.perf_counter() - start
+        try:
+            first_paint, script, warm = asyncio.run(_open_page(port, page))
+            libraries = _loaded_libraries(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return {
+        "server_ready_ms": ready * 1000,
+        "first_paint_ms": first_paint * 1000 if first_paint is not None else None,
+        "script_ms": script * 1000,
+        "warm_script_ms": warm * 1000,
+        "heavy_libraries": libraries,
+    }
+
+
+def run_cold_start(pages=PAGES, trials=3):
+    results = {}
+    for page in pages:
+        runs = [measure(page) for _ in range(trials)]
+        medians = {key: float(np.median([r[key] for r in runs if r[key] is not None] or [np.nan]))
+                   for key in ("server_ready_ms", "first_paint_ms", "script_ms", "warm_script_ms")}
+        results[page] = {"median": medians, "heavy_libraries": runs[-1]["heavy_libraries"], "runs": runs}
+    return {"created": datetime.now().isoformat(timespec="seconds"), "trials": trials, "pages": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    results = run_cold_start(args.pages, args.trials)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"cold_start_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'page':<20} {'ready':>8} {'paint':>8} {'script':>8} {'warm':>8}  heavy libraries")
+    for page, res in results["pages"].items():
+        m = res["median"]
+        print(f"{page:<20} {m['server_ready_ms']:8.0f} {m['first_paint_ms']:8.0f} "
+              f"{m['script_ms']:8.0f} {m['warm_script_ms']:8.0f}  {', '.join(res['heavy_libraries'] or []) or '-'}")
+    print(f"Saved to {path}")
@@ -0,0 +1,138 @@
+"""
+Streaming exports of every hearing of a large dataset, per backend and format.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.exports --scale 20
+
+Builds the partition store of benchmarks/backends.py at `scale`, then a fresh
+process per (backend, format) writes the whole hearings table with
+exports.write_batches(), as the Analytics export does. Reports rows per second,
+file size and the process's anonymous memory (memory-mapped frames are not
+counted) before the export and its peak during it, sampled every 5 ms: the
+growth is about one chunk with pandas, and within NYAYADRISHTI_DUCKDB_MEMORY
+(the engine sorts by row, spilling to disk) with DuckDB, whatever the row
+count. For comparison, one more process renders the same table with
+DataFrame.to_csv() into a string. Results are written as JSON under
+benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.backends import build_store
+from benchmarks.partitions import BASE_DIR, RESULTS_DIR
+
+RUNS = (("pandas", "CSV"), ("pandas", "Parquet"), ("duckdb", "CSV"), ("duckdb", "Parquet"), ("pandas", "to_csv"))
+
+
+def _anon_mb():
+    """Anonymous resident memory of this process (Linux); the memory-mapped frames are not counted."""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) / 1024 for line in f if line.startswith("RssAnon:"))
+
+
+class PeakSampler(threading.Thread):
+    """Highest _anon_mb() seen until stopped, sampled every few milliseconds."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = _anon_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(0.005):
+            self.peak = max(self.peak, _anon_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return max(self.peak, _anon_mb())
+
+
+def run_export(version, fmt, out_dir):
+    """Runs in the child process: one export of every hearing."""
+    from pathlib import Path
+
+    from exports import write_batches
+    from queries import backend
+
+    db = backend()
+    if db.name == "pandas":
+        # The frames are loaded up front in this mode; only the export itself is measured
+        db.table_batches(version, "hearings")
+    before = _anon_mb()
+    sampler = PeakSampler()
+    sampler.start()
+    start = time.perf_counter()
+    if fmt == "to_csv":
+        text = db._frames(version)[1].to_csv(index=False)
+        rows, size = None, len(text.encode()) / 2**20
+    else:
+        path = Path(out_dir) / f"hearings_{db.name}.{fmt.lower()}"
+        rows = write_batches(db.table_batches(version, "hearings"), path, fmt)
+        size = path.stat().st_size / 2**20
+    seconds = time.perf_counter() - start
+    peak = sampler.stop()
+    return {
+        "backend": db.name,
+        "format": fmt,
+        "rows": rows,
+        "seconds": seconds,
+        "file_mb": size,
+        "anon_before_mb": before,
+        "anon_peak_mb": peak,
+    }
+
+
+def _child(backend, fmt, state_dir, version):
+    env = dict(os.environ, NYAYADRISHTI_STATE_DIR=state_dir, NYAYADRISHTI_BACKEND=backend)
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.exports", "--child", version, fmt, state_dir],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    if args.child:
+        print(json.dumps(run_export(*args.child)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Must be set before db.py is imported
+        os.environ["NYAYADRISHTI_STATE_DIR"] = state_dir
+        version = build_store(args.scale)
+        from partitions import manifest
+
+        results = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "hearings": sum(s["hearings"] for s in manifest()["sources"].values()),
+            "runs": [_child(backend, fmt, state_dir, version) for backend, fmt in RUNS],
+        }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"exports_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{results['scale']}x: {results['hearings']:,} hearings")
+    print(f"{'run':<18}{'seconds':>10}{'rows/s':>12}{'file MB':>10}{'anon before':>13}{'anon peak':>11}")
+    for run in results["runs"]:
+        rate = f"{results['hearings'] / run['seconds']:,.0f}"
+        print(f"{run['backend'] + ' ' + run['format']:<18}{run['seconds']:>10.1f}{rate:>12}{run['file_mb']:>10.0f}"
+              f"{run['anon_before_mb']:>13.0f}{run['anon_peak_mb']:>11.0f}")
+    print(f"Saved to {path}")
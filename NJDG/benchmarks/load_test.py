@@ -0,0 +1,379 @@
+"""
+Multi-session load test for the Streamlit app.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.load_test --sessions 20 --duration 120
+
+Starts `streamlit run app.py` on a free port with an isolated state directory
+(passwords, sessions, notes), then drives N concurrent sessions over Streamlit's
+websocket protocol: each logs in through pages/Login.py, opens the judge or
+advocate dashboard, clicks the dashboard pills / searches CNRs and moves the AI
+Predictions sliders. Every interaction is timed from the rerun request to the
+server's script_finished message. Server CPU and resident memory are sampled
+from /proc (Linux) while the test runs. Results are written as JSON under
+benchmarks/results/.
+
+Widget values are encoded the way Streamlit >= 1.40 expects (radio, selectbox
+and pills as strings, sliders as double arrays, components as JSON).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+LOADTEST_PASSWORD = "loadtest"
+JUDGE_PILLS = ["Case Management", "Alerts", "Hearing Overview", "Dashboards / Charts"]
+SLIDERS = {"Days per hearing": (10, 50), "Year effect (days)": (5, 30), "Baseline days": (50, 200)}
+
+
+# -------------------------------
+# Server process and resource sampling
+# -------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, state_dir, timeout=120, env=None):
+    env = dict(os.environ, NYAYADRISHTI_STATE_DIR=str(state_dir), **(env or {}))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("Streamlit server did not become healthy")
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU % and RSS of a process from /proc every `interval` seconds."""
+
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._ticks = os.sysconf("SC_CLK_TCK")
+
+    def _read(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self._ticks
+        with open(f"/proc/{self.pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        return cpu_seconds, rss_kb / 1024
+
+    def run(self):
+        start = time.time()
+        prev_t, prev_cpu = start, self._read()[0]
+        while not self._stop_event.wait(self.interval):
+            try:
+                cpu, rss_mb = self._read()
+            except (OSError, StopIteration):
+                break
+            now = time.time()
+            self.samples.append({
+                "t": round(now - start, 2),
+                "cpu_percent": round(100 * (cpu - prev_cpu) / (now - prev_t), 1),
+                "rss_mb": round(rss_mb, 1),
+            })
+            prev_t, prev_cpu = now, cpu
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# -------------------------------
+# Websocket session
+# -------------------------------
+class AppSession:
+    """One simulated browser tab speaking Streamlit's BackMsg / ForwardMsg protocol."""
+
+    def __init__(self, port):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.conn = None
+        self.page_hash = ""
+        self.elements = {}    # (element type, label) -> (widget id, proto)
+        self.widgets = {}     # widget id -> WidgetState
+        self.first_delta = None   # seconds from the last rerun request to its first rendered element
+
+    async def connect(self):
+        import websockets
+
+        self.conn = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+
+    async def rerun(self, page=None, timeout=120):
+        """Send a rerun with the current widget states and wait until the script settles."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        if page is not None:
+            msg.rerun_script.page_name = page
+        else:
+            msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.query_string = ""
+        for state in self.widgets.values():
+            msg.rerun_script.widget_states.widgets.append(state)
+        # Triggers (button clicks) only fire once
+        self.widgets = {k: v for k, v in self.widgets.items() if not v.HasField("trigger_value")}
+        self.elements = {}
+
+        start = self._sent_at = time.perf_counter()
+        self.first_delta = None
+        await self.conn.send(msg.SerializeToString())
+        await asyncio.wait_for(self._until_finished(), timeout)
+        return time.perf_counter() - start
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            raw = await self.conn.recv()
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.elements = {}
+            elif kind == "navigation":
+                # The page actually running (new_session carries the main script's hash)
+                self.page_hash = msg.navigation.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                if self.first_delta is None:
+                    self.first_delta = time.perf_counter() - self._sent_at
+                # delta_path[0] is the root container: 0 = main, 1 = sidebar
+                self._record(msg.delta.new_element, in_main=msg.metadata.delta_path[0] == 0)
+            elif kind == "script_finished":
+                # switch_page / st.rerun end the run early and start another one
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def _record(self, element, in_main):
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind)
+        widget_id = getattr(proto, "id", None)
+        # Sidebar navigation repeats labels like "Login"; only the cookie component matters there
+        if not widget_id or (not in_main and kind != "component_instance"):
+            return
+        self.elements[(kind, getattr(proto, "label", ""))] = (widget_id, proto)
+
+    async def settle(self):
+        """Answer cookie-manager components with an empty cookie jar until none are waiting."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        for _ in range(5):
+            waiting = [wid for kind, (wid, _) in self.elements.items()
+                       if kind[0] == "component_instance" and wid not in self.widgets]
+            if not waiting:
+                return
+            for wid in waiting:
+                state = WidgetState(id=wid)
+                state.json_value = json.dumps("")
+                self.widgets[wid] = state
+            await self.rerun()
+
+    def set_widget(self, kind, label, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, _ = self.elements[(kind, label)]
+        state = WidgetState(id=widget_id)
+        if kind == "button":
+            state.trigger_value = True
+        elif kind in ("text_input", "text_area", "radio", "selectbox"):
+            state.string_value = str(value)
+        elif kind == "slider":
+            state.double_array_value.data[:] = [float(value)]
+        elif kind in ("button_group", "multiselect"):
+            state.string_array_value.data[:] = [str(v) for v in value]
+        else:
+            raise ValueError(f"Unsupported widget type: {kind}")
+        self.widgets[widget_id] = state
+
+
+# -------------------------------
+# Scenario
+# -------------------------------
+async def _connect_timed(session):
+    start = time.perf_counter()
+    await session.connect()
+    return time.perf_counter() - start
+
+
+async def run_session(port, user, role, cnrs, deadline, rng, timings, errors):
+    session = AppSession(port)
+
+    async def timed(name, coro):
+        try:
+            latency = await coro
+            timings.setdefault(name, []).append(latency)
+        except Exception as e:
+            errors.append({"user": user, "interaction": name, "error": repr(e)})
+            raise
+
+    try:
+        await timed("connect", _connect_timed(session))
+        await timed("open_login", session.rerun("Login"))
+        await session.settle()
+
+        session.set_widget("radio", "Login as", "Judge" if role == "Judge" else "Advocate (Lawyer)")
+        session.set_widget("text_input", "USERNAME (UPPERCASE)", user)
+        session.set_widget("text_input", "PASSWORD", LOADTEST_PASSWORD)
+        session.set_widget("button", "Login", True)
+        await timed("login_to_dashboard", session.rerun())
+        await session.settle()
+        dashboard = "Judge_Dashboard" if role == "Judge" else "Lawyer_Dashboard"
+
+        while time.time() < deadline:
+            action = rng.random()
+            if action < 0.2:
+                await timed("ai_predictions_open", session.rerun("AI_Predictions"))
+                label = rng.choice(list(SLIDERS))
+                session.set_widget("slider", label, rng.randint(*SLIDERS[label]))
+                await timed("ai_predictions_slider", session.rerun())
+                await timed("dashboard_open", session.rerun(dashboard))
+            elif role == "Judge":
+                session.set_widget("button_group", "", [rng.choice(JUDGE_PILLS)])
+                await timed("judge_pill", session.rerun())
+            else:
+                session.set_widget("text_input", "Search Case by CNR Number:", rng.choice(cnrs))
+                await timed("lawyer_cnr_search", session.rerun())
+    except Exception as e:
+        if not errors or errors[-1]["user"] != user:
+            errors.append({"user": user, "interaction": "scenario", "error": repr(e),
+                           "page": session.page_hash, "elements": sorted(map(list, session.elements))})
+    finally:
+        await session.close()
+
+
+def _pick_users(n_judges, n_advocates):
+    """Judges and advocates with the most hearings, plus CNRs from each advocate's portfolio."""
+    from preprocessing import dataset_version, prepared_data
+    from user_directory import build_directory
+
+    _, _, merged = prepared_data(dataset_version())
+    directory = build_directory(merged)
+    cnr = merged["cnr_number"].to_numpy()
+
+    def top(role, n):
+        entries = [e for e in directory.values() if role in e["roles"] and "," not in e["name"]]
+        entries.sort(key=lambda e: -e["roles"][role]["hearings"])
+        return entries[:n]
+
+    judges = [(e["name"], "Judge", []) for e in top("Judge", n_judges)]
+    advocates = [(e["name"], "Advocate", list(np.unique(cnr[e["roles"]["Advocate"]["rows"]])[:50]))
+                 for e in top("Advocate", n_advocates)]
+    return judges + advocates
+
+
+def _seed_state(state_dir, users):
+    """Give every simulated user a known password so login skips the first-login flow."""
+    digest = hashlib.sha256(LOADTEST_PASSWORD.encode()).hexdigest()
+    with open(Path(state_dir) / "passwords.json", "w") as f:
+        json.dump({name.lower(): digest for name, _, _ in users}, f)
+
+
+def _percentiles(values):
+    arr = np.array(values) * 1000
+    return {"count": int(len(arr)), "p50_ms": float(np.percentile(arr, 50)),
+            "p90_ms": float(np.percentile(arr, 90)), "p99_ms": float(np.percentile(arr, 99)),
+            "max_ms": float(arr.max())}
+
+
+async def _drive(port, users, n_sessions, duration, ramp_seconds, seed):
+    timings, errors = {}, []
+    deadline = time.time() + duration
+    tasks = []
+    for i in range(n_sessions):
+        user, role, cnrs = users[i % len(users)]
+        rng = random.Random(seed + i)
+        tasks.append(asyncio.create_task(
+            run_session(port, user, role, cnrs or ["NONE"], deadline, rng, timings, errors)))
+        await asyncio.sleep(ramp_seconds / max(n_sessions, 1))
+    await asyncio.gather(*tasks)
+    return timings, errors
+
+
+def run_load_test(n_sessions=10, duration=60, ramp_seconds=5, seed=0):
+    users = _pick_users(max(1, n_sessions // 2), max(1, n_sessions - n_sessions // 2))
+    with tempfile.TemporaryDirectory() as state_dir:
+        _seed_state(state_dir, users)
+        port = _free_port()
+        server = start_server(port, state_dir)
+        sampler = ResourceSampler(server.pid)
+        sampler.start()
+        try:
+            start = time.time()
+            timings, errors = asyncio.run(_drive(port, users, n_sessions, duration, ramp_seconds, seed))
+            wall = time.time() - start
+        finally:
+            sampler.stop()
+            server.terminate()
+            server.wait(timeout=30)
+
+    samples = sampler.samples
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "sessions": n_sessions,
+        "duration_seconds": duration,
+        "wall_seconds": wall,
+        "interactions": {name: _percentiles(v) for name, v in sorted(timings.items())},
+        "errors": errors,
+        "server": {
+            "peak_rss_mb": max((s["rss_mb"] for s in samples), default=None),
+            "mean_cpu_percent": float(np.mean([s["cpu_percent"] for s in samples])) if samples else None,
+            "samples": samples,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=60, help="Seconds of interaction after login")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions connect")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    results = run_load_test(args.sessions, args.duration, args.ramp, args.seed)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"load_test_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, stats in results["interactions"].items():
+        print(f"{name:<24} n={stats['count']:<5} p50 {stats['p50_ms']:8.1f} ms  "
+              f"p90 {stats['p90_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms")
+    print(f"peak RSS {results['server']['peak_rss_mb']} MB, errors {len(results['errors'])}")
+    print(f"Saved to {path}")
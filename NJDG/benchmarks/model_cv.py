@@ -0,0 +1,275 @@
+"""
+K-fold benchmarking harness for the disposal-time and anomaly models.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.model_cv --folds 5
+
+The cleaned feature matrix is written once to .npy files keyed by the dataset
+version and every worker opens it with mmap_mode="r", so folds only ship
+(model name, fold number) across the process boundary.
+
+The anomaly models get the app's features (anomaly.feature_columns()). With no
+ground truth, they are scored by how well they rank cases with an unusually
+long wait between two hearings (longest_gap_days, from the hearings table and
+not among the features) as anomalous.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = BASE_DIR / ".cache" / "features"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Bump when the cached matrices change, so stale ones are not reused
+FEATURE_LAYOUT = 2
+
+
+# -------------------------------
+# Shared feature matrix
+# -------------------------------
+def build_feature_cache(cache_dir=CACHE_DIR):
+    """Write the feature matrices for the current dataset version and return their paths."""
+    from anomaly import feature_columns, prepare_cases
+    from preprocessing import dataset_version, prepared_data
+
+    key = hashlib.sha1(f"{dataset_version()}:{FEATURE_LAYOUT}".encode()).hexdigest()[:12]
+    target = Path(cache_dir) / key
+    paths = {
+        "X_disposal": target / "X_disposal.npy",
+        "y_disposal": target / "y_disposal.npy",
+        "X_anomaly": target / "X_anomaly.npy",
+        "y_anomaly": target / "y_anomaly.npy",
+    }
+    if all(p.exists() for p in paths.values()):
+        return {k: str(v) for k, v in paths.items()}
+
+    all_cases, _, _ = prepared_data(dataset_version())
+    cases = all_cases.dropna(subset=["total_hearings", "filing_year", "disposal_days"])
+
+    X_disposal = np.column_stack([
+        cases["total_hearings"].to_numpy(dtype=np.float64),
+        (cases["filing_year"] - cases["filing_year"].min()).to_numpy(dtype=np.float64),
+    ])
+    y_disposal = cases["disposal_days"].to_numpy(dtype=np.float64)
+
+    # Every case, as the app scores them; a case heard once has no gap
+    model_input = prepare_cases(all_cases)
+    X_anomaly = model_input[feature_columns(model_input)].to_numpy(dtype=np.float64)
+    y_anomaly = (all_cases["longest_gap_days"].fillna(0).to_numpy(dtype=np.float64)
+                 if "longest_gap_days" in all_cases.columns else np.zeros(len(all_cases)))
+
+    target.mkdir(parents=True, exist_ok=True)
+    for name, arr in (("X_disposal", X_disposal), ("y_disposal", y_disposal), ("X_anomaly", X_anomaly),
+                      ("y_anomaly", y_anomaly)):
+        np.save(paths[name], np.ascontiguousarray(arr))
+    return {k: str(v) for k, v in paths.items()}
+
+
+_SHARED = {}
+
+
+def _init_worker(paths):
+    """Map the cached matrices read-only once per worker process."""
+    for name, path in paths.items():
+        _SHARED[name] = np.load(path, mmap_mode="r")
+
+
+# -------------------------------
+# Candidate models
+# -------------------------------
+class RuleModel:
+    """The slider formula with weights fitted on the training fold via the error surface."""
+
+    def fit(self, X, y):
+        from predictor import compute_error_surface, best_weights
+
+        surface = compute_error_surface(
+            X[:, 0].astype(np.int64), X[:, 1].astype(np.int64), y.astype(np.int64)
+        )
+        self.weights_ = best_weights(surface)
+        return self
+
+    def predict(self, X):
+        hearing_weight, year_weight, baseline = self.weights_
+        return X[:, 0] * hearing_weight + X[:, 1] * year_weight + baseline
+
+
+def _disposal_models():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+    return {
+        "rule_formula": RuleModel,
+        "linear_regression": LinearRegression,
+        "hist_gradient_boosting": lambda: HistGradientBoostingRegressor(random_state=42),
+        "random_forest": lambda: RandomForestRegressor(n_estimators=100, n_jobs=1, random_state=42),
+    }
+
+
+def _anomaly_models():
+    from sklearn.ensemble import IsolationForest
+
+    return {
+        "isolation_forest_default": lambda: IsolationForest(
+            n_estimators=200, contamination=0.05, random_state=42
+        ),
+        "isolation_forest_100": lambda: IsolationForest(
+            n_estimators=100, contamination=0.05, random_state=42
+        ),
+        "isolation_forest_subsample_256": lambda: IsolationForest(
+            n_estimators=200, max_samples=256, contamination=0.05, random_state=42
+        ),
+    }
+
+
+MODEL_FAMILIES = {"disposal": _disposal_models, "anomaly": _anomaly_models}
+
+
+# -------------------------------
+# One fold (runs in a worker)
+# -------------------------------
+def _run_fold(task):
+    from sklearn.model_selection import KFold
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, roc_auc_score
+
+    family, model_name, fold, n_folds, seed = task
+    X = _SHARED["X_disposal"] if family == "disposal" else _SHARED["X_anomaly"]
+    y = _SHARED["y_disposal"] if family == "disposal" else _SHARED["y_anomaly"]
+
+    splits = KFold(n_splits=n_folds, shuffle=True, random_state=seed).split(X)
+    train_idx, test_idx = next(s for i, s in enumerate(splits) if i == fold)
+    model = MODEL_FAMILIES[family]()[model_name]()
+
+    start = time.perf_counter()
+    if family == "disposal":
+        model.fit(X[train_idx], y[train_idx])
+    else:
+        model.fit(X[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if family == "disposal":
+        pred = model.predict(X[test_idx])
+    else:
+        pred = model.decision_function(X[test_idx])
+    predict_seconds = time.perf_counter() - start
+
+    row = {
+        "family": family,
+        "model": model_name,
+        "fold": fold,
+        "n_train": int(len(train_idx)),
+        "n_test": int(len(test_idx)),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+    if family == "disposal":
+        row["mae"] = float(mean_absolute_error(y[test_idx], pred))
+        row["rmse"] = float(np.sqrt(mean_squared_error(y[test_idx], pred)))
+    else:
+        # No ground-truth labels: score how well the model ranks unusually long
+        # gaps between hearings (above the training fold's 95th percentile), which
+        # are not among its inputs, as anomalous.
+        threshold = np.percentile(y[train_idx], 95)
+        label = y[test_idx] > threshold
+        row["flagged_rate"] = float(np.mean(model.predict(X[test_idx]) == -1))
+        row["long_gap_auc"] = (
+            float(roc_auc_score(label, -pred)) if 0 < label.sum() < len(label) else None
+        )
+    return row
+
+
+# -------------------------------
+# Harness
+# -------------------------------
+def summarize(rows):
+    """Mean and standard deviation of every numeric metric per (family, model)."""
+    summary = {}
+    for row in rows:
+        summary.setdefault((row["family"], row["model"]), []).append(row)
+
+    out = []
+    for (family, model_name), fold_rows in sorted(summary.items()):
+        entry = {"family": family, "model": model_name, "folds": len(fold_rows)}
+        metrics = [k for k, v in fold_rows[0].items() if v is None or isinstance(v, float)]
+        for metric in metrics:
+            values = np.array([r[metric] for r in fold_rows if r[metric] is not None], dtype=float)
+            entry[f"{metric}_mean"] = float(values.mean()) if len(values) else None
+            entry[f"{metric}_std"] = float(values.std()) if len(values) else None
+        out.append(entry)
+    return out
+
+
+def run_benchmark(n_folds=5, families=("disposal", "anomaly"), workers=None, seed=42):
+    paths = build_feature_cache()
+    tasks = [
+        (family, model_name, fold, n_folds, seed)
+        for family in families
+        for model_name in MODEL_FAMILIES[family]()
+        for fold in range(n_folds)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(paths,)) as pool:
+        rows = list(pool.map(_run_fold, tasks))
+    wall_seconds = time.perf_counter() - start
+
+    from preprocessing import dataset_version
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "dataset_version": dataset_version(),
+        "folds": n_folds,
+        "workers": workers,
+        "wall_seconds": wall_seconds,
+        "summary": summarize(rows),
+        "folds_detail": rows,
+    }
+
+
+def save_results(results, results_dir=RESULTS_DIR):
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    path = results_dir / f"model_cv_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def _print_summary(results):
+    print(f"{results['folds']}-fold CV on {results['workers']} workers "
+          f"in {results['wall_seconds']:.1f}s")
+    for entry in results["summary"]:
+        score = (f"MAE {entry['mae_mean']:.1f}  RMSE {entry['rmse_mean']:.1f}"
+                 if entry["family"] == "disposal"
+                 else f"AUC {entry['long_gap_auc_mean'] or float('nan'):.3f}  "
+                      f"flagged {entry['flagged_rate_mean']:.3f}")
+        print(f"  {entry['family']:<9} {entry['model']:<32} {score:<28} "
+              f"fit {entry['fit_seconds_mean'] * 1000:8.1f} ms  "
+              f"predict {entry['predict_seconds_mean'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--family", choices=sorted(MODEL_FAMILIES), action="append")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        n_folds=args.folds,
+        families=tuple(args.family or MODEL_FAMILIES),
+        workers=args.workers,
+    )
+    _print_summary(results)
+    print(f"Saved to {save_results(results)}")
@@ -0,0 +1,155 @@
+"""
+Partition pruning and incremental ingest with several synthetic High Courts.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.partitions --states 8
+
+Builds N synthetic courts from the sample data: CNRs and case numbers are
+prefixed, and the state and bench names are rewritten, with three benches per
+court split by court hall. It ingests them one at a time into a fresh
+partition store and records how long each court takes to add. It then times
+filtered reads of both tables through the store against reading everything and
+filtering in pandas. Results are written as JSON under benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def synthetic_court(cases, hearings, k):
+    state = f"High Court {k:02d}"
+    prefix = f"S{k:02d}"
+    # Case numbers are per court too, so joins on them stay within one court
+    hearings = hearings.assign(
+        cnr_number=prefix + hearings["cnr_number"],
+        combinedcasenumber=prefix + hearings["combinedcasenumber"],
+        courtsate=state,
+        courtname=state + " Bench " + (hearings["courthallnumber"].fillna(0).astype(int) % 3).astype(str),
+    )
+    cases = cases.assign(
+        cnr_number=prefix + cases["cnr_number"],
+        combined_case_number=prefix + cases["combined_case_number"],
+        case_number=prefix + cases["case_number"],
+    )
+    return cases, hearings
+
+
+def _timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(n_states=8, repeat=3):
+    import numpy as np
+    import partitions
+    from preprocessing import _read_csvs, clean_source, csv_version
+
+    base_cases, base_hearings = clean_source(*_read_csvs(csv_version()))
+
+    ingest_seconds = []
+    for k in range(n_states):
+        cases, hearings = synthetic_court(base_cases, base_hearings, k)
+        start = time.perf_counter()
+        partitions.ingest(f"court{k:02d}", cases, hearings, fingerprint=str(k))
+        ingest_seconds.append(time.perf_counter() - start)
+
+    # Re-ingesting one court rewrites only its own files
+    before = {p: p.stat().st_mtime_ns for p in partitions.STORE_DIR.glob("**/*.parquet")}
+    cases, hearings = synthetic_court(base_cases, base_hearings, 0)
+    start = time.perf_counter()
+    partitions.ingest("court00", cases, hearings, fingerprint="0b")
+    reingest = time.perf_counter() - start
+    untouched = sum(1 for p, m in before.items()
+                    if not p.name.startswith("court00-") and p.exists() and p.stat().st_mtime_ns == m)
+
+    index = partitions.listing()
+    index = index[index["table"] == "cases"]
+    state, bench = "High Court 00", "High Court 00 Bench 0"
+    year = str(sorted(y for y in index["year"].unique() if y != partitions.UNKNOWN)[1])
+    queries = {
+        "state+bench+year": ((state,), (bench,), (year,)),
+        "state+year": ((state,), None, (year,)),
+        "state": ((state,), None, None),
+        "year (all states)": (None, None, (year,)),
+        "everything": (None, None, None),
+    }
+
+    def full_scan(states, benches, years):
+        # Baseline: read every partition, then filter in pandas on the key columns
+        frames = {}
+        for table in partitions.TABLES:
+            frame = partitions._dataset(table).to_table().to_pandas()
+            mask = np.ones(len(frame), dtype=bool)
+            for key, values in zip(partitions.KEYS, (states, benches, years)):
+                if values:
+                    mask &= frame[key].isin(values).to_numpy()
+            frames[table] = frame[mask]
+        return frames
+
+    def pruned(states, benches, years):
+        return {table: partitions.read(table, states, benches, years) for table in partitions.TABLES}
+
+    results = {}
+    for name, selection in queries.items():
+        files, total = partitions.plan("hearings", *selection)
+        t_pruned, frames = _timed(lambda: pruned(*selection), repeat)
+        t_full, baseline = _timed(lambda: full_scan(*selection), repeat)
+        assert all(len(frames[t]) == len(baseline[t]) for t in partitions.TABLES)
+        results[name] = {
+            "files_read": files, "files_total": total,
+            "rows": {t: len(frames[t]) for t in partitions.TABLES},
+            "pruned_ms": t_pruned * 1000, "full_scan_ms": t_full * 1000,
+        }
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "states": n_states,
+        "partitions": int(len(index)),
+        "ingest_seconds": ingest_seconds,
+        "reingest_one_court_seconds": reingest,
+        "files_untouched_by_reingest": untouched,
+        "files_total": len(before),
+        "queries": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--states", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Must be set before db.py is imported
+        os.environ["NYAYADRISHTI_STATE_DIR"] = state_dir
+        results = run_benchmark(args.states, args.repeat)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"partitions_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    ingest = results["ingest_seconds"]
+    print(f"{results['states']} courts, {results['partitions']} case partitions; "
+          f"ingest per court {min(ingest):.2f}-{max(ingest):.2f} s (first {ingest[0]:.2f}, last {ingest[-1]:.2f})")
+    print(f"re-ingest one court {results['reingest_one_court_seconds']:.2f} s, "
+          f"{results['files_untouched_by_reingest']} of {results['files_total']} files untouched")
+    for name, q in results["queries"].items():
+        print(f"{name:<18} files {q['files_read']:>4}/{q['files_total']:<4} rows {q['rows']['hearings']:>7}  "
+              f"pruned {q['pruned_ms']:8.1f} ms  full scan {q['full_scan_ms']:8.1f} ms")
+    print(f"Saved to {path}")
@@ -0,0 +1,121 @@
+"""
+Concurrency benchmark for the SQLite session store.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.session_bench --processes 4 --threads 8 --users 2000
+
+Every worker logs users in (create_token) and validates them the way protected
+pages do on each rerun; at the end every user's last token is checked so lost
+writes show up as failures.
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import sessions
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return {}
+    arr = np.array(latencies) * 1000
+    return {f"p{q}_ms": float(np.percentile(arr, q)) for q in (50, 95, 99)} | {"max_ms": float(arr.max())}
+
+
+def _worker(args):
+    db_path, worker_id, users, threads, validations_per_login, cache_seconds = args
+    sessions.SESSIONS_DB = Path(db_path)
+    sessions.VALIDATION_CACHE_SECONDS = cache_seconds
+    sessions.SESSIONS_FILE = Path(db_path).with_suffix(".json")
+
+    login_lat, validate_lat = [], []
+    issued = {}
+    lock = threading.Lock()
+
+    def _thread(chunk):
+        rng = random.Random(worker_id)
+        local_login, local_validate, local_issued = [], [], {}
+        for user in chunk:
+            start = time.perf_counter()
+            token = sessions.create_token(user)
+            local_login.append(time.perf_counter() - start)
+            local_issued[user] = token
+            for _ in range(validations_per_login):
+                probe = rng.choice(chunk)
+                start = time.perf_counter()
+                sessions.validate_token(probe, local_issued.get(probe))
+                local_validate.append(time.perf_counter() - start)
+        with lock:
+            login_lat.extend(local_login)
+            validate_lat.extend(local_validate)
+            issued.update(local_issued)
+
+    pool = [threading.Thread(target=_thread, args=(users[i::threads],)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return login_lat, validate_lat, issued
+
+
+def run(processes=4, threads=8, users=2000, validations_per_login=20,
+        cache_seconds=sessions.VALIDATION_CACHE_SECONDS):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "sessions.db")
+        names = [f"advocate {i}" for i in range(users)]
+        tasks = [(db_path, p, names[p::processes], threads, validations_per_login, cache_seconds)
+                 for p in range(processes)]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_worker, tasks))
+        wall = time.perf_counter() - start
+
+        login_lat = [x for r in results for x in r[0]]
+        validate_lat = [x for r in results for x in r[1]]
+        issued = {u: t for r in results for u, t in r[2].items()}
+
+        # Fresh process state: bypass the validation cache when checking for lost writes
+        sessions.SESSIONS_DB = Path(db_path)
+        sessions._validation_cache.clear()
+        lost = sum(sessions.get_token(u) != t for u, t in issued.items())
+
+    return {
+        "processes": processes,
+        "threads_per_process": threads,
+        "users": users,
+        "validation_cache_seconds": cache_seconds,
+        "logins": len(login_lat),
+        "validations": len(validate_lat),
+        "wall_seconds": wall,
+        "ops_per_second": (len(login_lat) + len(validate_lat)) / wall,
+        "login_latency": _percentiles(login_lat),
+        "validate_latency": _percentiles(validate_lat),
+        "lost_writes": lost,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--validations", type=int, default=20)
+    parser.add_argument("--no-cache", action="store_true", help="Validate against SQLite on every call")
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    result = run(args.processes, args.threads, args.users, args.validations,
+                 0.0 if args.no_cache else sessions.VALIDATION_CACHE_SECONDS)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,111 @@
+"""
+Per-session memory of the dashboards.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.session_memory --sessions 16
+
+Starts the app like load_test.py, warms it with one judge and one advocate
+session (so shared caches are already built), then opens N more sessions that
+log in, open their dashboard and click through it while staying connected.
+Server RSS is sampled from /proc throughout; the report gives the peak and the
+retained growth over the warm baseline, divided by the number of sessions.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.load_test import (BASE_DIR, RESULTS_DIR, JUDGE_PILLS, LOADTEST_PASSWORD, AppSession,
+                                  ResourceSampler, _free_port, _pick_users, _seed_state, start_server)
+
+
+async def _open_dashboard(port, user, role, cnrs):
+    """Log in and visit every dashboard view; returns the still-open session."""
+    session = AppSession(port)
+    await session.connect()
+    await session.rerun("Login")
+    await session.settle()
+    session.set_widget("radio", "Login as", "Judge" if role == "Judge" else "Advocate (Lawyer)")
+    session.set_widget("text_input", "USERNAME (UPPERCASE)", user)
+    session.set_widget("text_input", "PASSWORD", LOADTEST_PASSWORD)
+    session.set_widget("button", "Login", True)
+    await session.rerun()
+    await session.settle()
+    if role == "Judge":
+        for pill in JUDGE_PILLS:
+            session.set_widget("button_group", "", [pill])
+            await session.rerun()
+    else:
+        for cnr in cnrs[:3]:
+            session.set_widget("text_input", "Search Case by CNR Number:", cnr)
+            await session.rerun()
+    return session
+
+
+async def _drive(port, users, n_sessions, sampler):
+    warm = [await _open_dashboard(port, *users[0]), await _open_dashboard(port, *users[-1])]
+    await asyncio.sleep(2)
+    baseline = sampler.samples[-1]["rss_mb"]
+    mark = len(sampler.samples)
+
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*[
+        _open_dashboard(port, *users[i % len(users)]) for i in range(n_sessions)
+    ])
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(2)
+    retained = sampler.samples[-1]["rss_mb"]
+    peak = max(s["rss_mb"] for s in sampler.samples[mark:])
+
+    for session in warm + sessions:
+        await session.close()
+    return {
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak,
+        "retained_rss_mb": retained,
+        "peak_per_session_mb": (peak - baseline) / n_sessions,
+        "retained_per_session_mb": (retained - baseline) / n_sessions,
+        "open_seconds": elapsed,
+    }
+
+
+def run_session_memory(n_sessions=16):
+    users = _pick_users(max(1, n_sessions // 2), max(1, n_sessions - n_sessions // 2))
+    with tempfile.TemporaryDirectory() as state_dir:
+        _seed_state(state_dir, users)
+        port = _free_port()
+        server = start_server(port, state_dir)
+        sampler = ResourceSampler(server.pid, interval=0.1)
+        sampler.start()
+        try:
+            result = asyncio.run(_drive(port, users, n_sessions, sampler))
+        finally:
+            sampler.stop()
+            server.terminate()
+            server.wait(timeout=30)
+    return {"created": datetime.now().isoformat(timespec="seconds"), "sessions": n_sessions, **result}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=16)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    results = run_session_memory(args.sessions)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"session_memory_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"baseline {results['baseline_rss_mb']:.0f} MB, peak {results['peak_rss_mb']:.0f} MB, "
+          f"retained {results['retained_rss_mb']:.0f} MB after {args.sessions} sessions "
+          f"({results['open_seconds']:.1f} s)")
+    print(f"per session: peak {results['peak_per_session_mb']:.1f} MB, "
+          f"retained {results['retained_per_session_mb']:.1f} MB")
+    print(f"Saved to {path}")
@@ -0,0 +1,100 @@
+"""
+Memory of several Streamlit worker processes with and without the shared dataset.
+
+Run from the NJDG directory:
+
+    python -m benchmarks.shared_workers --workers 4
+
+For each mode (NYAYADRISHTI_SHARED_DATA=0, then the memory-mapped default)
+starts N servers on one state directory, as they would run behind a proxy,
+and opens a judge dashboard in every one of them at the same time. Reports
+how long each worker took to serve its first dashboard (the first build
+versus attaching to published frames) and each worker's RSS and PSS from
+/proc/<pid>/smaps_rollup. PSS splits shared pages between the processes
+mapping them, so the total PSS is what the workers really cost together.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.load_test import BASE_DIR, RESULTS_DIR, _free_port, _pick_users, _seed_state, start_server
+from benchmarks.session_memory import _open_dashboard
+
+
+def _smaps_mb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1].lower() + "_mb"] = int(parts[1]) / 1024
+    return values
+
+
+async def _first_dashboard(port, user):
+    start = time.perf_counter()
+    session = await _open_dashboard(port, *user)
+    elapsed = time.perf_counter() - start
+    return session, elapsed
+
+
+async def _drive(ports, user):
+    opened = await asyncio.gather(*[_first_dashboard(port, user) for port in ports])
+    await asyncio.sleep(2)
+    for session, _ in opened:
+        await session.close()
+    return [elapsed for _, elapsed in opened]
+
+
+def run_mode(n_workers, shared, user):
+    env = {"NYAYADRISHTI_SHARED_DATA": "1" if shared else "0"}
+    with tempfile.TemporaryDirectory() as state_dir:
+        _seed_state(state_dir, [user])
+        ports = [_free_port() for _ in range(n_workers)]
+        servers = [start_server(port, state_dir, env=env) for port in ports]
+        try:
+            first_dashboard = asyncio.run(_drive(ports, user))
+            workers = [{"first_dashboard_s": t, **_smaps_mb(server.pid)}
+                       for server, t in zip(servers, first_dashboard)]
+        finally:
+            for server in servers:
+                server.terminate()
+            for server in servers:
+                server.wait(timeout=30)
+    return {
+        "shared": shared,
+        "workers": workers,
+        "total_rss_mb": sum(w["rss_mb"] for w in workers),
+        "total_pss_mb": sum(w["pss_mb"] for w in workers),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    user = _pick_users(1, 0)[0]
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "workers": args.workers,
+        "modes": [run_mode(args.workers, shared, user) for shared in (False, True)],
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"shared_workers_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for mode in results["modes"]:
+        label = "shared " if mode["shared"] else "private"
+        firsts = ", ".join(f"{w['first_dashboard_s']:.1f}" for w in mode["workers"])
+        pss = ", ".join(f"{w['pss_mb']:.0f}" for w in mode["workers"])
+        print(f"{label}: total PSS {mode['total_pss_mb']:.0f} MB (per worker {pss}), "
+              f"total RSS {mode['total_rss_mb']:.0f} MB, first dashboard s [{firsts}]")
+    print(f"Saved to {path}")
@@ -0,0 +1,290 @@
+"""
+One process-wide cache for everything derived from a dataset version.
+
+    @timed("survival.survival_by")
+    @cached("aggregate", copy=True)
+    def survival_by(_durations, column, dataset_version, selection=None): ...
+
+Entries are keyed by the function and its arguments (parameters starting with
+an underscore are left out, as with st.cache_data) and tagged with the dataset
+version they were built from: preprocessing.dataset_version(), a fingerprint
+of the source CSVs and of every source ingested into the partition store, so
+nothing expires while the data is unchanged and a changed CSV or a new ingest
+gives new keys. Each entry belongs to a layer:
+
+    raw -> clean -> index, view, aggregate, model -> chart
+
+Every layer is an LRU within its own memory budget (entry sizes are estimated
+from frame and array buffers); a function may also cap its own entry count.
+When warm-up publishes a version, retire() drops every other version's
+entries, dependent layers first, and invalidate(layer) drops a layer together
+with the layers built from it. Hits, misses and evictions are counted per
+function for the Diagnostics page.
+
+Values are shared between sessions. Functions whose callers may modify the
+result pass copy=True: frames are returned as copy-on-write shallow copies and
+arrays copied, which is what st.cache_data's copies guaranteed.
+
+Environment:
+    NYAYADRISHTI_CACHE_MB="aggregate=512,chart=128"   per-layer budgets in MB (defaults in LAYERS)
+"""
+import functools
+import inspect
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Layer -> (layers it is built from, default budget in MB)
+LAYERS = {
+    "raw": ((), 1024),                              # source CSVs as read
+    "clean": (("raw",), 8192),                      # prepared and partition frames (memory-mapped when shared)
+    "index": (("clean",), 2048),                    # directories, name index, bench pairs, partition listing
+    "view": (("clean", "index"), 1024),             # one judge's or advocate's rows
+    "aggregate": (("clean", "index"), 1024),        # counts, rates, survival tables
+    "model": (("clean",), 512),                     # fitted forecasts, error surface, anomaly scores
+    "chart": (("aggregate", "model"), 256),         # figure specs
+}
+
+
+def _budgets():
+    budgets = {layer: mb for layer, (_, mb) in LAYERS.items()}
+    for part in os.environ.get("NYAYADRISHTI_CACHE_MB", "").split(","):
+        if "=" in part:
+            layer, mb = part.split("=", 1)
+            if layer.strip() in budgets:
+                budgets[layer.strip()] = float(mb)
+    return {layer: mb * 2**20 for layer, mb in budgets.items()}
+
+
+BUDGETS = _budgets()
+
+_lock = threading.Lock()
+_entries = {layer: OrderedDict() for layer in LAYERS}   # layer -> key -> _Entry, least recently used first
+_bytes = dict.fromkeys(LAYERS, 0)
+_counts = {}                                            # function -> [layer, hits, misses, evictions]
+_building = {}                                          # key -> lock held while one thread computes it
+
+
+class _Entry:
+    __slots__ = ("value", "version", "nbytes")
+
+    def __init__(self, value, version, nbytes):
+        self.value, self.version, self.nbytes = value, version, nbytes
+
+
+# -------------------------------
+# Keys, sizes and copies
+# -------------------------------
+def nbytes(value, depth=0):
+    """Approximate memory held by a cached value: frame and array buffers, containers walked a few levels."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "to_plotly_json"):
+        # Plotly figures: the JSON Streamlit sends for them
+        return len(value.to_json())
+    if depth >= 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(v, depth + 1) for v in value.values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(nbytes(v, depth + 1) for v in value)
+    if hasattr(value, "__dict__"):
+        return nbytes(vars(value), depth + 1)
+    return sys.getsizeof(value)
+
+
+def _hashable(value):
+    """Arguments as a dictionary key: lists and dicts become tuples, sets frozensets."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return tuple((k, _hashable(v)) for k, v in value.items())
+    return value
+
+
+def _copy(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy(v) for v in value)
+    return value
+
+
+# -------------------------------
+# Store
+# -------------------------------
+def _lookup(layer, key):
+    with _lock:
+        entry = _entries[layer].get(key)
+        counts = _counts[key[0]]
+        if entry is None:
+            return False, None
+        _entries[layer].move_to_end(key)
+        counts[1] += 1
+        return True, entry.value
+
+
+def _evict_locked(layer, key):
+    entry = _entries[layer].pop(key)
+    _bytes[layer] -= entry.nbytes
+    _counts[key[0]][3] += 1
+
+
+def _store(layer, key, version, value, max_entries):
+    size = nbytes(value)
+    with _lock:
+        entries = _entries[layer]
+        if key in entries:
+            _evict_locked(layer, key)
+        entries[key] = _Entry(value, version, size)
+        _bytes[layer] += size
+        _counts[key[0]][2] += 1
+        if max_entries is not None:
+            own = [k for k in entries if k[0] == key[0]]
+            for old in own[:max(len(own) - max_entries, 0)]:
+                _evict_locked(layer, old)
+        # Least recently used first; the new entry stays even when it alone exceeds the budget
+        for old in list(entries):
+            if _bytes[layer] <= BUDGETS[layer] or old == key:
+                break
+            _evict_locked(layer, old)
+
+
+def cached(layer, max_entries=None, copy=False, spinner=None):
+    """
+    Decorator caching a function's results in `layer`, tagged with its
+    `dataset_version` (or `version`) argument, which every cached function
+    takes so retire() can drop its entries. `spinner` is shown while a miss is
+    computed in a page run.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = func.__qualname__
+        keyed = [p for p in signature.parameters if not p.startswith("_")]
+        version_param = next((p for p in ("dataset_version", "version") if p in signature.parameters), None)
+        if version_param is None:
+            raise TypeError(f"{name}: cached functions take a dataset_version (or version) argument")
+        with _lock:
+            _counts.setdefault(name, [layer, 0, 0, 0])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, _hashable(tuple(bound.arguments[p] for p in keyed)))
+            found, value = _lookup(layer, key)
+            if not found:
+                with _lock:
+                    building = _building.setdefault(key, threading.Lock())
+                try:
+                    # Sessions asking for the same entry wait for one computation
+                    with building:
+                        found, value = _lookup(layer, key)
+                        if not found:
+                            value = _compute(func, args, kwargs, spinner)
+                            _store(layer, key, bound.arguments[version_param], value, max_entries)
+                finally:
+                    # A later caller may have registered its own lock once this one was popped
+                    with _lock:
+                        if _building.get(key) is building:
+                            del _building[key]
+            return _copy(value) if copy else value
+
+        return wrapper
+    return decorator
+
+
+def _compute(func, args, kwargs, spinner):
+    if spinner:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            import streamlit as st
+
+            with st.spinner(spinner):
+                return func(*args, **kwargs)
+    return func(*args, **kwargs)
+
+
+# -------------------------------
+# Invalidation
+# -------------------------------
+def dependents(layers):
+    """`layers` and every layer built from them, dependents first."""
+    closed = set(layers)
+    for layer, (parents, _) in LAYERS.items():      # LAYERS lists parents before children
+        if closed & set(parents):
+            closed.add(layer)
+    return [layer for layer in reversed(LAYERS) if layer in closed]
+
+
+def _drop(layers, keep=lambda entry: False):
+    dropped = 0
+    with _lock:
+        for layer in layers:
+            for key, entry in list(_entries[layer].items()):
+                if not keep(entry):
+                    _evict_locked(layer, key)
+                    dropped += 1
+    return dropped
+
+
+def invalidate(*layers):
+    """Drop every entry of `layers` and of the layers built from them; returns the number dropped."""
+    return _drop(dependents(layers or LAYERS))
+
+
+def retire(version):
+    """Drop entries built from any dataset version other than `version`, dependent layers first."""
+    return _drop(dependents(LAYERS), keep=lambda entry: entry.version == version)
+
+
+# -------------------------------
+# Reporting
+# -------------------------------
+def stats():
+    """One row per cached function: layer, entries, MB held, hits, misses, hit rate and evictions."""
+    with _lock:
+        held = {}
+        for layer, entries in _entries.items():
+            for (name, _), entry in entries.items():
+                count, size = held.get(name, (0, 0))
+                held[name] = (count + 1, size + entry.nbytes)
+        rows = [{"layer": layer, "function": name, "entries": held.get(name, (0, 0))[0],
+                 "mb": held.get(name, (0, 0))[1] / 2**20, "hits": hits, "misses": misses,
+                 "evictions": evictions}
+                for name, (layer, hits, misses, evictions) in _counts.items()]
+    frame = pd.DataFrame(rows, columns=["layer", "function", "entries", "mb", "hits", "misses", "evictions"])
+    calls = frame["hits"] + frame["misses"]
+    frame["hit_rate"] = (frame["hits"] / calls.where(calls > 0)).astype(float)
+    order = {layer: i for i, layer in enumerate(LAYERS)}
+    return frame.sort_values(["layer", "function"], key=lambda c: c.map(order) if c.name == "layer" else c,
+                             ignore_index=True)
+
+
+def layer_stats():
+    """One row per layer: entries, MB held against its budget, hits, misses and evictions."""
+    frame = stats().groupby("layer", sort=False)[["entries", "mb", "hits", "misses", "evictions"]].sum()
+    frame = frame.reindex(list(LAYERS), fill_value=0)
+    frame.insert(2, "budget_mb", [BUDGETS[layer] / 2**20 for layer in frame.index])
+    return frame.reset_index()
+
+
+def reset_stats():
+    with _lock:
+        for counts in _counts.values():
+            counts[1:] = [0, 0, 0]
@@ -0,0 +1,257 @@
+"""
+Daily cause lists for every judge, generated offline in one pass.
+
+The cases listed on a day are those heard that day (business_on_date) or, for
+days ahead of the data, whose latest hearing set nexthearingdate to it; the
+query backend returns them joined with their case, one row per case
+(Backend.listed_cases). Their benches are exploded to (hearing, judge) pairs
+(benches.bench_pairs) and one lexsort orders every pair by judge, court hall,
+BoardSrNo, stage and case age, oldest first, so each judge's list is a slice of
+the result. Cases pending longer than LONG_PENDING_DAYS are flagged. Lists are
+written as CSV and HTML to STATE_DIR/cause_lists/<date>/ with an index.csv; the
+judge dashboard opens them instead of building the list.
+
+Run once a day (e.g. from cron) for tomorrow, or for another date:
+
+    python cause_lists.py [--date 2021-01-08]
+"""
+import html
+import logging
+import re
+import shutil
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from db import STATE_DIR
+from profiling import timed
+
+CAUSE_LIST_DIR = STATE_DIR / "cause_lists"
+# NJDG reports cases pending over five years separately
+LONG_PENDING_DAYS = 5 * 365
+
+# Hearing stages in the order they are called; other stages come last
+STAGE_ORDER = ("PRE-ADMISSION", "ADMISSION", "INTERLOCUTARY APPLICATION", "ARGUMENTS", "ORDERS / JUDGMENT",
+               "FINAL DISPOSAL")
+
+# Columns of the merged frame a list is built from (plus the bench columns)
+SOURCE_COLUMNS = ("case_number", "case_type", "date_filed", "courthallnumber", "boardsrno", "remappedstages",
+                  "purposeofhearing", "petitioneradvocate", "respondentadvocate", "business_on_date",
+                  "nexthearingdate")
+# Source column -> list column, in list order
+LIST_COLUMNS = {
+    "courthallnumber": "Court Hall",
+    "boardsrno": "Board Sr No",
+    "case_number": "Case Number",
+    "case_type": "Case Type",
+    "remappedstages": "Stage",
+    "purposeofhearing": "Purpose",
+    "petitioneradvocate": "Petitioner Advocate",
+    "respondentadvocate": "Respondent Advocate",
+    "date_filed": "Filed",
+}
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Listing
+# -------------------------------
+def listed_rows(frame, day, next_dates=None):
+    """
+    Positional rows of a merged frame (grouped by case, hearings oldest first)
+    listed on `day`: one per case, its latest matching hearing. `next_dates` is
+    the parsed nexthearingdate of every row (views.judge_dates).
+    """
+    from views import latest_per_case
+
+    day = np.datetime64(pd.Timestamp(day).normalize(), "ns")
+    listed = np.zeros(len(frame), dtype=bool)
+    if "business_on_date" in frame.columns:
+        listed |= frame["business_on_date"].to_numpy(dtype="datetime64[ns]") == day
+    if next_dates is not None:
+        listed |= next_dates == day
+    return latest_per_case(frame, np.flatnonzero(listed), "case_number")
+
+
+def _whole(values):
+    """Floats as nullable integers, so lists show 12 rather than 12.0."""
+    return pd.array(np.where(np.isnan(values), None, values), dtype="Int64")
+
+
+def _stage_rank(stages):
+    ranks = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+    return pd.Series(stages).map(ranks).fillna(len(STAGE_ORDER)).to_numpy()
+
+
+@timed("cause_lists.build_lists")
+def build_lists(listed, day):
+    """
+    One frame of every judge's list for `day`, ordered by judge then call
+    order, with `Judge`, `Sr No`, `Age (days)` and `Long Pending` columns;
+    empty when nothing is listed or no bench column exists.
+    """
+    from benches import bench_pairs
+
+    pairs = bench_pairs(listed) if len(listed) else None
+    if pairs is None or not len(pairs["rows"]):
+        return pd.DataFrame(columns=["Judge", "Sr No", *LIST_COLUMNS.values(), "Age (days)", "Long Pending"])
+    rows, judges = pairs["rows"], pairs["judges"]
+
+    def numbers(col):
+        if col not in listed.columns:
+            return np.full(len(rows), np.nan)
+        return pd.to_numeric(listed[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)[rows]
+
+    age = np.full(len(rows), np.nan)
+    if "date_filed" in listed.columns:
+        filed = listed["date_filed"].to_numpy(dtype="datetime64[ns]")[rows]
+        age = np.floor((np.datetime64(pd.Timestamp(day).normalize(), "ns") - filed) / np.timedelta64(1, "D"))
+    stage = (_stage_rank(listed["remappedstages"].to_numpy()[rows]) if "remappedstages" in listed.columns
+             else np.zeros(len(rows)))
+    # Last key sorts first; missing halls, board numbers and ages go last
+    order = np.lexsort((-age, stage, numbers("boardsrno"), numbers("courthallnumber"), judges))
+
+    picked = rows[order]
+    table = pd.DataFrame({"Judge": pairs["names"][judges[order]]})
+    starts = np.flatnonzero(np.r_[True, judges[order][1:] != judges[order][:-1]])
+    table["Sr No"] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)])) + 1
+    for col, label in LIST_COLUMNS.items():
+        if col in listed.columns:
+            table[label] = listed[col].to_numpy()[picked]
+    if "Board Sr No" in table.columns:
+        table["Board Sr No"] = _whole(numbers("boardsrno")[order])
+    table["Age (days)"] = _whole(age[order])
+    table["Long Pending"] = age[order] > LONG_PENDING_DAYS
+    return table
+
+
+# -------------------------------
+# Files
+# -------------------------------
+def _file_stem(i, judge):
+    return f"{i:04d}_{re.sub(r'[^A-Z0-9]+', '_', judge.upper()).strip('_')[:60]}"
+
+
+def _cell(value):
+    if pd.isna(value):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return f"{value:%d-%m-%Y}"
+    return html.escape(str(value))
+
+
+def list_html(judge, day, table):
+    """One judge's list as a standalone HTML page, a section per court hall, long-pending rows marked."""
+    columns = [c for c in table.columns if c not in ("Judge", "Long Pending")]
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>Cause List {day:%d-%m-%Y} - {html.escape(judge)}</title>",
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse;width:100%}"
+        "th,td{border:1px solid #ccc;padding:4px 6px;text-align:left}tr.long{background:#fde2e2}</style>",
+        f"</head><body><h1>Cause List for {day:%A, %d %B %Y}</h1><h2>{html.escape(judge)}</h2>",
+    ]
+    halls = table["Court Hall"] if "Court Hall" in table.columns else pd.Series("", index=table.index)
+    for hall, section in table.groupby(halls.fillna(""), sort=False):
+        if hall != "":
+            parts.append(f"<h3>Court Hall {html.escape(str(hall))}</h3>")
+        parts.append("<table><tr>" + "".join(f"<th>{html.escape(c)}</th>" for c in columns) + "</tr>")
+        for long_pending, row in zip(section["Long Pending"], section[columns].itertuples(index=False)):
+            cells = "".join(f"<td>{_cell(v)}</td>" for v in row)
+            parts.append(f"<tr class='long'>{cells}</tr>" if long_pending else f"<tr>{cells}</tr>")
+        parts.append("</table>")
+    parts.append(f"<p>Highlighted: pending over {LONG_PENDING_DAYS // 365} years.</p></body></html>")
+    return "".join(parts)
+
+
+@timed("cause_lists.write_lists")
+def write_lists(table, day, directory=CAUSE_LIST_DIR):
+    """
+    Write each judge's list as CSV and HTML plus index.csv to directory/<date>/,
+    replacing that date's lists at once; returns the index.
+    """
+    day = pd.Timestamp(day)
+    target = directory / f"{day:%Y-%m-%d}"
+    staging = directory / f".{day:%Y-%m-%d}.{time.time_ns()}"
+    staging.mkdir(parents=True)
+    index = []
+    starts = np.flatnonzero(np.r_[True, table["Judge"].to_numpy()[1:] != table["Judge"].to_numpy()[:-1]]) \
+        if len(table) else np.empty(0, dtype=np.int64)
+    for i, (start, end) in enumerate(zip(starts, np.r_[starts[1:], len(table)])):
+        judge = table["Judge"].iloc[start]
+        rows = table.iloc[start:end]
+        stem = _file_stem(i, judge)
+        rows.drop(columns="Judge").to_csv(staging / f"{stem}.csv", index=False)
+        (staging / f"{stem}.html").write_text(list_html(judge, day, rows), encoding="utf-8")
+        halls = rows["Court Hall"].dropna().unique() if "Court Hall" in rows.columns else []
+        index.append({"judge": judge, "court_halls": " ".join(str(h) for h in sorted(halls)),
+                      "cases": end - start, "long_pending": int(rows["Long Pending"].sum()), "file": stem})
+    index = pd.DataFrame(index, columns=["judge", "court_halls", "cases", "long_pending", "file"])
+    index.to_csv(staging / "index.csv", index=False)
+    if target.exists():
+        shutil.rmtree(target)
+    staging.rename(target)
+    return index
+
+
+@timed("cause_lists.generate")
+def generate(day, version=None, directory=CAUSE_LIST_DIR):
+    """Build and write every judge's cause list for `day`; returns the index."""
+    from preprocessing import dataset_version
+    from queries import backend
+
+    listed = backend().listed_cases(version or dataset_version(), pd.Timestamp(day))
+    return write_lists(build_lists(listed, day), day, directory)
+
+
+# -------------------------------
+# Reading (judge dashboard)
+# -------------------------------
+def list_dates(directory=CAUSE_LIST_DIR):
+    """Dates with generated lists, oldest first."""
+    if not directory.exists():
+        return []
+    return sorted(date.fromisoformat(p.name) for p in directory.iterdir()
+                  if p.is_dir() and re.fullmatch(r"\d{4}-\d{2}-\d{2}", p.name))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _read_index(path, mtime_ns):
+    return pd.read_csv(path, dtype={"judge": str, "court_halls": str, "file": str})
+
+
+def judge_lists(day, names, directory=CAUSE_LIST_DIR):
+    """
+    [(index row, CSV path, HTML path)] of the lists generated for `day` under
+    any of `names` (normalized spellings of one judge).
+    """
+    path = directory / f"{day:%Y-%m-%d}" / "index.csv"
+    if not path.exists():
+        return []
+    index = _read_index(str(path), path.stat().st_mtime_ns)
+    return [(row, path.parent / f"{row.file}.csv", path.parent / f"{row.file}.html")
+            for row in index[index["judge"].isin(names)].itertuples(index=False)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today() + timedelta(days=1),
+                        help="list date (default: tomorrow)")
+    args = parser.parse_args()
+
+    from preprocessing import dataset_version, sync_store
+
+    start = time.perf_counter()
+    version = dataset_version()
+    # A standalone run has no warm-up to bring the partition store up to date
+    sync_store(version)
+    index = generate(args.date, version)
+    logger.info("cause_lists.generate date=%s judges=%d cases=%d long_pending=%d seconds=%.2f",
+                args.date, len(index), index["cases"].sum(), index["long_pending"].sum(),
+                time.perf_counter() - start)
@@ -0,0 +1,19 @@
+"""
+Plotly figures cached per chart, filter selection and dataset version.
+
+Building a figure with plotly express takes tens of milliseconds per chart,
+repeated on every rerun of Analytics and the judge dashboard. Pages pass the
+builder to figure() along with every filter value the chart depends on, so a
+repeated selection gets the built figure from the "chart" layer of caches.py
+and Streamlit only serializes it. Figures are shared between sessions and are
+not modified after building. Entries are sized by the JSON sent to the browser
+and bounded by the layer's budget (NYAYADRISHTI_CACHE_MB, e.g. chart=256);
+they are dropped with the dataset version or the aggregates they come from.
+"""
+from caches import cached
+
+
+@cached("chart")
+def figure(chart, selection, dataset_version, _build):
+    """The figure `_build()` returns for `chart`; `selection` holds every value it depends on (hashable)."""
+    return _build()
@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Where runtime state (passwords, sessions, notes) lives; override to run isolated instances
+STATE_DIR = Path(os.environ.get("NYAYADRISHTI_STATE_DIR", Path(__file__).parent))
+
+# Per-thread connections, keyed by database path
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def connect(db_path, init_schema=None) -> sqlite3.Connection:
+    """
+    Return this thread's WAL-mode connection to db_path, creating it on first use.
+
+    `init_schema(conn)` runs once per process per database path.
+    """
+    db_path = str(db_path)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is not None:
+        return conn
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=10.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    if init_schema is not None:
+        with _schema_lock:
+            if db_path not in _schema_ready:
+                init_schema(conn)
+                _schema_ready.add(db_path)
+    conns[db_path] = conn
+    return conn
@@ -0,0 +1,250 @@
+"""
+Streaming exports of filtered views to CSV or Parquet.
+
+A page hands export_panel() a function returning Arrow record batches, either
+frame_batches() over a shared frame and a row array, or a query backend's
+table_batches() reading a query result chunk by chunk. A worker thread writes
+the batches to STATE_DIR/exports with pyarrow's CSV / Parquet writers as they
+arrive, so one chunk is held at a time and the file is never built as one
+string. The job checks its cancel event between chunks; a cancelled or failed
+export leaves no file behind. Finished files are offered for download and
+removed after KEEP_SECONDS.
+
+Environment:
+    NYAYADRISHTI_EXPORT_WORKERS=2          exports written at once (more wait in a queue)
+    NYAYADRISHTI_EXPORT_DOWNLOAD_MB=200    larger files are left on the server instead of downloaded
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import streamlit as st
+
+from db import STATE_DIR
+from profiling import timed
+
+EXPORT_DIR = STATE_DIR / "exports"
+EXPORT_WORKERS = int(os.environ.get("NYAYADRISHTI_EXPORT_WORKERS", 2))
+DOWNLOAD_MB = float(os.environ.get("NYAYADRISHTI_EXPORT_DOWNLOAD_MB", 200))
+# Rows per chunk read, converted and written
+CHUNK_ROWS = 65_536
+# Finished exports are deleted after a day
+KEEP_SECONDS = 24 * 3600
+
+FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet")}
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Sources
+# -------------------------------
+def frame_batches(frame, rows=None, columns=None, chunk_rows=CHUNK_ROWS):
+    """
+    Record batches of `rows` (positional; every row when None) of `frame`,
+    limited to `columns`; only one chunk is materialised at a time.
+    """
+    if columns is not None:
+        frame = frame.iloc[:, frame.columns.get_indexer(columns)]
+    rows = np.arange(len(frame)) if rows is None else np.asarray(rows)
+    # One schema for every chunk: a chunk of missing values must not change a column's type
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema],
+                       metadata=schema.metadata)
+    # An empty selection still gives one (empty) batch, so the file has a header / schema
+    for start in range(0, max(len(rows), 1), chunk_rows):
+        # Arrow-backed columns of a frame concatenated from partitions have several chunks,
+        # which RecordBatch.from_pandas() rejects; a table takes them and is combined per chunk
+        table = pa.Table.from_pandas(frame.take(rows[start:start + chunk_rows]), schema=schema, preserve_index=False)
+        yield from table.combine_chunks().to_batches() or [pa.RecordBatch.from_pylist([], schema=schema)]
+
+
+def write_batches(batches, path, fmt, cancel=None, progress=None):
+    """
+    Write record batches to `path` as `fmt` ("CSV" / "Parquet") one at a time;
+    returns the rows written, or None when `cancel` was set first (no file is
+    left). `progress(rows)` is called after each batch.
+    """
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    partial = path.with_name(path.name + ".part")
+    writer, written = None, 0
+    try:
+        for batch in batches:
+            if cancel is not None and cancel.is_set():
+                return None
+            if writer is None:
+                writer = (pa_csv.CSVWriter(partial, batch.schema) if fmt == "CSV"
+                          else pq.ParquetWriter(partial, batch.schema))
+            writer.write_batch(batch)
+            written += batch.num_rows
+            if progress is not None:
+                progress(written)
+        if cancel is not None and cancel.is_set():
+            return None
+        if writer is None:
+            # Nothing matched: an empty file rather than none
+            partial.write_bytes(b"")
+        else:
+            writer.close()
+            writer = None
+        partial.replace(path)
+        return written
+    finally:
+        if writer is not None:
+            writer.close()
+        if hasattr(batches, "close"):
+            batches.close()
+        partial.unlink(missing_ok=True)
+
+
+# -------------------------------
+# Jobs
+# -------------------------------
+class ExportJob:
+    def __init__(self, label, fmt, total=None):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.fmt = fmt
+        self.total = total
+        self.rows = 0
+        self.state = "queued"        # queued -> running -> done (or cancelled, failed)
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        extension = FORMATS[fmt][0]
+        self.file_name = f"{label.lower().replace(' ', '_')}.{extension}"
+        self.path = EXPORT_DIR / f"{self.id}.{extension}"
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    def cancel(self):
+        self._cancel.set()
+
+    def size_mb(self):
+        return self.path.stat().st_size / 2**20 if self.state == "done" else 0.0
+
+    @timed("exports.run")
+    def run(self, batches):
+        if self._cancel.is_set():
+            self.state, self.finished = "cancelled", time.time()
+            return
+        self.state = "running"
+        try:
+            written = write_batches(batches(), self.path, self.fmt, self._cancel,
+                                    lambda rows: setattr(self, "rows", rows))
+            self.state = "cancelled" if written is None else "done"
+        except Exception as e:
+            self.state, self.error = "failed", repr(e)
+            logger.exception("exports.run failed label=%s", self.label)
+        self.finished = time.time()
+        logger.info("exports.%s label=%s rows=%d seconds=%.1f", self.state, self.label, self.rows,
+                    self.finished - self.started)
+
+
+class ExportQueue:
+    """The process's export jobs, written by a small pool of worker threads."""
+
+    def __init__(self, workers=EXPORT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, label, fmt, batches, total=None):
+        """Queue an export of the record batches `batches()` returns; returns its ExportJob."""
+        self.prune()
+        job = ExportJob(label, fmt, total)
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._pool.submit(job.run, batches)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def prune(self, keep_seconds=KEEP_SECONDS):
+        """Forget finished jobs older than `keep_seconds` and delete their files."""
+        cutoff = time.time() - keep_seconds
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if not job.active and job.finished < cutoff:
+                    del self._jobs[job_id]
+        if EXPORT_DIR.exists():
+            for path in EXPORT_DIR.iterdir():
+                # .part files are being written, possibly by another process's queue
+                if path.suffix == ".part":
+                    continue
+                # Another process may prune or rename the same file meanwhile
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+@st.cache_resource(show_spinner=False)
+def export_queue():
+    """The process-wide export queue."""
+    return ExportQueue()
+
+
+# -------------------------------
+# Page control
+# -------------------------------
+def export_panel(key, label, batches, total=None):
+    """
+    Format picker and Export button for one view; `batches` is called on the
+    worker thread. While the export runs the panel polls its progress (with a
+    Cancel button) without rerunning the page, then offers the file.
+    """
+    state_key = f"export_{key}"
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", list(FORMATS), key=f"{state_key}_format", label_visibility="collapsed")
+    queue = export_queue()
+    if col2.button(f"Export {label}", key=f"{state_key}_start"):
+        previous = queue.get(st.session_state.get(state_key))
+        if previous is not None:
+            previous.cancel()
+        st.session_state[state_key] = queue.submit(label, fmt, batches, total).id
+
+    job = queue.get(st.session_state.get(state_key))
+    if job is None:
+        return
+    if job.active:
+        _export_progress(job, state_key)
+    elif job.state == "done":
+        size = job.size_mb()
+        if size <= DOWNLOAD_MB:
+            # Read from disk only when the download is clicked
+            st.download_button(f"Download {job.file_name} ({job.rows:,} rows, {size:.1f} MB)",
+                               data=job.path.read_bytes, file_name=job.file_name,
+                               mime=FORMATS[job.fmt][1], key=f"{state_key}_download")
+        else:
+            st.info(f"{job.rows:,} rows ({size:.0f} MB) exported to {job.path} on the server; "
+                    f"files above {DOWNLOAD_MB:.0f} MB are not sent through the browser.")
+    elif job.state == "cancelled":
+        st.info("Export cancelled.")
+    else:
+        st.error(f"Export failed: {job.error}")
+
+
+@st.fragment(run_every=1.0)
+def _export_progress(job, state_key):
+    if not job.active:
+        # Rerun the page once to show the result
+        st.rerun()
+    done = f"{job.rows:,}" + (f" of {job.total:,}" if job.total else "")
+    st.progress(min(job.rows / job.total, 1.0) if job.total else 0.0,
+                text=f"Exporting {job.label} as {job.fmt}: {done} rows")
+    if st.button("Cancel export", key=f"{state_key}_cancel"):
+        job.cancel()
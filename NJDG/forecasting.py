@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from caches import cached
+from preprocessing import case_attributes
+from profiling import timed
+
+# -------------------------------
+# Series definition
+# -------------------------------
+SERIES_KEYS = ["courtname", "courthallnumber", "casetype"]
+
+SEASON = 12
+HORIZON = 12
+
+# Smoothing constants for the additive Holt-Winters fit (level, trend, season)
+ALPHA, BETA, GAMMA = 0.3, 0.05, 0.2
+
+
+# -------------------------------
+# Monthly filing / disposal counts
+# -------------------------------
+def monthly_counts(cases, hearings):
+    """
+    Monthly filing and disposal counts for every (bench, court hall, case type).
+
+    Returns (keys, months, filings, disposals) where `filings` and `disposals`
+    are (n_series, n_months) arrays aligned with the rows of `keys`.
+    """
+    frame = cases[["cnr_number", "date_filed", "decision_date"]]
+    if "casetype" not in cases.columns and "case_type" in cases.columns:
+        frame = frame.assign(casetype=cases["case_type"])
+    frame = case_attributes(frame, hearings, SERIES_KEYS)
+    for key in SERIES_KEYS:
+        if key not in frame.columns:
+            frame = frame.assign(**{key: "All"})
+    frame = frame[frame["date_filed"].notna()]
+
+    # Month ordinals (year * 12 + month) keep the bucketing in integer arrays
+    filed = (frame["date_filed"].dt.year * 12 + frame["date_filed"].dt.month - 1).to_numpy()
+    decided = (frame["decision_date"].dt.year * 12 + frame["decision_date"].dt.month - 1).to_numpy()
+    start = int(np.nanmin(filed))
+    end = int(np.nanmax(np.concatenate([filed, decided])))
+    n_months = end - start + 1
+    months = pd.period_range(pd.Period(year=start // 12, month=start % 12 + 1, freq="M"),
+                             periods=n_months, freq="M")
+
+    key_frame = frame[SERIES_KEYS].astype(str)
+    codes, keys = pd.factorize(pd.MultiIndex.from_frame(key_frame), sort=True)
+    n_series = len(keys)
+
+    def _count(ordinals):
+        mask = ~np.isnan(ordinals)
+        flat = codes[mask] * n_months + (ordinals[mask].astype(np.int64) - start)
+        return np.bincount(flat, minlength=n_series * n_months).reshape(n_series, n_months)
+
+    filings = _count(filed.astype(np.float64))
+    disposals = _count(decided.astype(np.float64))
+    keys = pd.DataFrame(list(keys), columns=SERIES_KEYS)
+    return keys, months, filings.astype(np.float64), disposals.astype(np.float64)
+
+
+def monthly_arrays(filed, decided):
+    """
+    monthly_counts() output from counts aggregated elsewhere (e.g. in the query engine).
+
+    `filed` and `decided` have the SERIES_KEYS (as strings), a month ordinal
+    (year * 12 + month - 1) and `n`; `decided` only counts cases with a filing date.
+    """
+    start = int(filed["month"].min())
+    end = int(max(filed["month"].max(), decided["month"].max() if len(decided) else start))
+    n_months = end - start + 1
+    months = pd.period_range(pd.Period(year=start // 12, month=start % 12 + 1, freq="M"),
+                             periods=n_months, freq="M")
+
+    index = pd.MultiIndex.from_frame(filed[SERIES_KEYS])
+    codes, keys = pd.factorize(index, sort=True)
+    n_series = len(keys)
+    position = pd.Series(np.arange(n_series), index=keys)
+
+    def _count(counts, series):
+        flat = series * n_months + (counts["month"].to_numpy(dtype=np.int64) - start)
+        return np.bincount(flat, weights=counts["n"].to_numpy(dtype=np.float64),
+                           minlength=n_series * n_months).reshape(n_series, n_months)
+
+    filings = _count(filed, codes)
+    decided_series = position.reindex(pd.MultiIndex.from_frame(decided[SERIES_KEYS])).to_numpy(dtype=np.int64)
+    disposals = _count(decided, decided_series)
+    keys = pd.DataFrame(list(keys), columns=SERIES_KEYS)
+    return keys, months, filings, disposals
+
+
+# -------------------------------
+# Batched seasonal forecast
+# -------------------------------
+def holt_winters_batch(Y, horizon=HORIZON, season=SEASON, alpha=ALPHA, beta=BETA, gamma=GAMMA):
+    """
+    Additive Holt-Winters forecast for every row of Y at once.
+
+    The time loop runs once over the months; each step updates level, trend and
+    seasonal state for all series with array operations, so cost grows with the
+    number of months, not with the number of courts. Series shorter than two
+    seasons fall back to level + trend only. Forecasts are clipped at zero.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    n_series, n_months = Y.shape
+    if n_months == 0:
+        return np.zeros((n_series, horizon))
+
+    seasonal_fit = n_months >= 2 * season
+    if seasonal_fit:
+        level = Y[:, :season].mean(axis=1)
+        trend = (Y[:, season:2 * season].mean(axis=1) - level) / season
+        seasonal = Y[:, :season] - level[:, None]
+    else:
+        season, gamma = 1, 0.0
+        level = Y[:, 0].copy()
+        trend = np.zeros(n_series)
+        seasonal = np.zeros((n_series, 1))
+
+    for t in range(n_months):
+        s = seasonal[:, t % season]
+        prev_level = level
+        level = alpha * (Y[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        seasonal[:, t % season] = gamma * (Y[:, t] - level) + (1 - gamma) * s
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_months + steps - 1) % season
+    forecast = level[:, None] + trend[:, None] * steps[None, :] + seasonal[:, season_idx]
+    return np.clip(forecast, 0, None)
+
+
+# -------------------------------
+# Cached backlog projection
+# -------------------------------
+@timed("forecasting.backlog_forecast")
+@cached("model", max_entries=16, copy=True, spinner="Forecasting filings and disposals...")
+def backlog_forecast(_cases, _hearings, dataset_version, selection=None, horizon=HORIZON):
+    """
+    Filings, disposals and pending backlog per series, history plus forecast,
+    or None when no case has a filing date.
+
+    Cached per dataset version and the partition selection `_cases` was read
+    with; every series is fitted in the same batch.
+    """
+    if not _cases["date_filed"].notna().any():
+        return None
+    return forecast_series(*monthly_counts(_cases, _hearings), horizon=horizon)
+
+
+def forecast_series(keys, months, filings, disposals, horizon=HORIZON):
+    """Holt-Winters projection of monthly filings, disposals and pending cases for every series."""
+    filings_fc = holt_winters_batch(filings, horizon)
+    disposals_fc = holt_winters_batch(disposals, horizon)
+
+    pending = np.cumsum(filings - disposals, axis=1)
+    last_pending = pending[:, -1] if pending.shape[1] else np.zeros(len(keys))
+    pending_fc = np.clip(
+        last_pending[:, None] + np.cumsum(filings_fc - disposals_fc, axis=1), 0, None
+    )
+
+    future = pd.period_range(months[-1] + 1, periods=horizon, freq="M")
+    return {
+        "keys": keys,
+        "months": months.to_timestamp(),
+        "future": future.to_timestamp(),
+        "filings": filings,
+        "disposals": disposals,
+        "pending": pending,
+        "filings_forecast": filings_fc,
+        "disposals_forecast": disposals_fc,
+        "pending_forecast": pending_fc,
+    }
+
+
+def projection_frame(forecast, rows=None):
+    """Long frame of history and forecast for the selected series rows (all when None)."""
+    rows = slice(None) if rows is None else rows
+
+    def _sum(name):
+        return np.atleast_2d(forecast[name][rows]).sum(axis=0)
+
+    history = pd.DataFrame({
+        "month": forecast["months"],
+        "Filings": _sum("filings"),
+        "Disposals": _sum("disposals"),
+        "Pending": _sum("pending"),
+        "kind": "Actual",
+    })
+    projected = pd.DataFrame({
+        "month": forecast["future"],
+        "Filings": _sum("filings_forecast"),
+        "Disposals": _sum("disposals_forecast"),
+        "Pending": _sum("pending_forecast"),
+        "kind": "Forecast",
+    })
+    return pd.concat([history, projected], ignore_index=True)
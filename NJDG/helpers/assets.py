@@ -0,0 +1,191 @@
+"""
+Static assets shared by the pages: the logo as a data URI and the big CSS blocks.
+
+Each is built once per server process instead of re-reading and
+re-encoding logo.png on every rerun.
+"""
+import base64
+from functools import lru_cache
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+LOGO_PATH = BASE_DIR / "logo.png"
+
+# -------------------------------
+# CSS
+# -------------------------------
+SIDEBAR_CSS = """
+[data-testid="stSidebar"] {
+    background-color: #F8FAFC !important;
+}
+
+[data-testid="stSidebar"] * {
+    color: black !important;
+}
+
+/* Hide Streamlit's default page nav */
+[data-testid="stSidebar"] nav,
+[data-testid="stSidebarNav"],
+[data-testid="stVerticalNav"],
+nav[aria-label="Page navigation"] {
+    display: none !important;
+}
+
+/* Sidebar buttons */
+[data-testid="stSidebar"] .stButton > button {
+    width: 100% !important;
+    padding: 10px 14px !important;
+    text-align: left !important;
+    border-radius: 8px !important;
+    background-color: transparent !important;
+    color: black !important;
+    font-weight: 500;
+}
+
+[data-testid="stSidebar"] .stButton {
+    margin-bottom: 8px !important;
+}
+[data-testid="stSidebar"] img {
+    position: fixed;  /* keep the logo in place while scrolling */
+    top: 20px;
+    left: 22px;
+    width: 72px;
+    z-index: 9999;
+}
+"""
+
+HOME_CSS = """
+/* Remove default Streamlit top padding */
+header[data-testid="stHeader"] {
+    background: none !important;
+    height: 0px !important;
+}
+
+/* Hide Streamlit sidebar COMPLETELY */
+[data-testid="stSidebar"], [data-testid="stSidebarNav"] {
+    display: none !important;
+}
+ 
+/* Make page background clean */
+.stApp {
+    background-color: #F8FAFC !important;
+    padding-top: 0 !important;
+}
+
+/* Top-left logo */
+#top-left-logo {
+    position: fixed;  /* keep the logo in place while scrolling */
+    top: 20px;
+    left: 22px;
+    width: 72px;
+    z-index: 9999;
+}
+
+/* Login button style */
+[data-testid="stButton"] button {
+    background-color: #0F172A !important;
+    color: #F8FAFC !important;         /* text color */
+    border-radius: 8px !important;
+    padding: 8px 18px !important;
+    border: 1px solid #1E293B !important;
+}
+
+[data-testid="stButton"] button:hover {
+    background-color: #1B2A41 !important;
+    color: white !important;
+}
+
+/* Feature Cards */
+.feature-card {
+    background: #152035;
+    border-radius: 16px;
+    padding: 28px;
+    border: 1px solid #0F172A;
+    height: 200px;
+
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+    align-items: center;
+
+    color: #F5E6C8 !important;
+    text-align: center;
+    font-family: 'Inter', sans-serif;
+
+    transition: 0.2s;
+}
+
+.feature-card:hover {
+    background: #1C2A42;
+    cursor: pointer;
+}
+
+/* Feature Title */
+.feature-title {
+    font-size: 22px;
+    font-weight: 700;
+    margin-bottom: 8px;
+    color: #F8FAFC !important;
+}
+
+/* Feature Description */
+.feature-desc {
+    font-size: 15px;
+    color: #F1F5F9 !important;
+}
+
+/* Remove underline from links */
+a {
+    text-decoration: none !important;
+}
+
+/* Stats cards */
+.stat-card {
+    background: white;
+    border-radius: 14px;
+    padding: 22px;
+    border: 1px solid #E2E8F0;
+    text-align:center;
+}
+
+.stat-title {
+    color:#64748B;
+    font-size:14px;
+}
+
+.stat-value {
+    color:#0F172A;
+    font-size:22px;
+    font-weight:bold;
+}
+"""
+
+
+# -------------------------------
+# Built once per process
+# -------------------------------
+@lru_cache(maxsize=None)
+def logo_data_uri():
+    """logo.png as a base64 data URI ("" if the file is missing)."""
+    if not LOGO_PATH.exists():
+        return ""
+    return "data:image/png;base64," + base64.b64encode(LOGO_PATH.read_bytes()).decode()
+
+
+def _with_logo(css):
+    return f"""<style>
+{css}</style>
+
+<!-- Top-left logo -->
+<img id="top-left-logo" src="{logo_data_uri()}">
+"""
+
+
+@lru_cache(maxsize=None)
+def sidebar_html():
+    return _with_logo(SIDEBAR_CSS)
+
+
+@lru_cache(maxsize=None)
+def home_html():
+    return _with_logo(HOME_CSS)
@@ -1,64 +1,9 @@
 import streamlit as st
-from pathlib import Path
-import base64
-from streamlit_cookies_manager import EncryptedCookieManager
-
-# Load logo
-base_dir = Path(__file__).parent.parent
-logo_path = base_dir / "logo.png"
-
-logo_b64 = ""
-if logo_path.exists():
-    with open(logo_path, "rb") as f:
-        logo_bytes = f.read()
-    logo_b64 = base64.b64encode(logo_bytes).decode()
+from helpers.assets import sidebar_html
+from profiling import is_admin
 
 def render_sidebar():
-    st.sidebar.markdown(f"""
-    <style>
-    [data-testid="stSidebar"] {{
-        background-color: #F8FAFC !important;
-    }}
-
-    [data-testid="stSidebar"] * {{
-        color: black !important;
-    }}
-
-    /* Hide Streamlit's default page nav */
-    [data-testid="stSidebar"] nav,
-    [data-testid="stSidebarNav"],
-    [data-testid="stVerticalNav"],
-    nav[aria-label="Page navigation"] {{
-        display: none !important;
-    }}
-
-    /* Sidebar buttons */
-    [data-testid="stSidebar"] .stButton > button {{
-        width: 100% !important;
-        padding: 10px 14px !important;
-        text-align: left !important;
-        border-radius: 8px !important;
-        background-color: transparent !important;
-        color: black !important;
-        font-weight: 500;
-    }}
-
-    [data-testid="stSidebar"] .stButton {{
-        margin-bottom: 8px !important;
-    }}
-    [data-testid="stSidebar"] img {{
-        position: fixed;  /* keep the logo in place while scrolling */
-        top: 20px;
-        left: 22px;
-        width: 72px;
-        z-index: 9999;
-    }}
-
-    </style>
-
-    <!-- Top-left logo -->
-    <img id="top-left-logo" src="data:image/png;base64,{logo_b64}">
-    """, unsafe_allow_html=True)
+    st.sidebar.markdown(sidebar_html(), unsafe_allow_html=True)
 
     st.sidebar.header("Navigation")
 
@@ -93,6 +38,10 @@ def render_sidebar():
     if st.sidebar.button("Analytics"):
         st.switch_page("pages/Analytics.py")
 
+    if st.session_state.get("authenticated") and is_admin(st.session_state.get("user_name")):
+        if st.sidebar.button("Diagnostics"):
+            st.switch_page("pages/Diagnostics.py")
+
     st.sidebar.markdown("---")
 
     if st.session_state.get("authenticated"):
@@ -115,9 +64,12 @@ def render_sidebar():
             st.session_state.authenticated = False
             st.session_state.user_role = None
             st.session_state.user_name = None
+            st.session_state.account = None
 
             # Clear cookies (if available) by deleting keys so they don't auto-login
             try:
+                # Only needed here; pages that log in import it themselves
+                from streamlit_cookies_manager import EncryptedCookieManager
                 cookies = EncryptedCookieManager(
                     prefix="nyayadrishti_",
                     password="super_secret_password_here"
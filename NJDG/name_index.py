@@ -0,0 +1,126 @@
+"""
+Character trigram index over every distinct judge and advocate name.
+
+NJDG spells one person several ways ("NAGARAJ  PATIL ", "B.A.PATIL" /
+"B.A. PATIL"). Names are grouped into identities by match_key(), which drops
+case, punctuation and repeated spaces, and an exact key match resolves a
+typed name to every spelling of it. Other names are ranked by the Dice
+similarity of their trigrams: the query's trigrams are looked up in sorted
+posting lists and the shared counts summed with one bincount, so a search
+touches only the names sharing a trigram and takes well under a millisecond.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from profiling import timed
+
+NGRAM = 3
+# Candidates scoring lower are not suggested
+MIN_SCORE = 0.4
+
+
+def match_key(name):
+    """Upper-case alphanumeric words of `name` joined by single spaces: 'B.A. Patil' -> 'B A PATIL'."""
+    return " ".join(re.findall(r"[A-Z0-9]+", str(name).upper()))
+
+
+def gram_codes(keys):
+    """
+    (owners, codes): the distinct trigrams of each key as integers (three ASCII
+    bytes), keys padded with a space so first and last letters count. Sorted
+    by owner, then code.
+    """
+    padded = [f" {key} " for key in keys]
+    lengths = np.array([len(p) for p in padded], dtype=np.int64)
+    if not len(padded) or lengths.sum() < NGRAM:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    text = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(np.int64)
+    codes = (text[:-2] << 16) | (text[1:-1] << 8) | text[2:]
+    owners = np.repeat(np.arange(len(padded)), lengths)[:-2]
+    # Drop trigrams spanning two keys
+    starts = np.cumsum(lengths) - lengths
+    inside = np.arange(len(codes)) - starts[owners] <= lengths[owners] - NGRAM
+    pairs = np.unique((owners[inside] << 24) | codes[inside])
+    return pairs >> 24, pairs & 0xFFFFFF
+
+
+class NameIndex:
+    """
+    Identities built from a frame of (name, role, hearings) rows, one per
+    normalized name and role (user_directory.directory_frame()).
+    """
+
+    def __init__(self, names):
+        names = names.assign(key=names["name"].map(match_key))
+        names = names[names["key"] != ""]
+        codes, self.keys = pd.factorize(names["key"], sort=True)
+        self.keys = np.asarray(self.keys, dtype=object)
+        n = len(self.keys)
+
+        # Display name: the spelling with the most hearings
+        totals = names.assign(code=codes).groupby(["code", "name"], sort=False)["hearings"].sum()
+        totals = totals.reset_index().sort_values(["code", "hearings", "name"], ascending=[True, False, True])
+        spellings = totals["name"].to_numpy(dtype=object)
+        starts = np.searchsorted(totals["code"].to_numpy(), np.arange(n + 1))
+        self.variants = [tuple(spellings[starts[i]:starts[i + 1]]) for i in range(n)]
+        self.display = spellings[starts[:-1]]
+        self.hearings = np.bincount(codes, weights=names["hearings"].to_numpy(), minlength=n)
+        self.roles = {role: np.bincount(codes[(names["role"] == role).to_numpy()], minlength=n) > 0
+                      for role in names["role"].unique()}
+
+        # Posting lists: the keys containing each distinct trigram
+        owners, codes = gram_codes(self.keys)
+        self.gram_counts = np.bincount(owners, minlength=n)
+        order = np.argsort(codes, kind="stable")
+        self.grams, starts = np.unique(codes[order], return_index=True)
+        self.offsets = np.append(starts, len(codes))
+        self.postings = owners[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _identity(self, i, score=1.0):
+        return {"name": self.display[i], "key": self.keys[i], "variants": self.variants[i], "hearings": int(self.hearings[i]),
+                "score": float(score)}
+
+    def resolve(self, name, role=None):
+        """The identity `name` is a spelling of ({"name", "key", "variants", ...}), or None."""
+        key = match_key(name)
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        if role is not None and not self.roles.get(role, np.zeros(len(self), bool))[i]:
+            return None
+        return self._identity(i)
+
+    def search(self, name, role=None, limit=5, min_score=MIN_SCORE):
+        """Identities ranked by trigram similarity to `name` (best first, then most hearings)."""
+        key = match_key(name)
+        # One or two characters would match any name starting with them
+        if len(key) < NGRAM:
+            return []
+        grams = gram_codes([key])[1]
+        pos = np.searchsorted(self.grams, grams)
+        pos = pos[(pos < len(self.grams)) & (self.grams[np.minimum(pos, len(self.grams) - 1)] == grams)]
+        if not len(pos):
+            return []
+        owners = np.concatenate([self.postings[self.offsets[p]:self.offsets[p + 1]] for p in pos])
+        shared = np.bincount(owners, minlength=len(self))
+        candidates = np.flatnonzero(shared)
+        if role is not None:
+            candidates = candidates[self.roles.get(role, np.zeros(len(self), bool))[candidates]]
+        scores = 2 * shared[candidates] / (len(grams) + self.gram_counts[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        best = np.lexsort((-self.hearings[candidates], -scores))[:limit]
+        return [self._identity(i, s) for i, s in zip(candidates[best], scores[best])]
+
+
+@timed("name_index.load_name_index")
+@cached("index", max_entries=4)
+def load_name_index(dataset_version, backend_name, _names):
+    """NameIndex over the frame `_names()` returns, built once per dataset version and backend."""
+    return NameIndex(_names())
@@ -1,13 +1,17 @@
 import streamlit as st
-import pandas as pd
-from preprocessing import load_data, clean_cases
+from preprocessing import dataset_version
+from predictor import REQUIRED_COLS, rule_predict, lookup_errors, best_weights
+from queries import backend
 from helpers.sidebar import render_sidebar
+from profiling import begin_page, span
+from warmup import wait_until_ready
 
 st.set_page_config(
     page_title="AI Predictions",
     layout="wide",
     initial_sidebar_state="expanded",
 )
+begin_page("AI Predictions")
 
 st.markdown("""
 <style>
@@ -25,36 +29,53 @@ render_sidebar()
 
 st.title("AI predictions")
 
-# Load and clean data
-cases, hearings = load_data()
-cases = clean_cases(cases)
+wait_until_ready()
 
-required_cols = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
-missing = [col for col in required_cols if col not in cases.columns]
+db = backend()
+version = dataset_version()
+
+missing = [col for col in REQUIRED_COLS if col not in db.columns(version, "cases")]
 
 if missing:
     st.error(f"Missing columns in cases DataFrame: {missing}")
 else:
-    hearing_weight = st.slider("Days per hearing", 10, 50, 20)
-    year_weight = st.slider("Year effect (days)", 5, 30, 10)
-    baseline = st.slider("Baseline days", 50, 200, 100)
+    # Errors for the whole slider grid are computed once per dataset version
+    surface = db.error_surface(version)
+    best_h, best_y, best_b = best_weights(surface)
 
-    # Rule-based prediction
-    cases["predicted_disposal"] = (
-        cases["total_hearings"] * hearing_weight +
-        (cases["filing_year"] - cases["filing_year"].min()) * year_weight +
-        baseline
-    )
+    def _apply_best_fit():
+        st.session_state.hearing_weight = best_h
+        st.session_state.year_weight = best_y
+        st.session_state.baseline = best_b
+
+    st.session_state.setdefault("hearing_weight", 20)
+    st.session_state.setdefault("year_weight", 10)
+    st.session_state.setdefault("baseline", 100)
 
-    st.subheader("Disposal Time Predictions (Rule-Based)")
-    st.write(
-        cases[["cnr_number", "total_hearings", "disposal_days", "predicted_disposal"]]
-        .head(20)
+    hearing_weight = st.slider("Days per hearing", 10, 50, key="hearing_weight")
+    year_weight = st.slider("Year effect (days)", 5, 30, key="year_weight")
+    baseline = st.slider("Baseline days", 50, 200, key="baseline")
+
+    st.button(
+        f"Use best-fit weights ({best_h} days/hearing, {best_y} days/year, {best_b} baseline)",
+        on_click=_apply_best_fit,
     )
 
-    # Line chart comparison
-    st.line_chart(cases[["disposal_days", "predicted_disposal"]])
+    # Rule-based prediction
+    with span("chart.ai_predictions.comparison"):
+        # The first PREDICTION_ROWS cases, with the dataset's earliest filing year for the year effect
+        cases, first_year = db.prediction_rows(version)
+        predictions = cases[["cnr_number", "total_hearings", "disposal_days"]].assign(
+            predicted_disposal=rule_predict(cases, hearing_weight, year_weight, baseline, first_year)
+        )
+
+        st.subheader("Disposal Time Predictions (Rule-Based)")
+        st.write(predictions.head(20))
+
+        # Line chart comparison
+        st.line_chart(predictions[["disposal_days", "predicted_disposal"]])
 
-    from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
-    st.success(f"Mean Absolute Error: {mae:.2f} days")
+    mae, rmse = lookup_errors(surface, hearing_weight, year_weight, baseline)
+    best_mae, best_rmse = lookup_errors(surface, best_h, best_y, best_b)
+    st.success(f"Mean Absolute Error: {mae:.2f} days  |  RMSE: {rmse:.2f} days")
+    st.caption(f"Best fit on the slider grid: MAE {best_mae:.2f} days, RMSE {best_rmse:.2f} days")
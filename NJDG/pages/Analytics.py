@@ -1,14 +1,23 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from preprocessing import dataset_version
+from partitions import partition_index
+from queries import backend
+from survival import GROUP_COLUMNS
+from adjournments import DIMENSIONS, MIN_HEARINGS
+from charts import figure
+from exports import export_panel
+from forecasting import projection_frame
 from helpers.sidebar import render_sidebar
+from profiling import begin_page, span
+from warmup import wait_until_ready
 
 st.set_page_config(
     page_title="Analytics",
     layout="wide",
     initial_sidebar_state="expanded",
 )
+begin_page("Analytics")
 
 st.markdown("""
 <style>
@@ -63,15 +72,28 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 render_sidebar()
+wait_until_ready()
 
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-merged = merge_data(cases, hearings)
+db = backend()
+version = dataset_version()
 
 st.sidebar.header("Filters")
 
-years = sorted(cases["filing_year"].dropna().unique())
+# State and bench options come from the partition store's directory tree;
+# the pickers only appear once more than one court / bench is loaded
+stored = partition_index(version)
+states = sorted(stored["state"].unique())
+selected_states = (
+    st.sidebar.multiselect("Select States", states, default=states)
+    if len(states) > 1 else states
+)
+benches = sorted(stored.loc[stored["state"].isin(selected_states or states), "bench"].unique())
+selected_benches = (
+    st.sidebar.multiselect("Select Benches", benches, default=benches)
+    if len(benches) > 1 else benches
+)
+
+years = db.filing_years(version)
 
 selected_years = st.sidebar.multiselect(
     "Select Filing Years",
@@ -79,38 +101,28 @@ selected_years = st.sidebar.multiselect(
     default=years  # show all by default
 )
 
-filtered_cases = (
-    cases[cases["filing_year"].isin(selected_years)]
-    if selected_years else cases
-)
 
-filtered_merged = (
-    merged[merged["filing_year"].isin(selected_years)]
-    if selected_years and "filing_year" in merged.columns else merged
-)
+def _narrowed(selected, options):
+    """Partition values to read, or None when the selection covers every option."""
+    if not selected or set(selected) == set(options):
+        return None
+    return tuple(str(v) for v in selected)
 
-# Join hearings with cases to get filing_year
-if "case_id" in hearings.columns and "case_id" in cases.columns:
-    hearings_with_year = hearings.merge(
-        cases[["case_id", "filing_year"]],
-        on="case_id",
-        how="left"
-    )
-    filtered_hearings = (
-        hearings_with_year[hearings_with_year["filing_year"].isin(selected_years)]
-        if selected_years else hearings_with_year
-    )
-else:
-    filtered_hearings = hearings
+
+# Only the selected partitions are read (all of them when nothing is filtered out);
+# each query is cached per selection
+selection = (_narrowed(selected_states, states), _narrowed(selected_benches, benches),
+             _narrowed([int(y) for y in selected_years], [int(y) for y in years]))
 
 st.title("Analytics Dashboard")
 
 col1, col2, col3, col4 = st.columns(4)
 
-total_civil = len(filtered_cases)
+metrics = db.case_metrics(version, *selection)
+total_civil = metrics["cases"]
 total_criminal = 0
 total_cases = total_civil + total_criminal
-older_than_1yr = len(filtered_cases[filtered_cases["disposal_days"] > 365])
+older_than_1yr = metrics["older_than_1yr"]
 
 col1.metric("Total Civil Cases", total_civil)
 col2.metric("Total Criminal Cases", total_criminal)
@@ -119,30 +131,32 @@ col4.metric("Older than 1 year", older_than_1yr)
 
 st.markdown("---")
 
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "Case Funnel",
     "Disposal Trend",
     "Judge Workload",
-    "Disposal Days Distribution"
+    "Disposal Days Distribution",
+    "Backlog Forecast",
+    "Adjournments"
 ])
 
 # TAB 1 — Case Funnel
 with tab1:
     st.subheader("Case Stage Funnel")
-    if "remappedstages" in filtered_merged.columns:
-        funnel_df = filtered_merged["remappedstages"].value_counts().reset_index()
-        funnel_df.columns = ["Stage", "Count"]
-
-        custom_dark_blues = ["#08306b", "#08519c", "#2171b5", "#4292c6", "#6baed6", "#9ecae1"]
-
-        fig = px.funnel(
-            funnel_df,
-            x="Count",
-            y="Stage",
-            color="Stage",
-            color_discrete_sequence=custom_dark_blues
-        )
-        st.plotly_chart(fig, width='stretch')
+    funnel_df = db.stage_counts(version, *selection)
+    if funnel_df is not None:
+        with span("chart.analytics.funnel"):
+            custom_dark_blues = ["#08306b", "#08519c", "#2171b5", "#4292c6", "#6baed6", "#9ecae1"]
+
+            # Built once per filter selection and dataset version (charts.py)
+            fig = figure("analytics.funnel", selection, version, lambda: px.funnel(
+                funnel_df,
+                x="Count",
+                y="Stage",
+                color="Stage",
+                color_discrete_sequence=custom_dark_blues
+            ))
+            st.plotly_chart(fig, width='stretch')
     else:
         st.warning("Column 'remappedstages' not found in merged data.")
 
@@ -150,62 +164,94 @@ with tab1:
 with tab2:
     st.subheader("Disposal Time by Filing Year")
 
-    if "filing_year" in filtered_cases.columns and "disposal_days" in filtered_cases.columns:
-        filtered_cases["filing_year"] = filtered_cases["filing_year"].astype(int)
-
-        trend = (
-            filtered_cases.groupby("filing_year")["disposal_days"]
-            .mean()
-            .reset_index()
-        )
-
-        trend["filing_year"] = trend["filing_year"].astype(str)
-
-        fig = px.line(
-            trend,
-            x="filing_year",
-            y="disposal_days",
-            markers=True,
-            title="Average Disposal Days per Filing Year"
-        )
-
-        # Force categorical axis
-        fig.update_xaxes(type="category")
-
-        st.plotly_chart(fig, width='stretch')
+    # Kaplan-Meier quantiles count undecided recent filings as censored
+    # instead of averaging only the cases that were disposed quickly.
+    tables = db.survival(version, "filing_year", *selection)
+    if tables is not None:
+        with span("chart.analytics.disposal_trend"):
+            trend = tables[0].rename(columns={"group": "filing_year"})
+
+            def disposal_trend():
+                fig = px.line(
+                    trend,
+                    x="filing_year",
+                    y=["p25_days", "median_days", "p75_days"],
+                    markers=True,
+                    title="Median Disposal Days per Filing Year (with 25th / 75th percentiles)"
+                )
+
+                # Force categorical axis
+                fig.update_xaxes(type="category")
+                fig.update_layout(yaxis_title="disposal_days", legend_title_text="")
+                return fig
+
+            fig = figure("analytics.disposal_trend", selection, version, disposal_trend)
+            st.plotly_chart(fig, width='stretch')
+        st.dataframe(trend, hide_index=True)
     else:
         st.warning("Trend columns missing.")
 
+    st.subheader("Time to Disposal Curves")
+    group_label = st.selectbox("Group by", list(GROUP_COLUMNS))
+    group_col = GROUP_COLUMNS[group_label]
+
+    tables = db.survival(version, group_col, *selection)
+    if tables is not None:
+        with span("chart.analytics.survival_curves"):
+            summary, curves = tables
+            summary = summary.sort_values("cases", ascending=False)
+
+            shown = st.multiselect(
+                f"{group_label}s to plot",
+                summary["group"].tolist(),
+                default=summary["group"].head(8).tolist()
+            )
+            fig = figure("analytics.survival_curves", (group_label, selection, tuple(shown)), version,
+                         lambda: px.line(
+                             curves[curves["group"].isin(shown)],
+                             x="days",
+                             y="survival",
+                             color="group",
+                             line_shape="hv",
+                             title=f"Share of Cases Still Pending by {group_label}"
+                         ))
+            st.plotly_chart(fig, width='stretch')
+        st.dataframe(summary, hide_index=True)
+    else:
+        st.warning(f"No '{group_col}' column found.")
+
 # TAB 3 — Judge Workload
 with tab3:
     st.subheader("Judge Hearing Workload")
 
-    judge_col_candidates = [
-        "before_honourable_judges",
-        "before_hon_judge",
-        "njdg_judge_name"
-    ]
-    judge_col = next(
-        (col for col in judge_col_candidates if col in filtered_hearings.columns),
-        None
-    )
-
-    if judge_col:
-        judge_df = (
-            filtered_hearings[judge_col]
-            .value_counts()
-            .reset_index()
-        )
-        judge_df.columns = ["Judge", "Hearings"]
-
-        fig = px.bar(
-            judge_df,
-            x="Judge",
-            y="Hearings",
-            title="Hearings per Judge (Filtered by Year)",
-            color="Hearings"
-        )
-        st.plotly_chart(fig, width='stretch')
+    # Judges on a division bench each count the bench's hearings
+    judge_df = db.judge_workload(version, *selection)
+    if judge_df is not None:
+        with span("chart.analytics.judge_workload"):
+            fig = figure("analytics.judge_workload", selection, version, lambda: px.bar(
+                judge_df,
+                x="Judge",
+                y="Hearings",
+                hover_data=["Cases"],
+                title="Hearings per Judge (Filtered by Year)",
+                color="Hearings"
+            ))
+            st.plotly_chart(fig, width='stretch')
+
+        judge = st.selectbox("Judge", judge_df["Judge"].tolist(), key="workload_judge")
+        daily = db.judge_workload(version, *selection, by="day", judge=judge)
+        if daily is not None and not daily.empty:
+            with span("chart.analytics.judge_daily"):
+                fig = figure("analytics.judge_daily", (selection, judge), version,
+                             lambda: px.bar(daily, x="Date", y="Hearings", title=f"Hearings per Day — {judge}"))
+                st.plotly_chart(fig, width='stretch')
+        halls = db.judge_workload(version, *selection, by="hall", judge=judge)
+        if halls is not None and not halls.empty:
+            with span("chart.analytics.judge_halls"):
+                fig = figure("analytics.judge_halls", (selection, judge), version,
+                             lambda: px.bar(halls, x="Court Hall", y="Hearings",
+                                            title=f"Hearings per Court Hall — {judge}").update_xaxes(type="category"))
+                st.plotly_chart(fig, width='stretch')
     else:
         st.warning("No judge column found.")
 
@@ -213,13 +259,99 @@ with tab3:
 with tab4:
     st.subheader("Distribution of Disposal Days")
 
-    if "disposal_days" in filtered_cases.columns:
-        fig = px.histogram(
-            filtered_cases,
-            x="disposal_days",
-            nbins=40,
-            title="Disposal Time Distribution"
-        )
-        st.plotly_chart(fig, width='stretch')
+    bins = db.disposal_histogram(version, *selection)
+    if bins is not None:
+        with span("chart.analytics.disposal_histogram"):
+            # Bins are counted by the backend; the bars span each bin's range
+            fig = figure("analytics.disposal_histogram", selection, version, lambda: px.bar(
+                bins.assign(disposal_days=(bins["start"] + bins["end"]) / 2),
+                x="disposal_days",
+                y="count",
+                hover_data=["start", "end"],
+                title="Disposal Time Distribution"
+            ).update_traces(width=bins["end"].iloc[0] - bins["start"].iloc[0]))
+            st.plotly_chart(fig, width='stretch')
     else:
         st.warning("No disposal days column found.")
+
+# TAB 5 — Backlog Forecast
+with tab5:
+    st.subheader("Filings vs Disposals and Projected Backlog")
+
+    forecast = db.backlog_forecast(version, *selection)
+    if forecast is not None:
+        keys = forecast["keys"]
+
+        bench_options = ["All"] + sorted(keys["courtname"].unique())
+        bench = st.selectbox("Bench", bench_options)
+        rows = keys.index if bench == "All" else keys.index[keys["courtname"] == bench]
+
+        halls = sorted(keys.loc[rows, "courthallnumber"].unique())
+        hall = st.selectbox("Court Hall", ["All"] + halls)
+        if hall != "All":
+            rows = rows[keys.loc[rows, "courthallnumber"] == hall]
+
+        with span("chart.analytics.backlog_forecast"):
+            fig = figure("analytics.backlog_forecast", (selection, bench, hall), version, lambda: px.line(
+                projection_frame(forecast, rows.to_numpy()).melt(
+                    id_vars=["month", "kind"], value_vars=["Filings", "Disposals"], var_name="Series",
+                    value_name="Cases"),
+                x="month",
+                y="Cases",
+                color="Series",
+                line_dash="kind",
+                title="Monthly Filings and Disposals (dashed = forecast)"
+            ))
+            st.plotly_chart(fig, width='stretch')
+
+        with span("chart.analytics.pending_projection"):
+            fig = figure("analytics.pending_projection", (selection, bench, hall), version, lambda: px.area(
+                projection_frame(forecast, rows.to_numpy()),
+                x="month",
+                y="Pending",
+                color="kind",
+                title="Pending Cases (history and projection)"
+            ))
+            st.plotly_chart(fig, width='stretch')
+    else:
+        st.warning("No filed cases in the selected partitions.")
+
+# TAB 6 — Adjournments
+with tab6:
+    st.subheader("Adjournment Rates")
+
+    dimension = st.selectbox("Group by", list(DIMENSIONS), key="adjournment_dimension")
+    rates = db.adjournment_rates(version, dimension, *selection)
+    if rates is not None:
+        with span("chart.analytics.adjournments"):
+            def adjournment_chart():
+                ranked = rates[rates["hearings"] >= MIN_HEARINGS].nlargest(20, "adjournment_rate")
+                fig = px.bar(
+                    ranked,
+                    x="value",
+                    y="adjournment_rate",
+                    hover_data=["hearings", "mean_gap_days", "longest_gap_days"],
+                    color="mean_gap_days",
+                    title=f"Highest Adjournment Rates by {dimension} (at least {MIN_HEARINGS} hearings)"
+                )
+                fig.update_xaxes(type="category", title=dimension)
+                fig.update_yaxes(tickformat=".0%")
+                return fig
+
+            fig = figure("analytics.adjournments", (dimension, selection), version, adjournment_chart)
+            st.plotly_chart(fig, width='stretch')
+        st.dataframe(rates, hide_index=True)
+    else:
+        st.warning(f"No column found for {dimension}.")
+
+st.markdown("---")
+
+# Every filtered row, streamed to a file in the background
+st.subheader("Export Filtered Data")
+export_table = st.radio("Table", ["Cases", "Hearings"], horizontal=True, key="export_table")
+export_panel(
+    f"analytics_{export_table.lower()}",
+    f"Filtered {export_table}",
+    lambda table=export_table.lower(): db.table_batches(version, table, *selection),
+    total=metrics["cases"] if export_table == "Cases" else None,
+)
@@ -0,0 +1,115 @@
+import time
+
+import streamlit as st
+import plotly.express as px
+import caches
+from helpers.sidebar import render_sidebar
+from partitions import listing, manifest
+from profiling import begin_page, summary, reset, flush, is_admin, ENABLED, SPAN_LOG, WINDOW
+from warmup import start_warmup
+
+st.set_page_config(
+    page_title="Diagnostics",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+begin_page("Diagnostics")
+
+render_sidebar()
+
+# Admins are listed in NYAYADRISHTI_ADMINS
+if not (st.session_state.get("authenticated") and is_admin(st.session_state.get("user_name"))):
+    st.error("The diagnostics page is only available to administrators.")
+    st.stop()
+
+st.title("Diagnostics")
+st.caption(
+    f"Span timings for this server process; percentiles cover the last {WINDOW} calls of each span. "
+    + ("Recording is disabled (NYAYADRISHTI_PROFILING=0)." if not ENABLED else "")
+)
+
+warm = start_warmup()
+st.subheader("Warm-up")
+w1, w2, w3 = st.columns(3)
+w1.metric("State", warm.state)
+w2.metric("Building", warm.stage or "-")
+w3.metric("Last build", time.strftime("%H:%M:%S", time.localtime(warm.built_at)) if warm.built_at else "-")
+if warm.error:
+    st.error(f"Last warm-up failed: {warm.error}")
+if warm.stage_seconds:
+    st.dataframe(
+        [{"stage": name, "seconds": round(sec, 3)} for name, sec in warm.stage_seconds.items()],
+        hide_index=True,
+    )
+
+st.subheader("Caches")
+st.caption("Entries derived from each dataset version, by layer; the previous version's are dropped when "
+           "warm-up publishes a new one. Budgets are set with NYAYADRISHTI_CACHE_MB.")
+st.dataframe(caches.layer_stats().round({"mb": 1, "budget_mb": 0}), hide_index=True)
+with st.expander("Per function"):
+    st.dataframe(caches.stats().round({"mb": 1, "hit_rate": 3}), hide_index=True)
+k1, k2, k3 = st.columns([2, 1, 1])
+layer = k1.selectbox("Layer", list(caches.LAYERS), label_visibility="collapsed")
+if k2.button("Clear layer and dependents"):
+    dropped = caches.invalidate(layer)
+    st.success(f"Dropped {dropped} entries ({', '.join(caches.dependents([layer]))}).")
+if k3.button("Reset cache counters"):
+    caches.reset_stats()
+    st.rerun()
+
+st.subheader("Partition store")
+sources = manifest()["sources"]
+if sources:
+    st.dataframe(
+        [{"source": name, "cases": s.get("cases"), "hearings": s.get("hearings"),
+          "ingested": time.strftime("%Y-%m-%d %H:%M", time.localtime(s["ingested_at"]))}
+         for name, s in sources.items()],
+        hide_index=True,
+    )
+    stored = listing()
+    st.caption(f"{len(stored[stored['table'] == 'cases'])} case partitions "
+               f"across {stored['state'].nunique()} states and {stored['bench'].nunique()} benches.")
+else:
+    st.info("The partition store is empty until the dataset is first prepared.")
+
+st.subheader("Spans")
+spans = summary()
+if spans.empty:
+    st.info("No spans recorded yet. Open a few pages and come back.")
+    st.stop()
+
+pages = ["All"] + sorted(spans["page"].unique())
+page = st.selectbox("Page", pages)
+shown = spans if page == "All" else spans[spans["page"] == page]
+
+st.dataframe(
+    shown.round({"total_s": 3, "p50_ms": 2, "p90_ms": 2, "p99_ms": 2, "max_ms": 2}),
+    hide_index=True,
+)
+
+top = shown.nlargest(15, "p90_ms")
+fig = px.bar(
+    top.melt(id_vars=["page", "span"], value_vars=["p50_ms", "p90_ms", "p99_ms"],
+             var_name="Percentile", value_name="ms"),
+    x="ms",
+    y="span",
+    color="Percentile",
+    barmode="group",
+    orientation="h",
+    hover_data=["page"],
+    title="Slowest spans (p90)"
+)
+st.plotly_chart(fig, width='stretch')
+
+c1, c2 = st.columns(2)
+with c1:
+    if st.button("Reset timings"):
+        reset()
+        st.rerun()
+with c2:
+    if SPAN_LOG:
+        if st.button("Flush span log"):
+            flush()
+            st.success(f"Written to {SPAN_LOG}")
+    else:
+        st.caption("Set NYAYADRISHTI_SPAN_LOG to also write every span to a JSON-lines file.")
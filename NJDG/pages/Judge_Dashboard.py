@@ -1,16 +1,27 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from streamlit_cookies_manager import EncryptedCookieManager
-from preprocessing import load_data, clean_cases, clean_hearings
+from preprocessing import dataset_version
+from queries import backend
+from views import DASHBOARD_COLUMNS, age_days, column, latest_per_case, view
+from exports import export_panel, frame_batches
+from adjournments import combined_rate
+from cause_lists import LONG_PENDING_DAYS, judge_lists, list_dates
+from charts import figure
 from helpers.sidebar import render_sidebar
+from profiling import begin_page, span
+from warmup import wait_until_ready
 from sessions import validate_token
+from user_directory import normalize_name
+from utils import load_alerts, mark_alerts_read
 
 st.set_page_config(
     page_title="Judge Dashboard",
     layout="wide",
     initial_sidebar_state="expanded",
 )
+begin_page("Judge Dashboard")
 
 # Cookie Setup (Persistent Login)
 cookies = EncryptedCookieManager(
@@ -66,38 +77,13 @@ if st.session_state.get("is_first_login"):
     
 render_sidebar()
 
-# Load & Preprocess Data
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
+wait_until_ready()
 
-# Normalize column names
-cases.columns = cases.columns.str.strip().str.lower()
-hearings.columns = hearings.columns.str.strip().str.lower()
+db = backend()
+version = dataset_version()
 
-# ----------------------------
-# Merge Cases & Hearings
-# ----------------------------
-case_keys = ['combined_case_number', 'cnr_number', 'case_number']
-hearing_keys = ['combinedcasenumber', 'cnr_number', 'case_number']
-
-left_key = next((k for k in case_keys if k in cases.columns), None)
-right_key = next((k for k in hearing_keys if k in hearings.columns), None)
-
-if not left_key or not right_key:
-    st.error("Could not find valid merge key.")
-    st.stop()
-
-merged = pd.merge(
-    cases,
-    hearings,
-    left_on=left_key,
-    right_on=right_key,
-    how='left',
-    suffixes=('_case', '_hear')
-)
-
-merged['judge'] = merged.get('beforehonourablejudges', merged.get('njdg_judge_name', 'unknown'))
+# Hearing alerts are produced in the background and read from the inbox
+db.schedule_hearing_alerts(version)
 
 # ----------------------------
 # Judge Context
@@ -107,10 +93,20 @@ if not judge_name:
     st.error("Judge name not found in session. Please log in again.")
     st.stop()
 
-judge_cases = merged[merged['judge'].str.upper() == judge_name.upper()]
-if judge_cases.empty:
+# Cases joined with the hearings of every bench naming this judge: row numbers into the shared frame
+# (pandas) or just the judge's rows and the columns below from the query engine (duckdb)
+data = db.judge_view(version, judge_name, DASHBOARD_COLUMNS)
+if data is None:
+    st.error("Could not find valid merge key.")
+    st.stop()
+merged = data["frame"]
+judge_rows = data["rows"]
+if len(judge_rows) == 0:
     st.warning(f"No cases found for Judge: {judge_name}")
     st.stop()
+# One row per case (its latest hearing before this judge) for the case lists and
+# charts; the hearing overview lists every hearing
+case_rows = latest_per_case(merged, judge_rows, 'case_number')
 
 st.success(f"Logged in as *{judge_name}*")
 
@@ -133,17 +129,24 @@ page = st.pills(
 if page == "Case Management":
     st.header("Case Management")
 
+    status = column(merged, 'current_status', case_rows)
+    statuses = pd.unique(status[pd.notna(status)])
     status_filter = st.multiselect(
         "Filter by case status:",
-        judge_cases['current_status'].dropna().unique(),
-        default=judge_cases['current_status'].dropna().unique()
+        statuses,
+        default=statuses
     )
-    filtered_cases = judge_cases[judge_cases['current_status'].isin(status_filter)]
+    filtered_rows = case_rows[np.isin(status, status_filter)]
 
-    st.dataframe(filtered_cases[
-        ['case_number', 'current_status', 'date_filed', 'decision_date',
+    st.dataframe(view(merged, filtered_rows,
+        ['case_number', 'current_status', 'current_stage', 'date_filed', 'decision_date',
          'nature_of_disposal', 'disposaltime_adj']
-    ])
+    ))
+
+    # The filtered list with every dashboard column, written in the background
+    export_columns = [c for c in (*DASHBOARD_COLUMNS, 'judge') if c in merged.columns]
+    export_panel("judge_cases", "Case List", lambda: frame_batches(merged, filtered_rows, export_columns),
+                 total=len(filtered_rows))
 
 # ----------------------------
 # PAGE 2 — ALERTS
@@ -151,20 +154,33 @@ if page == "Case Management":
 elif page == "Alerts":
     st.header("Alerts")
 
-    today = pd.to_datetime("today").normalize()
-    judge_cases['age_days'] = (today - pd.to_datetime(judge_cases['date_filed'], errors='coerce')).dt.days
+    st.subheader("Upcoming Hearing Alerts")
+    alerts = load_alerts(normalize_name(judge_name))
+    if alerts:
+        st.dataframe(pd.DataFrame(alerts, columns=["Type", "CNR Number", "Date", "Message"]))
+        if st.button("Mark alerts as read"):
+            mark_alerts_read(normalize_name(judge_name))
+            st.rerun()
+    else:
+        st.info("No new alerts")
+
+    ages = age_days(data["date_filed"][case_rows])
 
     st.subheader("Aging Cases (>365 days)")
-    aging = judge_cases[judge_cases['age_days'] > 365]
-    if not aging.empty:
-        st.dataframe(aging[['case_number', 'current_status', 'date_filed', 'age_days', 'disposaltime_adj']])
+    aging = ages > 365
+    if aging.any():
+        st.dataframe(view(merged, case_rows[aging],
+                          ['case_number', 'current_status', 'date_filed', 'disposaltime_adj'],
+                          age_days=ages[aging])
+                     [['case_number', 'current_status', 'date_filed', 'age_days', 'disposaltime_adj']])
     else:
         st.info("No aging cases found")
 
     st.subheader("Pending Cases")
-    pending = judge_cases[judge_cases['current_status'].str.lower() != 'disposed']
-    if not pending.empty:
-        st.dataframe(pending[['case_number', 'current_status', 'date_filed', 'disposaltime_adj']])
+    status = pd.Series(column(merged, 'current_status', case_rows)).str.lower().to_numpy()
+    pending = case_rows[status != 'disposed']
+    if len(pending):
+        st.dataframe(view(merged, pending, ['case_number', 'current_status', 'date_filed', 'disposaltime_adj']))
     else:
         st.info("No pending cases found")
 
@@ -174,22 +190,50 @@ elif page == "Alerts":
 elif page == "Hearing Overview":
     st.header("Hearing Overview")
 
-    today = pd.to_datetime("today").normalize()
+    today = np.datetime64(pd.to_datetime("today").normalize(), "ns")
 
-    if 'nexthearingdate' in judge_cases.columns:
-        judge_cases['nexthearingdate'] = pd.to_datetime(judge_cases['nexthearingdate'], errors='coerce')
-        today_hearings = judge_cases[judge_cases['nexthearingdate'] == today]
-        upcoming_hearings = judge_cases[judge_cases['nexthearingdate'] > today]
+    hearing_cols = ['case_number', 'appearancedate', 'purposeofhearing', 'judge']
+    if data["nexthearingdate"] is not None:
+        next_dates = data["nexthearingdate"][judge_rows]
+        later = next_dates > today
+        upcoming_hearings = view(merged, judge_rows[later], hearing_cols, nexthearingdate=next_dates[later])
     else:
-        today_hearings, upcoming_hearings = pd.DataFrame(), pd.DataFrame()
+        upcoming_hearings = pd.DataFrame()
 
-    rescheduled = judge_cases[judge_cases['previoushearing'].notnull()] if 'previoushearing' in judge_cases.columns else pd.DataFrame()
-
-    st.subheader("Today's Hearings")
-    if not today_hearings.empty:
-        st.dataframe(today_hearings[['case_number', 'nexthearingdate', 'appearancedate', 'purposeofhearing', 'judge']])
+    if 'previoushearing' in merged.columns:
+        rescheduled_rows = judge_rows[pd.notna(column(merged, 'previoushearing', judge_rows))]
+        rescheduled = view(merged, rescheduled_rows, ['case_number', 'previoushearing', 'purposeofhearing'])
+        if data["nexthearingdate"] is not None:
+            rescheduled.insert(1, 'nexthearingdate', data["nexthearingdate"][rescheduled_rows])
+    else:
+        rescheduled = pd.DataFrame()
+
+    # Every spelling of the judge's name in the data
+    identity = db.resolve_name(version, judge_name, "Judge")
+    judge_names = identity["variants"] if identity else (normalize_name(judge_name),)
+
+    # Cause lists are generated offline for every judge (cause_lists.py); this only opens them
+    st.subheader("Cause List")
+    list_days = list_dates()
+    if list_days:
+        # Today's list, else the next one generated, else the latest
+        upcoming_days = [d for d in list_days if d >= pd.Timestamp.today().date()]
+        list_day = st.selectbox("List date", list_days[::-1],
+                                index=list_days[::-1].index(upcoming_days[0] if upcoming_days else list_days[-1]),
+                                format_func=lambda d: f"{d:%A, %d %B %Y}")
+        lists = judge_lists(list_day, judge_names)
+        if lists:
+            for entry, csv_path, html_path in lists:
+                st.caption(f"Court Hall {entry.court_halls} · {entry.cases} cases · "
+                           f"{entry.long_pending} pending over {LONG_PENDING_DAYS // 365} years")
+                st.dataframe(pd.read_csv(csv_path), hide_index=True)
+                st.download_button("Download cause list (HTML)", html_path.read_bytes(),
+                                   file_name=f"cause_list_{list_day:%Y-%m-%d}.html", mime="text/html",
+                                   key=f"cause_list_{entry.file}")
+        else:
+            st.info(f"No cases listed before you on {list_day:%d %B %Y}")
     else:
-        st.info("No hearings today")
+        st.info("No cause lists have been generated yet")
 
     st.subheader("Upcoming Hearings")
     if not upcoming_hearings.empty:
@@ -197,6 +241,23 @@ elif page == "Hearing Overview":
     else:
         st.info("No upcoming hearings")
 
+    st.subheader("Adjournments")
+    # Rates per (hearing, judge on its bench), so division benches count for the judge
+    rates = db.adjournment_rates(version, "Judge")
+    mine = combined_rate(rates, judge_names) if rates is not None else None
+    if mine is not None:
+        court_rate = rates['adjourned'].sum() / rates['hearings'].sum()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Adjournment rate", f"{mine['adjournment_rate']:.0%}",
+                    f"{mine['adjournment_rate'] - court_rate:+.0%} vs court", delta_color="inverse")
+        col2.metric("Mean days to next hearing", f"{mine['mean_gap_days']:.0f}")
+        col3.metric("Longest gap (days)", f"{mine['longest_gap_days']:.0f}")
+    if 'adjournments' in merged.columns:
+        most = case_rows[np.argsort(-column(merged, 'adjournments', case_rows), kind='stable')[:20]]
+        st.dataframe(view(merged, most, ['case_number', 'current_stage', 'adjournments', 'longest_gap_days']))
+    else:
+        st.info("No adjournment data")
+
     st.subheader("Rescheduled Hearings")
     if not rescheduled.empty:
         st.dataframe(rescheduled[['case_number', 'nexthearingdate', 'previoushearing', 'purposeofhearing']])
@@ -208,16 +269,31 @@ elif page == "Hearing Overview":
 # ----------------------------
 elif page == "Dashboards / Charts":
     st.header("Dashboards & Charts")
-
-    if 'disposal_year' in judge_cases.columns:
-        disposal_trend = judge_cases.groupby('disposal_year').size().reset_index(name='count')
-        fig = px.line(disposal_trend, x='disposal_year', y='count', title="Case Disposal Trend")
-        st.plotly_chart(fig, width='stretch')
-
-    fig_status = px.bar(
-        judge_cases.groupby('current_status').size().reset_index(name='count'),
-        x='current_status',
-        y='count',
-        title="Case Status Distribution"
-    )
-    st.plotly_chart(fig_status, width='stretch')
+    import plotly.express as px
+
+    # Figures are built once per judge and dataset version (charts.py)
+    if 'disposal_year' in merged.columns:
+        with span("chart.judge.disposal_trend"):
+            def disposal_trend():
+                counts = view(merged, case_rows, ['disposal_year']).groupby('disposal_year').size().reset_index(name='count')
+                return px.line(counts, x='disposal_year', y='count', title="Case Disposal Trend")
+
+            fig = figure("judge.disposal_trend", judge_name, version, disposal_trend)
+            st.plotly_chart(fig, width='stretch')
+
+    with span("chart.judge.status"):
+        fig_status = figure("judge.status", judge_name, version, lambda: px.bar(
+            view(merged, case_rows, ['current_status']).groupby('current_status').size().reset_index(name='count'),
+            x='current_status',
+            y='count',
+            title="Case Status Distribution"
+        ))
+        st.plotly_chart(fig_status, width='stretch')
+
+    # Hearings of every bench the judge sat on
+    daily = db.judge_workload(version, by="day", judge=judge_name)
+    if daily is not None and not daily.empty:
+        with span("chart.judge.daily_workload"):
+            fig = figure("judge.daily_workload", judge_name, version,
+                         lambda: px.bar(daily, x='Date', y='Hearings', title="Hearings per Day"))
+            st.plotly_chart(fig, width='stretch')
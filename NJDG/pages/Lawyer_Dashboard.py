@@ -2,15 +2,23 @@
 import pandas as pd
 from streamlit_cookies_manager import EncryptedCookieManager
 from sessions import validate_token
-from utils import load_notes, save_notes, load_reminders, save_reminders
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from utils import (load_notes, save_note, load_reminders, save_reminder, reminders_between,
+                   claim_legacy, load_alerts, mark_alerts_read)
+from user_directory import normalize_name
+from preprocessing import dataset_version
+from queries import backend
+from views import column, latest_per_case, view
+from exports import export_panel, frame_batches
 from helpers.sidebar import render_sidebar
+from profiling import begin_page
+from warmup import wait_until_ready
 
 st.set_page_config(
     page_title="Advocate Dashboard",
     layout="wide",
     initial_sidebar_state="expanded",
 )
+begin_page("Lawyer Dashboard")
 
 # Cookie Setup (Persistent Login)
 cookies = EncryptedCookieManager(
@@ -66,23 +74,10 @@ if st.session_state.get("is_first_login"):
     
 render_sidebar()
 
-# Load & Preprocess Data
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-merged = merge_data(cases, hearings)
-
-# Normalize column names
-cases.columns = cases.columns.str.strip().str.lower()
-hearings.columns = hearings.columns.str.strip().str.lower()
-merged.columns = merged.columns.str.strip().str.lower()
-
-# ----------------------------
-# Notes & Reminders Storage
-# ----------------------------
-notes = load_notes()
-reminders = load_reminders()
+wait_until_ready()
 
+db = backend()
+version = dataset_version()
 
 # ----------------------------
 # Advocate Context (from session state)
@@ -92,22 +87,46 @@ if not lawyer_name:
     st.error("Advocate name not found in session. Please log in again.")
     st.stop()
 
-# Filter cases where lawyer appears as petitioner or respondent advocate
-portfolio = merged[
-    merged['petitioneradvocate'].str.contains(lawyer_name, case=False, na=False) |
-    merged['respondentadvocate'].str.contains(lawyer_name, case=False, na=False)
-]
+# Rows where the lawyer appears as petitioner or respondent advocate, matched as
+# the login checks; the session keeps only these row numbers into `merged`
+portfolio = db.advocate_view(version, lawyer_name)
+merged, portfolio_rows = portfolio["frame"], portfolio["rows"]
 
-if portfolio.empty:
+if len(portfolio_rows) == 0:
     st.warning(f"No cases found for Advocate: {lawyer_name}")
     st.stop()
 
 st.success(f"Logged in as *{lawyer_name}*")
+
+# ----------------------------
+# Notes & Reminders Storage (only this advocate's rows)
+# ----------------------------
+user_key = normalize_name(lawyer_name)
+portfolio_cnrs = column(merged, "cnr_number", portfolio_rows)
+claim_legacy(user_key, pd.unique(portfolio_cnrs))
+notes = load_notes(user_key)
+reminders = load_reminders(user_key)
+
+# Alerts delivered by the background scheduler (due reminders, hearings in the next few days)
+db.schedule_hearing_alerts(version)
+alerts = load_alerts(user_key)
+if alerts:
+    st.subheader("Alerts")
+    st.dataframe(pd.DataFrame(alerts, columns=["Type", "CNR Number", "Date", "Message"]))
+    if st.button("Mark alerts as read"):
+        mark_alerts_read(user_key)
+        st.rerun()
+
 # ----------------------------
 # Case Portfolio Display
 # ----------------------------
 st.subheader("Your Case Portfolio")
-st.dataframe(portfolio[['cnr_number','case_number','case_type','current_status','date_filed','decision_date','nexthearingdate']])
+# One row per case, from its latest hearing with this advocate; the search below shows every hearing
+case_rows = latest_per_case(merged, portfolio_rows, "cnr_number")
+st.dataframe(view(merged, case_rows, ['cnr_number','case_number','case_type','current_status','current_stage','date_filed','decision_date','nexthearingdate']))
+# Every hearing of the portfolio with all its columns, written in the background
+export_panel("advocate_portfolio", "Portfolio Hearings", lambda: frame_batches(merged, portfolio_rows),
+             total=len(portfolio_rows))
 
 # ----------------------------
 # Case Search by CNR Number
@@ -115,10 +134,10 @@ st.dataframe(portfolio[['cnr_number','case_number','case_type','current_status',
 st.subheader("Search Case")
 cnr = st.text_input("Search Case by CNR Number:")
 if cnr:
-    if "cnr_number" not in portfolio.columns:
+    if "cnr_number" not in merged.columns:
         st.error("'cnr_number' column not found in dataset.")
     else:
-        df = portfolio[portfolio["cnr_number"] == cnr]
+        df = view(merged, portfolio_rows[portfolio_cnrs == cnr])
         if not df.empty:
             st.write(df)
 
@@ -129,8 +148,7 @@ if cnr:
             text = st.text_area("Add Notes:", notes.get(cnr, ""))
 
             if st.button("Save Notes"):
-                notes[cnr] = text
-                save_notes(notes)
+                save_note(user_key, cnr, text)
                 st.success("Notes saved successfully!")
 
             # ----------------------------
@@ -139,8 +157,7 @@ if cnr:
             st.subheader("Set Reminder")
             reminder_date = st.date_input("Reminder Date:", pd.to_datetime(reminders.get(cnr, pd.to_datetime("today"))))
             if st.button("Save Reminder"):
-                reminders[cnr] = str(reminder_date)
-                save_reminders(reminders)
+                save_reminder(user_key, cnr, reminder_date)
                 st.success(f"Reminder set for {reminder_date}")
         else:
             st.warning(f"No case found for CNR Number: {cnr}")
@@ -149,8 +166,9 @@ if cnr:
 # Upcoming Reminders Overview
 # ----------------------------
 st.subheader("Upcoming Reminders")
-if reminders:
-    reminder_df = pd.DataFrame(list(reminders.items()), columns=["CNR Number", "Reminder Date"])
+upcoming = reminders_between(user_key, start=pd.Timestamp.today().date())
+if upcoming:
+    reminder_df = pd.DataFrame(upcoming, columns=["CNR Number", "Reminder Date"])
     st.dataframe(reminder_df)
 else:
     st.info("No reminders set yet.")
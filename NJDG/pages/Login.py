@@ -1,13 +1,14 @@
 import streamlit as st
 import warnings
 
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
-from auth import verify_password, set_password, is_first_login, get_default_password
+from preprocessing import dataset_version
+from queries import backend
+from auth import account_key, verify_password, set_password, is_first_login, get_default_password
 from sessions import create_token, validate_token, get_token
 import pandas as pd
-import base64
-from pathlib import Path
 from helpers.sidebar import render_sidebar
+from profiling import begin_page
+from warmup import wait_until_ready
 from streamlit_cookies_manager import EncryptedCookieManager
 
 # Cookie Setup (Persistent Login)
@@ -27,6 +28,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+begin_page("Login")
 
 # -------------------------------------------------
 # Global Custom CSS
@@ -82,19 +84,9 @@ if "authenticated" not in st.session_state:
 # -------------------------------------------------
 # Load Data
 # -------------------------------------------------
-@st.cache_resource
-def load_all_data():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged = merge_data(cases, hearings)
-
-    cases.columns = cases.columns.str.strip().str.lower()
-    hearings.columns = hearings.columns.str.strip().str.lower()
-    merged.columns = merged.columns.str.strip().str.lower()
-    return cases, hearings, merged
-
-cases, hearings, merged = load_all_data()
+wait_until_ready()
+db = backend()
+version = dataset_version()
 
 # -------------------------------------------------
 # Sidebar
@@ -140,35 +132,27 @@ with right:
         elif not password:
             st.error("Please enter your password.")
         else:
-            if not verify_password(name, password, merged):
+            # Spacing, case and punctuation variants resolve to one identity; its password is
+            # kept under the identity's match key (or the spelling it was first set under),
+            # not the display spelling, which can change with the data
+            account_role = "Judge" if role == "Judge" else "Advocate"
+            identity = db.resolve_name(version, name, account_role)
+            account = (account_key(identity["key"], (name, *identity["variants"])) if identity
+                       else account_key(name))
+
+            if not verify_password(account, password, typed_name=name):
                 st.error("Incorrect password.")
+            elif identity is None:
+                st.error(f"No cases found for this {account_role}.")
             else:
-                if role == "Judge":
-                    judge_cases = merged[
-                        merged.get("beforehonourablejudges", pd.Series("", index=merged.index))
-                        .str.contains(name, case=False, na=False)
-                    ]
-                    if judge_cases.empty:
-                        st.error("No cases found for this Judge.")
-                        st.stop()
-
-                    st.session_state.user_role = "Judge"
-
-                else:  # Advocate
-                    advocate_cases = merged[
-                        merged["petitioneradvocate"].str.contains(name, case=False, na=False) |
-                        merged["respondentadvocate"].str.contains(name, case=False, na=False)
-                    ]
-                    if advocate_cases.empty:
-                        st.error("No cases found for this Advocate.")
-                        st.stop()
-
-                    st.session_state.user_role = "Advocate"
+                name = identity["name"]
+                st.session_state.account = account
+                st.session_state.user_role = account_role
 
                 # Update login state
                 st.session_state.authenticated = True
                 st.session_state.user_name = name
-                st.session_state.is_first_login = is_first_login(name)
+                st.session_state.is_first_login = is_first_login(account)
 
                 # -------------------------------------------------
                 # SAVE TO COOKIES (PERSISTENT LOGIN)
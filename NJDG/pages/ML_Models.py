@@ -1,15 +1,20 @@
 import streamlit as st
-import pandas as pd
-from preprocessing import load_data, clean_cases
+from preprocessing import dataset_version
+from predictor import REQUIRED_COLS, lookup_errors, rule_predict
+from queries import backend
+from profiling import begin_page, span
+from warmup import wait_until_ready
+
+begin_page("ML Models")
 
 st.title("ML Predictions")
 
-# Load and clean data
-cases, hearings = load_data()
-cases = clean_cases(cases)
+wait_until_ready()
+
+db = backend()
+version = dataset_version()
 
-required_cols = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
-missing = [col for col in required_cols if col not in cases.columns]
+missing = [col for col in REQUIRED_COLS if col not in db.columns(version, "cases")]
 
 if missing:
     st.error(f"Missing columns in cases DataFrame: {missing}")
@@ -19,21 +24,21 @@ else:
     baseline = st.slider("Baseline days", 50, 200, 100)
 
     # Rule-based prediction
-    cases["predicted_disposal"] = (
-        cases["total_hearings"] * hearing_weight +
-        (cases["filing_year"] - cases["filing_year"].min()) * year_weight +
-        baseline
-    )
-
-    st.subheader("Disposal Time Predictions (Rule-Based)")
-    st.write(
-        cases[["cnr_number", "total_hearings", "disposal_days", "predicted_disposal"]]
-        .head(20)
-    )
-
-    # Line chart comparison
-    st.line_chart(cases[["disposal_days", "predicted_disposal"]])
-
-    from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
+    with span("chart.ml_models.comparison"):
+        # `cases` may be shared by all sessions, so the prediction goes into a frame of our own
+        cases, first_year = db.prediction_rows(version)
+        results = cases[["cnr_number", "total_hearings", "disposal_days"]].assign(
+            predicted_disposal=rule_predict(cases, hearing_weight, year_weight, baseline, first_year)
+        )
+
+        st.subheader("Disposal Time Predictions (Rule-Based)")
+        st.write(
+            results.head(20)
+        )
+
+        # Line chart comparison
+        st.line_chart(results[["disposal_days", "predicted_disposal"]])
+
+    # The slider ranges match the predictor's grid, so the error is a lookup over every case
+    mae, _ = lookup_errors(db.error_surface(version), hearing_weight, year_weight, baseline)
     st.success(f"Mean Absolute Error: {mae:.2f} days")
\ No newline at end of file
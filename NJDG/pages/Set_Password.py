@@ -8,6 +8,9 @@ st.set_page_config(
 
 from auth import set_password, get_default_password
 from helpers.sidebar import render_sidebar
+from profiling import begin_page
+
+begin_page("Set Password")
 
 render_sidebar()
 
@@ -41,7 +44,8 @@ if st.button("Set Password", use_container_width=True, type="primary"):
         st.error("Passwords do not match.")
     else:
         # Save the new password
-        if set_password(user_name, new_password):
+        # Under the account key Login verified, not the display name
+        if set_password(st.session_state.get("account") or user_name, new_password):
             st.success("Password set successfully!")
             st.balloons()
             
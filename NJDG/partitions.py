@@ -0,0 +1,307 @@
+"""
+Partitioned storage of the cleaned dataset by state, bench and filing year.
+
+    partitions/<table>/state=<CourtSate>/bench=<CourtName>/year=<filing year>/<source>-<n>.parquet
+
+`cases` and `hearings` are stored as Hive-partitioned Parquet under
+STATE_DIR/partitions. A case takes its state and bench from its first hearing.
+Its hearings are stored in the same partition as the case, so a filter on
+filing year selects hearings too. Reads with a state/bench/year filter only
+open the matching partition files.
+
+Each source (a pair of cases / hearings files, e.g. one High Court) is
+ingested on its own and writes only its own files. Adding a court therefore
+adds partitions without reprocessing the others. The CSVs in data/ are the
+BUILTIN_SOURCE, ingested by preprocessing.prepared_data whenever they change.
+Other courts are added from the command line:
+
+    python partitions.py ingest <name> <cases.csv> <hearings.csv>
+    python partitions.py list
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from db import STATE_DIR
+from profiling import span, timed
+
+STORE_DIR = STATE_DIR / "partitions"
+MANIFEST = STORE_DIR / "manifest.json"
+TABLES = ("cases", "hearings")
+KEYS = ("state", "bench", "year")
+UNKNOWN = "unknown"
+
+BUILTIN_SOURCE = "data"
+# Row order across sources: each source's rows are numbered from rank << ROW_BITS
+ROW_BITS = 40
+
+
+# -------------------------------
+# Manifest and lock
+# -------------------------------
+def manifest():
+    """{"sources": {name: {"fingerprint", "rank", "cases", "hearings", "ingested_at"}}}"""
+    try:
+        return json.loads(MANIFEST.read_text())
+    except FileNotFoundError:
+        return {"sources": {}}
+
+
+def _write_manifest(data):
+    tmp = MANIFEST.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, MANIFEST)
+
+
+def source_fingerprint(source):
+    entry = manifest()["sources"].get(source)
+    return entry["fingerprint"] if entry else None
+
+
+def external_fingerprint():
+    """Fingerprints of every source except the built-in CSVs, for preprocessing.source_version()."""
+    sources = manifest()["sources"]
+    return "|".join(f"{name}:{sources[name]['fingerprint']}"
+                    for name in sorted(sources) if name != BUILTIN_SOURCE)
+
+
+@contextmanager
+def _locked(timeout=300):
+    """Serialise writers across worker processes (same lock-file scheme as shared_data)."""
+    from shared_data import _acquire
+
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    lock = STORE_DIR / "ingest.lock"
+    deadline = time.monotonic() + timeout
+    while not _acquire(lock):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"partition store is locked ({lock})")
+        time.sleep(0.2)
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+# -------------------------------
+# Write
+# -------------------------------
+def _key_column(frame, name):
+    if name not in frame.columns:
+        return pd.Series(UNKNOWN, index=frame.index, dtype="str")
+    values = frame[name]
+    return values.astype("str").where(values.notna(), UNKNOWN)
+
+
+def _by_cnr(cnr, values):
+    """Series of `values` indexed by CNR, first occurrence of each."""
+    series = pd.Series(np.asarray(values), index=np.asarray(cnr))
+    return series[~series.index.duplicated()]
+
+
+def partition_keys(cases, hearings):
+    """
+    (case_keys, hearing_keys): DataFrames of state / bench / year aligned with
+    `cases` and `hearings`. Hearings follow their case so both land in the same
+    partition; hearings without a case keep their own state and bench.
+    """
+    state = _by_cnr(hearings["cnr_number"], _key_column(hearings, "courtsate"))
+    bench = _by_cnr(hearings["cnr_number"], _key_column(hearings, "courtname"))
+    year = cases["filing_year"] if "filing_year" in cases.columns else pd.Series(np.nan, index=cases.index)
+    case_keys = pd.DataFrame({
+        "state": cases["cnr_number"].map(state).fillna(UNKNOWN),
+        "bench": cases["cnr_number"].map(bench).fillna(UNKNOWN),
+        "year": year.astype("Int64").astype("str").where(year.notna(), UNKNOWN),
+    }, index=cases.index)
+
+    cnr = hearings["cnr_number"]
+    hearing_keys = pd.DataFrame({
+        key: cnr.map(_by_cnr(cases["cnr_number"], case_keys[key])).fillna(own)
+        for key, own in (("state", _key_column(hearings, "courtsate")),
+                         ("bench", _key_column(hearings, "courtname")),
+                         ("year", UNKNOWN))
+    }, index=hearings.index)
+    return case_keys, hearing_keys
+
+
+def _remove_source_files(table, source):
+    root = STORE_DIR / table
+    if not root.exists():
+        return
+    for path in root.glob(f"**/{source}-*.parquet"):
+        path.unlink()
+    # Drop partition directories the source was the last one to use
+    for directory in sorted((p for p in root.glob("**/*") if p.is_dir()), key=lambda p: -len(p.parts)):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+
+
+@timed("partitions.ingest")
+def ingest(source, cases, hearings, fingerprint):
+    """
+    Write cleaned `cases` / `hearings` of one source into the store, replacing
+    only that source's files, and record it in the manifest.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    case_keys, hearing_keys = partition_keys(cases, hearings)
+    with _locked():
+        data = manifest()
+        entry = data["sources"].get(source)
+        rank = entry["rank"] if entry else 1 + max((e["rank"] for e in data["sources"].values()), default=-1)
+
+        counts = {}
+        for table, frame, keys in (("cases", cases, case_keys), ("hearings", hearings, hearing_keys)):
+            frame = frame.reset_index(drop=True).assign(
+                _row=(rank << ROW_BITS) + np.arange(len(frame), dtype=np.int64),
+                **{k: keys[k].to_numpy() for k in KEYS},
+            )
+            _remove_source_files(table, source)
+            ds.write_dataset(
+                pa.Table.from_pandas(frame, preserve_index=False),
+                STORE_DIR / table,
+                format="parquet",
+                partitioning=list(KEYS),
+                partitioning_flavor="hive",
+                basename_template=f"{source}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                max_partitions=1 << 16,
+            )
+            counts[table] = len(frame)
+
+        data["sources"][source] = {"fingerprint": fingerprint, "rank": rank,
+                                   "ingested_at": time.time(), **counts}
+        _write_manifest(data)
+
+
+def remove(source):
+    with _locked():
+        for table in TABLES:
+            _remove_source_files(table, source)
+        data = manifest()
+        data["sources"].pop(source, None)
+        _write_manifest(data)
+
+
+# -------------------------------
+# Read
+# -------------------------------
+def _dataset(table):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    root = STORE_DIR / table
+    partitioning = ds.partitioning(pa.schema([(k, pa.string()) for k in KEYS]), flavor="hive")
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning)
+    # Sources may differ in columns; unify one file schema per source
+    seen, schemas = set(), []
+    for path in dataset.files:
+        source = os.path.basename(path).rsplit("-", 1)[0]
+        if source not in seen:
+            seen.add(source)
+            schemas.append(pq.read_schema(path).remove_metadata())
+    if len(schemas) > 1:
+        schema = pa.unify_schemas(schemas + [partitioning.schema], promote_options="permissive")
+        dataset = ds.dataset(root, format="parquet", partitioning=partitioning, schema=schema)
+    return dataset
+
+
+def _filter(states=None, benches=None, years=None):
+    import pyarrow.dataset as ds
+
+    expr = None
+    for key, values in zip(KEYS, (states, benches, years)):
+        if values:
+            term = ds.field(key).isin([str(v) for v in values])
+            expr = term if expr is None else expr & term
+    return expr
+
+
+def plan(table, states=None, benches=None, years=None):
+    """(files read, files in table) for a filter, without reading any data."""
+    dataset = _dataset(table)
+    selected = sum(1 for _ in dataset.get_fragments(filter=_filter(states, benches, years)))
+    return selected, len(dataset.files)
+
+
+def read(table, states=None, benches=None, years=None, columns=None):
+    """
+    Rows of `table` in the selected partitions, in ingestion order, without the
+    partition key columns. `None` for a key means every value.
+    """
+    dataset = _dataset(table)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names] + ["_row"]
+    with span(f"partitions.read.{table}"):
+        frame = dataset.to_table(columns=columns, filter=_filter(states, benches, years)).to_pandas()
+    frame = frame.sort_values("_row", kind="stable", ignore_index=True)
+    return frame.drop(columns=["_row", *[k for k in KEYS if k in frame.columns]])
+
+
+def listing():
+    """One row per stored partition (table, state, bench, year, files), from the directory tree only."""
+    rows = []
+    for table in TABLES:
+        root = STORE_DIR / table
+        if not root.exists():
+            continue
+        for path in root.glob("state=*/bench=*/year=*"):
+            keys = dict(part.split("=", 1) for part in path.relative_to(root).parts)
+            rows.append({"table": table, **{k: unquote(v) for k, v in keys.items()},
+                         "files": sum(1 for _ in path.glob("*.parquet"))})
+    return pd.DataFrame(rows, columns=["table", *KEYS, "files"])
+
+
+@cached("index", max_entries=2, copy=True)
+def partition_index(dataset_version):
+    """listing() of the `cases` table, cached per dataset version (for filter options)."""
+    frame = listing()
+    return frame[frame["table"] == "cases"].reset_index(drop=True)
+
+
+@timed("partitions.query")
+@cached("clean", max_entries=16)
+def query(dataset_version, states=None, benches=None, years=None):
+    """
+    Cases, hearings and their merge for the selected partitions, shared read-only.
+
+    Keys are tuples of partition values (strings); cached per dataset version
+    and selection, so a filter combination is read once per process.
+    """
+    from preprocessing import merge_data
+
+    cases = read("cases", states, benches, years)
+    hearings = read("hearings", states, benches, years)
+    return cases, hearings, merge_data(cases, hearings)
+
+
+# -------------------------------
+# Command line
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    from preprocessing import clean_source
+
+    if len(sys.argv) == 5 and sys.argv[1] == "ingest":
+        name, cases_path, hearings_path = sys.argv[2:]
+        fingerprint = "|".join(f"{os.path.basename(p)}:{os.stat(p).st_size}:{os.stat(p).st_mtime_ns}"
+                               for p in (cases_path, hearings_path))
+        ingest(name, *clean_source(pd.read_csv(cases_path), pd.read_csv(hearings_path)), fingerprint)
+        print(f"ingested {name}: {manifest()['sources'][name]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == "remove":
+        remove(sys.argv[2])
+    elif len(sys.argv) == 2 and sys.argv[1] == "list":
+        print(json.dumps(manifest(), indent=2))
+        print(listing().to_string(index=False))
+    else:
+        print(__doc__)
+        sys.exit(2)
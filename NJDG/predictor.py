@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from profiling import timed
+
+# -------------------------------
+# Slider grid for the rule-based predictor
+# -------------------------------
+HEARING_WEIGHTS = np.arange(10, 51)   # "Days per hearing"
+YEAR_WEIGHTS = np.arange(5, 31)       # "Year effect (days)"
+BASELINES = np.arange(50, 201)        # "Baseline days"
+
+REQUIRED_COLS = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
+
+CHUNK_CELLS = 2_000_000
+
+
+@timed("predictor.rule_predict")
+def rule_predict(cases, hearing_weight, year_weight, baseline, first_year=None):
+    """
+    Rule-based disposal prediction: hearings * w_h + years since first filing * w_y + baseline.
+
+    `first_year` defaults to the earliest filing year in `cases`; pass the
+    dataset's when `cases` is only a sample of it.
+    """
+    if first_year is None:
+        first_year = cases["filing_year"].min()
+    return (
+        cases["total_hearings"] * hearing_weight +
+        (cases["filing_year"] - first_year) * year_weight +
+        baseline
+    )
+
+
+def _model_inputs(cases):
+    """Return integer (hearings, year offset, actual days) arrays with incomplete rows dropped."""
+    year_offset = cases["filing_year"] - cases["filing_year"].min()
+    frame = pd.DataFrame({
+        "h": cases["total_hearings"],
+        "y": year_offset,
+        "d": cases["disposal_days"],
+    }).dropna()
+    return (
+        frame["h"].to_numpy(dtype=np.int64),
+        frame["y"].to_numpy(dtype=np.int64),
+        frame["d"].to_numpy(dtype=np.int64),
+    )
+
+
+# -------------------------------
+# Error surface over the whole slider grid
+# -------------------------------
+def compute_error_surface(hearings, year_offset, actual, chunk_size=64):
+    """
+    MAE and RMSE for every (hearing weight, year weight, baseline) on the grid.
+
+    For each (w_h, w_y) pair the residual without baseline is r = w_h*h + w_y*y - d.
+    Rows of r are sorted in chunks and laid end to end with a per-row offset so a
+    single searchsorted answers every baseline at once; the absolute error then
+    follows from prefix sums. RMSE has a closed form in mean(r) and mean(r^2).
+    """
+    n = len(actual)
+    shape = (len(HEARING_WEIGHTS), len(YEAR_WEIGHTS), len(BASELINES))
+    # Keep the (chunk, n) working arrays to about CHUNK_CELLS values on large datasets
+    chunk_size = max(1, min(chunk_size, CHUNK_CELLS // max(n, 1)))
+    if n == 0:
+        nan = np.full(shape, np.nan, dtype=np.float32)
+        return {"mae": nan, "rmse": nan.copy(), "n_cases": 0}
+
+    wh, wy = np.meshgrid(HEARING_WEIGHTS, YEAR_WEIGHTS, indexing="ij")
+    wh, wy = wh.ravel(), wy.ravel()
+    n_pairs = len(wh)
+
+    mae = np.empty((n_pairs, len(BASELINES)), dtype=np.float64)
+    rmse = np.empty_like(mae)
+    b = BASELINES.astype(np.int64)
+
+    for start in range(0, n_pairs, chunk_size):
+        stop = min(start + chunk_size, n_pairs)
+        k = stop - start
+
+        # (k, n) residuals before adding the baseline
+        r = (wh[start:stop, None] * hearings[None, :] +
+             wy[start:stop, None] * year_offset[None, :] -
+             actual[None, :])
+        r.sort(axis=1)
+
+        prefix = np.zeros((k, n + 1), dtype=np.int64)
+        np.cumsum(r, axis=1, out=prefix[:, 1:])
+        total = prefix[:, -1]
+
+        # Shift each row into its own disjoint range so the flattened array stays sorted.
+        lo = min(r[:, 0].min(), -b.max())
+        span = max(r[:, -1].max(), -b.min()) - lo + 1
+        offsets = np.arange(k, dtype=np.int64)[:, None] * span
+        flat = (r - lo + offsets).ravel()
+
+        # error = r + baseline, so |error| changes sign at r = -baseline
+        queries = (-b[None, :] - lo) + offsets
+        counts = np.searchsorted(flat, queries.ravel(), side="left").reshape(k, -1)
+        counts -= np.arange(k, dtype=np.int64)[:, None] * n
+
+        below = np.take_along_axis(prefix, counts, axis=1)
+        t = -b[None, :]
+        abs_sum = t * counts - below + (total[:, None] - below) - t * (n - counts)
+        mae[start:stop] = abs_sum / n
+
+        mean_r = total / n
+        mean_r2 = np.einsum("ij,ij->i", r.astype(np.float64), r.astype(np.float64)) / n
+        mse = mean_r2[:, None] + 2 * b[None, :] * mean_r[:, None] + b[None, :] ** 2
+        rmse[start:stop] = np.sqrt(np.maximum(mse, 0))
+
+    return {
+        "mae": mae.reshape(shape).astype(np.float32),
+        "rmse": rmse.reshape(shape).astype(np.float32),
+        "n_cases": n,
+    }
+
+
+@timed("predictor.error_surface")
+@cached("model", max_entries=2, copy=True, spinner="Computing error surface...")
+def error_surface(_cases, dataset_version):
+    """Cached error surface; recomputed only when the dataset version changes."""
+    return compute_error_surface(*_model_inputs(_cases))
+
+
+def lookup_errors(surface, hearing_weight, year_weight, baseline):
+    """Return (mae, rmse) for a slider position."""
+    idx = (
+        int(hearing_weight - HEARING_WEIGHTS[0]),
+        int(year_weight - YEAR_WEIGHTS[0]),
+        int(baseline - BASELINES[0]),
+    )
+    return float(surface["mae"][idx]), float(surface["rmse"][idx])
+
+
+@timed("predictor.best_weights")
+def best_weights(surface, metric="mae"):
+    """Return the (hearing_weight, year_weight, baseline) that minimises the metric."""
+    i, j, k = np.unravel_index(np.nanargmin(surface[metric]), surface[metric].shape)
+    return int(HEARING_WEIGHTS[i]), int(YEAR_WEIGHTS[j]), int(BASELINES[k])
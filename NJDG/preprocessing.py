@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
 import warnings
 import logging
 import os
+from caches import cached
+from profiling import timed
 
 os.environ['PYTHONWARNINGS'] = 'ignore::DeprecationWarning'
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -23,32 +25,135 @@ except:
 # -------------------------------
 # Step 1: Load Data
 # -------------------------------
-@st.cache_data(ttl=3600)   # caches for 1 hour
-def load_data():
+DATA_FILES = ("ISDMHack_Cases_students.csv", "ISDMHack_Hear_students.csv")
+# Bumped when CASE_SCHEMA / HEARING_SCHEMA change, so stored and shared frames are rebuilt
+SCHEMA_VERSION = 4
+
+# Version the app currently serves; set by warmup.py once every cache for it is built
+_published = {"version": None}
+
+
+def csv_version():
+    """Fingerprint of the source CSVs (name, size, mtime) as they are on disk now and of the schema they are cleaned to."""
     from pathlib import Path
 
     base_dir = Path(__file__).parent
+    parts = []
+    for name in DATA_FILES:
+        path = base_dir / "data" / name
+        if path.exists():
+            stat = path.stat()
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts + [f"schema:{SCHEMA_VERSION}"])
+
+
+def source_version():
+    """Fingerprint of everything the dataset is built from: the CSVs and other courts in the partition store."""
+    from partitions import external_fingerprint
+
+    extra = external_fingerprint()
+    return csv_version() + (f"|{extra}" if extra else "")
+
 
-    cases_path = base_dir / "data" / "ISDMHack_Cases_students.csv"
-    hearings_path = base_dir / "data" / "ISDMHack_Hear_students.csv"
+def dataset_version():
+    """
+    Version used to key derived caches.
 
+    This is the version the warm-up thread has published, so requests keep using
+    fully built caches while a changed CSV is prepared in the background; before
+    anything is published it is the on-disk fingerprint.
+    """
+    return _published["version"] or source_version()
+
+
+def publish_version(version):
+    _published["version"] = version
+
+
+@cached("raw", max_entries=2, copy=True)
+def _read_csvs(version):
+    from pathlib import Path
+
+    base_dir = Path(__file__).parent
 
+    cases_path = base_dir / "data" / DATA_FILES[0]
+    hearings_path = base_dir / "data" / DATA_FILES[1]
 
     cases = pd.read_csv(cases_path)
     hearings = pd.read_csv(hearings_path)
 
     return cases, hearings
 
+
+@timed("preprocessing.load_data")
+def load_data():
+    # Keyed by version rather than a TTL: entries only go stale when the CSVs change
+    return _read_csvs(dataset_version())
+
 # -------------------------------
-# Step 2: Normalize column names
+# Step 2: Normalize column names and types
 # -------------------------------   
 def normalize_columns(df):
     df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
     return df
 
+
+# Declared type of every known column. Cleaning casts to it, so each source (and
+# each partition file) has the same schema and nothing downstream re-parses.
+TEXT, DATE, NUMBER, COUNT = "text", "date", "number", "count"
+
+CASE_SCHEMA = {
+    'cnr_number': TEXT, 'combined_case_number': TEXT, 'case_number': TEXT, 'case_type': TEXT,
+    'date_filed': DATE, 'registration_date': DATE, 'decision_date': DATE,
+    'total_hearings': COUNT, 'current_status': TEXT, 'nature_of_disposal': TEXT,
+    'disposaltime_adj': NUMBER,
+}
+
+# Hearing dates other than businessondate are kept as written (parsed where used)
+HEARING_SCHEMA = {
+    'cnr_number': TEXT, 'combinedcasenumber': TEXT, 'hearing_id': TEXT, 'casetype': TEXT,
+    'petitioneradvocate': TEXT, 'respondentadvocate': TEXT,
+    'currentstage': TEXT, 'lastactiontaken': TEXT, 'remappedstages': TEXT, 'purposeofhearing': TEXT,
+    'beforehonourablejudges': TEXT, 'beforehonourablejudgeone': TEXT, 'beforehonourablejudgetwo': TEXT,
+    'beforehonourablejudgethree': TEXT, 'beforehonourablejudgefour': TEXT, 'beforehonourablejudgefive': TEXT,
+    'njdg_judge_name': TEXT,
+    'nexthearingdate': TEXT, 'appearancedate': TEXT, 'previoushearing': TEXT, 'businessondate': TEXT,
+    'syncdate': TEXT,
+    'courtsate': TEXT, 'courtname': TEXT, 'courttype': TEXT, 'full_identifier': TEXT, 'caseuniquevalue': TEXT,
+    'courtcode': NUMBER, 'boardsrno': NUMBER, 'parsingyear': NUMBER, 'courthallnumber': NUMBER,
+}
+
+
+def _integral(values):
+    """True if every present value of a float column is a whole number that fits int64 exactly."""
+    present = values.dropna().to_numpy()
+    return bool(np.all((present == np.floor(present)) & (np.abs(present) < 2 ** 53)))
+
+
+def apply_schema(frame, schema):
+    """Cast the columns of `frame` named in `schema`; other columns are left as read."""
+    for col, kind in schema.items():
+        if col not in frame.columns:
+            continue
+        values = frame[col]
+        if kind == TEXT:
+            if values.dtype.kind == 'f' and _integral(values):
+                # Read as float only because of missing values: 7.0 is written "7"
+                values = values.astype('Int64')
+            # Missing values stay missing (astype('str') writes "nan" before pandas 3)
+            frame[col] = values.astype('str').mask(values.isna())
+        elif kind == DATE:
+            frame[col] = pd.to_datetime(values, errors='coerce')
+        elif kind == NUMBER:
+            frame[col] = pd.to_numeric(values, errors='coerce')
+        elif kind == COUNT:
+            frame[col] = pd.to_numeric(values, errors='coerce').fillna(0).astype('int64')
+    return frame
+
 # -------------------------------
 # Step 3: Clean Cases Data
 # -------------------------------
+@timed("preprocessing.clean_cases")
 def clean_cases(cases):
     cases = normalize_columns(cases)
 
@@ -60,10 +165,8 @@ def clean_cases(cases):
     }
     cases.rename(columns=col_map, inplace=True)
 
-    # Convert dates safely
-    for col in ['date_filed', 'decision_date', 'registration_date']:
-        if col in cases.columns:
-            cases[col] = pd.to_datetime(cases[col], errors='coerce')
+    # Dates, counts and text columns to their declared types
+    cases = apply_schema(cases, CASE_SCHEMA)
 
     # Calculate disposal_days if possible
     if 'date_filed' in cases.columns and 'decision_date' in cases.columns:
@@ -87,40 +190,173 @@ def clean_cases(cases):
 # -------------------------------
 # Step 4: Clean Hearings Data
 # -------------------------------
+@timed("preprocessing.clean_hearings")
 def clean_hearings(hearings):
-    hearings = normalize_columns(hearings).copy()
+    """
+    Every hearing (one row per hearing_id), grouped by case in order of first
+    appearance and by date within a case, so the hearings of a case are one
+    contiguous run (see hearing_offsets).
+    """
+    hearings = apply_schema(normalize_columns(hearings).copy(), HEARING_SCHEMA)
 
     # Convert dates
     if 'businessondate' in hearings.columns:
         hearings['business_on_date'] = pd.to_datetime(hearings['businessondate'], errors='coerce')
 
-    # Drop duplicate CNRs
+    # Drop repeated hearings, keeping the history of each case
+    hearings = hearings.drop_duplicates(subset='hearing_id' if 'hearing_id' in hearings.columns else None)
+
     if 'cnr_number' in hearings.columns:
-        hearings = hearings.drop_duplicates(subset='cnr_number')
         hearings.loc[:, 'cnr_number'] = hearings['cnr_number'].astype(str)
+        case_order = pd.factorize(hearings['cnr_number'])[0]
+        keys = [case_order]
+        if 'business_on_date' in hearings.columns:
+            keys.insert(0, hearings['business_on_date'].to_numpy())
+        # lexsort is stable and sorts NaT last
+        hearings = hearings.iloc[np.lexsort(keys)].reset_index(drop=True)
 
     return hearings
 
 # -------------------------------
-# Step 5: Memory-safe merge
+# Step 5: Joins (hearings with their case, cases with their hearings)
 # -------------------------------
+@timed("preprocessing.merge_data")
 def merge_data(cases, hearings, chunk_size=100000):
     merged_chunks = []
-    for start in range(0, len(hearings), chunk_size):
+    # One chunk at least, so no hearings still give the merged columns
+    for start in range(0, max(len(hearings), 1), chunk_size):
         chunk = hearings.iloc[start:start+chunk_size]
         merged_chunk = chunk.merge(cases, on='cnr_number', how='left')
         merged_chunks.append(merged_chunk)
     merged_data = pd.concat(merged_chunks, ignore_index=True)
     return merged_data
 
+
+# Case-number columns tried in order for the case -> hearings join
+CASE_JOIN_KEYS = ('combined_case_number', 'cnr_number', 'case_number')
+HEARING_JOIN_KEYS = ('combinedcasenumber', 'cnr_number', 'case_number')
+
+
+@timed("preprocessing.merge_case_hearings")
+def merge_case_hearings(cases, hearings):
+    """
+    Cases left-joined with their hearings on the case number, as the judge
+    dashboard lists them (cases without hearings are kept), with a `judge`
+    column; None when no merge key exists.
+    """
+    left_key = next((k for k in CASE_JOIN_KEYS if k in cases.columns), None)
+    right_key = next((k for k in HEARING_JOIN_KEYS if k in hearings.columns), None)
+    if not left_key or not right_key:
+        return None
+
+    merged = pd.merge(
+        cases,
+        hearings,
+        left_on=left_key,
+        right_on=right_key,
+        how='left',
+        suffixes=('_case', '_hear')
+    )
+    merged['judge'] = merged.get('beforehonourablejudges', merged.get('njdg_judge_name', 'unknown'))
+    return merged
+
+# -------------------------------
+# Step 6: Per-case attributes from hearings
+# -------------------------------
+def hearing_offsets(cnr):
+    """
+    (case CNRs, offsets) for hearings grouped by case as clean_hearings stores
+    them: the hearings of case i are rows offsets[i]:offsets[i + 1], oldest first.
+    """
+    cnr = np.asarray(cnr)
+    starts = np.flatnonzero(cnr[1:] != cnr[:-1]) + 1
+    offsets = np.concatenate([[0], starts, [len(cnr)]]).astype(np.int64) if len(cnr) else np.zeros(1, np.int64)
+    return cnr[offsets[:-1]], offsets
+
+
+@timed("preprocessing.case_attributes")
+def case_attributes(cases, hearings, columns):
+    """Attach hearing-level attributes (bench, court hall, case type...) to each case from its first hearing."""
+    columns = [c for c in columns if c in hearings.columns and c not in cases.columns]
+    if not columns:
+        return cases
+    _, offsets = hearing_offsets(hearings['cnr_number'].to_numpy())
+    first = hearings.iloc[offsets[:-1]][['cnr_number'] + columns]
+    return cases.merge(first, on='cnr_number', how='left')
+
+
+@timed("preprocessing.latest_hearing")
+def latest_hearing(cases, hearings):
+    """
+    Add each case's last_hearing_date and current_stage, read from its latest
+    hearing in one pass over the offsets (missing for cases without hearings).
+    """
+    if 'cnr_number' not in hearings.columns:
+        return cases
+    cnr, offsets = hearing_offsets(hearings['cnr_number'].to_numpy())
+    latest = offsets[1:] - 1
+    summary = {'cnr_number': cnr}
+    for source, name in (('business_on_date', 'last_hearing_date'), ('remappedstages', 'current_stage')):
+        if source in hearings.columns and name not in cases.columns:
+            summary[name] = hearings[source].to_numpy()[latest]
+    return cases.merge(pd.DataFrame(summary), on='cnr_number', how='left')
+
+
+@timed("preprocessing.clean_source")
+def clean_source(cases, hearings):
+    """Cleaned (cases, hearings) of one source as the partition store holds them."""
+    from adjournments import case_adjournments
+
+    hearings = clean_hearings(hearings)
+    cases = latest_hearing(clean_cases(cases), hearings)
+    if 'cnr_number' in hearings.columns:
+        cases = cases.merge(case_adjournments(hearings), on='cnr_number', how='left')
+        cases['adjournments'] = cases['adjournments'].fillna(0).astype('int64')
+    return cases, hearings
+
+# -------------------------------
+# Step 7: Partition store and shared prepared frames
+# -------------------------------
+def sync_store(dataset_version):
+    """Clean the data/ CSVs into the partition store if they changed since the last ingest."""
+    from partitions import BUILTIN_SOURCE, ingest, source_fingerprint
+
+    fingerprint = csv_version()
+    if source_fingerprint(BUILTIN_SOURCE) != fingerprint:
+        # Read the version being prepared, which may not be published yet
+        cases, hearings = _read_csvs(dataset_version)
+        ingest(BUILTIN_SOURCE, *clean_source(cases, hearings), fingerprint)
+
+
+# -------------------------------
+@cached("clean", max_entries=2)
+def prepared_data(dataset_version):
+    """
+    Cleaned cases, hearings and their merge with lower-case columns, shared by all sessions (read-only).
+
+    They are read from the partition store (see partitions.py), after cleaning
+    the CSVs into it if they changed, and memory-mapped from files shared with
+    other worker processes (see shared_data.py), so they are built once per
+    version across processes.
+    """
+    from partitions import read
+    from shared_data import shared_frames
+
+    def _build():
+        sync_store(dataset_version)
+        cases = read("cases")
+        hearings = read("hearings")
+        merged = merge_data(cases, hearings)
+        return {"cases": cases, "hearings": hearings, "merged": merged}
+
+    frames = shared_frames(dataset_version, "prepared", _build)
+    return frames["cases"], frames["hearings"], frames["merged"]
+
 # -------------------------------
 # Example usage
 # -------------------------------
 if __name__ == "__main__":
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged_data = merge_data(cases, hearings)
+    cases, hearings, merged_data = prepared_data(dataset_version())
 
     print(merged_data.head())
     print(f"Total rows after merge: {len(merged_data)}")
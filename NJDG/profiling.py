@@ -0,0 +1,156 @@
+"""
+Lightweight span timing for the app's hot paths.
+
+    with span("chart.disposal_trend"):
+        ...
+
+    @timed("preprocessing.clean_cases")
+    def clean_cases(cases): ...
+
+Each page calls begin_page(name) first; spans are then aggregated per
+(page, span) into a fixed-size ring of recent durations, from which the
+Diagnostics page computes rolling percentiles. Recording a span costs two
+perf_counter calls and a deque append, so it stays on in production.
+
+Environment:
+    NYAYADRISHTI_PROFILING=0        disable recording
+    NYAYADRISHTI_SPAN_LOG=path      also append every span to a JSON-lines file
+    NYAYADRISHTI_ADMINS=A,B         users allowed to open the Diagnostics page
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+ENABLED = os.environ.get("NYAYADRISHTI_PROFILING", "1") != "0"
+SPAN_LOG = os.environ.get("NYAYADRISHTI_SPAN_LOG")
+ADMINS = {a.strip().upper() for a in os.environ.get("NYAYADRISHTI_ADMINS", "").split(",") if a.strip()}
+
+# Durations kept per (page, span) for the rolling percentiles
+WINDOW = 1000
+# Span records buffered before the JSON sink writes them out
+SINK_BATCH = 200
+
+_local = threading.local()
+_lock = threading.Lock()
+_windows = {}         # (page, span) -> deque of seconds
+_totals = {}          # (page, span) -> [count, total seconds] since start/reset
+_sink = []
+
+
+# -------------------------------
+# Recording
+# -------------------------------
+def begin_page(page):
+    """Attribute the spans recorded by this script run (this thread) to `page`."""
+    _local.page = page
+
+
+def current_page():
+    return getattr(_local, "page", "(background)")
+
+
+def record(name, seconds, page=None):
+    key = (page or current_page(), name)
+    with _lock:
+        window = _windows.get(key)
+        if window is None:
+            window = _windows[key] = deque(maxlen=WINDOW)
+            _totals[key] = [0, 0.0]
+        window.append(seconds)
+        totals = _totals[key]
+        totals[0] += 1
+        totals[1] += seconds
+        if SPAN_LOG:
+            _sink.append({"ts": time.time(), "page": key[0], "span": name, "ms": round(seconds * 1000, 3)})
+            if len(_sink) >= SINK_BATCH:
+                _flush_locked()
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as `name`; an exception still records the span."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator form of span(); place it above st.cache_* so cache hits are timed too."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# -------------------------------
+# JSON sink
+# -------------------------------
+def _flush_locked():
+    global _sink
+    batch, _sink = _sink, []
+    try:
+        with open(SPAN_LOG, "a") as f:
+            f.writelines(json.dumps(rec) + "\n" for rec in batch)
+    except OSError:
+        pass
+
+
+def flush():
+    """Write buffered span records to NYAYADRISHTI_SPAN_LOG."""
+    with _lock:
+        if SPAN_LOG and _sink:
+            _flush_locked()
+
+
+atexit.register(flush)
+
+
+# -------------------------------
+# Reporting
+# -------------------------------
+def summary():
+    """One row per (page, span): counts, total time and p50/p90/p99/max over the rolling window (ms)."""
+    with _lock:
+        snapshot = [(key, np.fromiter(window, dtype=float), *_totals[key])
+                    for key, window in _windows.items()]
+    rows = []
+    for (page, name), window, count, total in snapshot:
+        p50, p90, p99 = np.percentile(window, [50, 90, 99]) * 1000
+        rows.append({"page": page, "span": name, "count": count, "total_s": total,
+                     "window": len(window), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99,
+                     "max_ms": window.max() * 1000})
+    columns = ["page", "span", "count", "total_s", "window", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+    frame = pd.DataFrame(rows, columns=columns)
+    return frame.sort_values("total_s", ascending=False, ignore_index=True)
+
+
+def reset():
+    with _lock:
+        _windows.clear()
+        _totals.clear()
+
+
+def is_admin(user_name):
+    return bool(user_name) and str(user_name).strip().upper() in ADMINS
@@ -0,0 +1,845 @@
+"""
+Query backends the pages read their data through.
+
+Pages ask the backend for what they render (counts, curves, one judge's rows)
+rather than slicing the full cases / hearings frames themselves.
+
+pandas (default): the prepared frames are held in memory, memory-mapped and
+shared between worker processes (see shared_data.py), and the cached
+aggregations in survival.py, forecasting.py and predictor.py run over them.
+
+duckdb: nothing is loaded up front. Queries run in an embedded DuckDB database
+over the Parquet files of the partition store (see partitions.py). Filters on
+state / bench / filing year prune partition files. Joins and aggregations run
+in the engine, which spills to STATE_DIR/duckdb_tmp beyond its memory limit,
+so a process holds result-sized frames whatever the size of the dataset. The
+predictor's error surface and the anomaly model are fitted on a bounded sample
+of cases in this mode.
+
+Environment:
+    NYAYADRISHTI_BACKEND=duckdb         query the partition store out of core
+    NYAYADRISHTI_DUCKDB_MEMORY=1GB      DuckDB memory limit
+    NYAYADRISHTI_DUCKDB_THREADS=4       DuckDB threads (default: one per core)
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from caches import cached
+from db import STATE_DIR
+from partitions import KEYS, STORE_DIR, TABLES
+from profiling import span, timed
+
+BACKEND = os.environ.get("NYAYADRISHTI_BACKEND", "pandas").lower()
+DUCKDB_MEMORY = os.environ.get("NYAYADRISHTI_DUCKDB_MEMORY", "1GB")
+DUCKDB_THREADS = os.environ.get("NYAYADRISHTI_DUCKDB_THREADS")
+DUCKDB_TEMP_DIR = STATE_DIR / "duckdb_tmp"
+
+# Result sizes: rows of the prediction table and chart, and sample sizes for models (duckdb)
+PREDICTION_ROWS = 50_000
+MAX_MODEL_ROWS = 100_000
+ANOMALY_ROWS = 100_000
+HISTOGRAM_BINS = 40
+
+STAGE_COLUMN = "remappedstages"
+
+
+def histogram_frame(edges, counts):
+    """Bars of a histogram: left edge, right edge and count per bin."""
+    return pd.DataFrame({"start": edges[:-1], "end": edges[1:], "count": np.asarray(counts, dtype=np.int64)})
+
+
+class Backend:
+    """
+    What the pages query. Every method takes the dataset version first.
+
+    `states` / `benches` / `years` are tuples of partition values (strings), or
+    None for every value, as for partitions.query().
+    """
+    name = None
+
+    def warmup_stages(self, version):
+        """(name, callable) pairs run by warmup.py, in order, before `version` is published."""
+        from adjournments import DIMENSIONS
+        from survival import GROUP_COLUMNS
+
+        def _survival():
+            # Analytics asks for the whole dataset while every filter is left at its default
+            self.survival(version, "filing_year")
+            self.survival(version, next(iter(GROUP_COLUMNS.values())))
+
+        return [
+            ("alerts", lambda: self.schedule_hearing_alerts(version)),
+            ("predictor", lambda: self.error_surface(version)),
+            ("forecast", lambda: self.backlog_forecast(version)),
+            ("survival", _survival),
+            ("workload", lambda: self.judge_workload(version)),
+            ("names", lambda: self.name_index(version)),
+            ("anomaly", lambda: self.anomaly_frame(version)),
+            ("adjournments", lambda: [self.adjournment_rates(version, d) for d in DIMENSIONS]),
+        ]
+
+
+    # Names: logins and dashboards resolve typed names through one index
+    def name_index(self, version):
+        """name_index.NameIndex over every judge and advocate name, from identities()."""
+        from name_index import load_name_index
+
+        return load_name_index(version, self.name, lambda: self.identities(version))
+
+    def resolve_name(self, version, name, role=None):
+        """The identity (display name and every spelling) `name` is a spelling of, or None."""
+        return self.name_index(version).resolve(name, role)
+
+    def has_role(self, version, name, role):
+        return self.resolve_name(version, name, role) is not None
+
+    def name_candidates(self, version, name, role=None, limit=5):
+        """Identities ranked by similarity to `name`, for suggestions when it does not resolve."""
+        return self.name_index(version).search(name, role, limit)
+
+    def _judge_names(self, version, judge):
+        """Spellings of a judge's name, or the name as typed when it is not in the directory."""
+        from user_directory import normalize_name
+
+        identity = self.resolve_name(version, judge, "Judge")
+        return identity["variants"] if identity else (normalize_name(judge),)
+
+
+# -------------------------------
+# pandas: shared in-memory frames
+# -------------------------------
+@cached("clean", max_entries=2)
+def _case_durations(version):
+    from preprocessing import prepared_data
+    from survival import case_durations
+
+    cases, hearings, _ = prepared_data(version)
+    return case_durations(cases, hearings)
+
+
+class PandasBackend(Backend):
+    name = "pandas"
+
+    def _frames(self, version, states=None, benches=None, years=None):
+        from partitions import query
+        from preprocessing import prepared_data
+
+        # With nothing filtered out the shared frames are used as they are
+        if states or benches or years:
+            return query(version, states, benches, years)
+        return prepared_data(version)
+
+    def warmup_stages(self, version):
+        from preprocessing import prepared_data
+        from user_directory import load_directory
+        from views import judge_frame
+
+        return [
+            # Attaches to the frames another worker process published, if any
+            ("prepare", lambda: prepared_data(version)),
+            ("views", lambda: judge_frame(version)),
+            ("directory", lambda: load_directory(self._frames(version)[2], version)),
+        ] + super().warmup_stages(version)
+
+    def columns(self, version, table):
+        cases, hearings, _ = self._frames(version)
+        return list((cases if table == "cases" else hearings).columns)
+
+    def filing_years(self, version):
+        cases = self._frames(version)[0]
+        return sorted(cases["filing_year"].dropna().unique()) if "filing_year" in cases.columns else []
+
+    # Home and Analytics
+    def home_stats(self, version):
+        cases = self._frames(version)[0]
+        # Pending = not yet decided; age is measured up to the latest date in the data
+        as_of = cases[["date_filed", "decision_date"]].max().max()
+        undecided = cases["decision_date"].isna()
+        return {
+            "total_cases": len(cases),
+            "older_than_1": int((undecided & ((as_of - cases["date_filed"]).dt.days > 365)).sum()),
+        }
+
+    def case_metrics(self, version, states=None, benches=None, years=None):
+        cases = self._frames(version, states, benches, years)[0]
+        return {"cases": len(cases), "older_than_1yr": int((cases["disposal_days"] > 365).sum())}
+
+    def stage_counts(self, version, states=None, benches=None, years=None):
+        merged = self._frames(version, states, benches, years)[2]
+        if STAGE_COLUMN not in merged.columns:
+            return None
+        counts = merged[STAGE_COLUMN].value_counts().reset_index()
+        counts.columns = ["Stage", "Count"]
+        return counts
+
+    def judge_workload(self, version, states=None, benches=None, years=None, by="judge", judge=None):
+        """
+        Hearings per judge (with Cases), per (judge, Date) or per (judge, Court Hall)
+        for `by` = "judge" / "day" / "hall", optionally for one `judge`; see benches.py.
+        """
+        from benches import bench_table, workload
+
+        hearings = self._frames(version, states, benches, years)[1]
+        names = None if judge is None else self._judge_names(version, judge)
+        return workload(bench_table(hearings, version, (states, benches, years)), by, names)
+
+    def disposal_histogram(self, version, states=None, benches=None, years=None):
+        cases = self._frames(version, states, benches, years)[0]
+        if "disposal_days" not in cases.columns:
+            return None
+        counts, edges = np.histogram(cases["disposal_days"].dropna(), bins=HISTOGRAM_BINS)
+        return histogram_frame(edges, counts)
+
+    def adjournment_rates(self, version, dimension, states=None, benches=None, years=None):
+        from adjournments import adjournment_rates
+
+        hearings = self._frames(version, states, benches, years)[1]
+        return adjournment_rates(hearings, dimension, version, (states, benches, years))
+
+    def table_batches(self, version, table, states=None, benches=None, years=None):
+        """Record batches of every row of `table` ("cases" / "hearings") in a partition selection, for exports."""
+        from exports import frame_batches
+
+        cases, hearings, _ = self._frames(version, states, benches, years)
+        return frame_batches(cases if table == "cases" else hearings)
+
+    def survival(self, version, column, states=None, benches=None, years=None):
+        from survival import survival_by
+
+        durations = _case_durations(version)
+        if column not in durations.columns:
+            return None
+        if states or benches or years:
+            # Undecided cases stay censored at the whole dataset's latest date
+            cases = self._frames(version, states, benches, years)[0]
+            durations = durations[durations["cnr_number"].isin(cases["cnr_number"])]
+        return survival_by(durations, column, version, (states, benches, years))
+
+    def backlog_forecast(self, version, states=None, benches=None, years=None):
+        from forecasting import backlog_forecast
+
+        cases, hearings, _ = self._frames(version, states, benches, years)
+        return backlog_forecast(cases, hearings, version, (states, benches, years))
+
+    # Predictions
+    def error_surface(self, version):
+        from predictor import error_surface
+
+        return error_surface(self._frames(version)[0], version)
+
+    def prediction_rows(self, version, limit=PREDICTION_ROWS):
+        """(first `limit` cases with the predictor's inputs, earliest filing year)."""
+        cases = self._frames(version)[0]
+        rows = cases[["cnr_number", "total_hearings", "disposal_days", "filing_year"]].head(limit)
+        return rows, cases["filing_year"].min()
+
+    def anomaly_frame(self, version, contamination=None):
+        from anomaly import DEFAULT_CONTAMINATION, anomaly_frame
+
+        return anomaly_frame(version, contamination or DEFAULT_CONTAMINATION)
+
+    # Dashboards and login
+    def judge_view(self, version, judge, columns=None):
+        """
+        {"frame", "rows", "date_filed", "nexthearingdate"} for one judge (see views.judge_frame);
+        `rows` index `frame` and both date arrays. None when no merge key exists.
+
+        `columns` (a tuple) names the columns the caller reads; other backends may
+        leave the rest out of `frame`.
+        """
+        from benches import judge_rows
+        from views import EMPTY_ROWS, judge_frame
+
+        data = judge_frame(version)
+        if data is None:
+            return None
+        rows = EMPTY_ROWS
+        if data["benches"]:
+            rows = np.unique(np.concatenate([EMPTY_ROWS] + [judge_rows(data["benches"], name)
+                                                            for name in self._judge_names(version, judge)]))
+        return {"frame": data["frame"], "rows": rows,
+                "date_filed": data["date_filed"], "nexthearingdate": data["nexthearingdate"]}
+
+    def listed_cases(self, version, day):
+        """
+        Merged rows (case and hearing, as views.judge_frame) listed on `day`, one
+        per case (cause_lists.listed_rows), with the columns cause lists read.
+        """
+        from benches import bench_columns
+        from cause_lists import SOURCE_COLUMNS, listed_rows
+        from views import judge_frame, view
+
+        data = judge_frame(version)
+        if data is None:
+            return pd.DataFrame()
+        frame = data["frame"]
+        columns = [c for c in (*SOURCE_COLUMNS, *bench_columns(frame.columns)) if c in frame.columns]
+        return view(frame, listed_rows(frame, day, data["nexthearingdate"]), columns).reset_index(drop=True)
+
+    def advocate_view(self, version, name):
+        """{"frame", "rows"}: merged rows naming any spelling of `name` as petitioner or respondent advocate."""
+        from user_directory import load_directory, role_rows
+        from views import EMPTY_ROWS
+
+        merged = self._frames(version)[2]
+        identity = self.resolve_name(version, name, "Advocate")
+        rows = role_rows(load_directory(merged, version), identity["variants"], "Advocate") if identity else EMPTY_ROWS
+        return {"frame": merged, "rows": rows}
+
+    def identities(self, version):
+        """user_directory.directory_frame(): name, role, cases, hearings, first_row, last_row."""
+        from user_directory import directory_frame, load_directory
+
+        return directory_frame(load_directory(self._frames(version)[2], version))
+
+    def schedule_hearing_alerts(self, version):
+        from scheduler import start_scheduler
+
+        return start_scheduler(self._frames(version)[2], version)
+
+
+# -------------------------------
+# duckdb: the partition store, out of core
+# -------------------------------
+def _quoted(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _in(column, values, params, cast=str):
+    params.extend(cast(v) for v in values)
+    return f"{column} IN ({', '.join('?' * len(values))})"
+
+
+def _where(states=None, benches=None, years=None, alias=None, extra=()):
+    """(WHERE clause, params) for a partition selection; the engine prunes files on the key columns."""
+    params, terms = [], list(extra)
+    for key, values in zip(KEYS, (states, benches, years)):
+        if values:
+            terms.append(_in(f"{alias}.{key}" if alias else key, values, params))
+    return (" WHERE " + " AND ".join(terms) if terms else ""), params
+
+
+def _split_names(column):
+    """SQL list of the normalized names in a field, as user_directory.role_names() splits it."""
+    from user_directory import _SEPARATORS
+
+    normalized = f"upper(trim(regexp_replace(CAST({column} AS VARCHAR), '\\s+', ' ', 'g')))"
+    return normalized, f"list_transform(string_split_regex({normalized}, '{_SEPARATORS}'), x -> trim(x))"
+
+
+def _name_match(column, params, names, whole_field=True):
+    """
+    SQL condition matching user_directory.role_names() for any of `names`: the
+    whole field or one of its names (only one of its names without
+    `whole_field`, as benches.py).
+    """
+    from name_index import match_key
+
+    normalized, split = _split_names(column)
+    # Spellings share the words of their match key, so every match contains the
+    # longest one: a cheap test that skips the regexes for most rows
+    params.append(max(match_key(names[0]).split(" "), key=len))
+    listed = ", ".join("?" * len(names))
+    terms = [f"list_has_any({split}, [{listed}])"]
+    if whole_field:
+        terms.insert(0, f"{normalized} IN ({listed})")
+        params.extend(names)
+    params.extend(names)
+    return f"(contains(upper(CAST({column} AS VARCHAR)), ?) AND ({' OR '.join(terms)}))"
+
+
+class DuckDBBackend(Backend):
+    name = "duckdb"
+
+    def __init__(self):
+        import duckdb
+
+        config = {"memory_limit": DUCKDB_MEMORY, "temp_directory": str(DUCKDB_TEMP_DIR)}
+        if DUCKDB_THREADS:
+            config["threads"] = int(DUCKDB_THREADS)
+        DUCKDB_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        self._db = duckdb.connect(":memory:", config=config)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._views_version = None
+
+    def _connection(self, version):
+        """This thread's cursor, with the table views (re)bound to the store for `version`."""
+        with self._lock:
+            if self._views_version != version:
+                hive_types = ", ".join(f"'{k}': 'VARCHAR'" for k in KEYS)
+                for table in TABLES:
+                    files = str(STORE_DIR / table / "**" / "*.parquet").replace("'", "''")
+                    self._db.execute(
+                        f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{files}', "
+                        f"hive_partitioning = true, union_by_name = true, hive_types = {{{hive_types}}})"
+                    )
+                self._views_version = version
+        if getattr(self._local, "con", None) is None:
+            self._local.con = self._db.cursor()
+        return self._local.con
+
+    def fetch(self, version, sql, params=()):
+        with span("queries.duckdb"):
+            # Through Arrow: string columns stay Arrow-backed, as in partitions.read()
+            return self._connection(version).execute(sql, list(params)).to_arrow_table().to_pandas()
+
+    def warmup_stages(self, version):
+        from preprocessing import sync_store
+
+        return [
+            ("store", lambda: sync_store(version)),
+            ("home", lambda: self.home_stats(version)),
+        ] + super().warmup_stages(version)
+
+    @cached("index", max_entries=8, copy=True)
+    def columns(_self, version, table):
+        described = _self.fetch(version, f"DESCRIBE SELECT * FROM {table}")
+        return [c for c in described["column_name"] if c not in ("_row", *KEYS)]
+
+    @cached("index", max_entries=2, copy=True)
+    def filing_years(_self, version):
+        years = _self.fetch(version, "SELECT DISTINCT filing_year FROM cases "
+                                     "WHERE filing_year IS NOT NULL ORDER BY 1")
+        return years["filing_year"].tolist()
+
+    def _case_attribute(self, version, column):
+        """SQL for a per-case attribute as survival / forecasting derive it, and whether it needs hearings."""
+        cases = self.columns(version, "cases")
+        if column in cases:
+            return f"c.{_quoted(column)}", False
+        if column == "casetype" and "case_type" in cases:
+            return "c.case_type", False
+        if column in self.columns(version, "hearings"):
+            return f"h.{_quoted(column)}", True
+        return None, False
+
+    @staticmethod
+    def _first_hearing(columns):
+        # preprocessing.case_attributes: each case takes its attributes from its first hearing
+        select = ", ".join(_quoted(c) for c in columns)
+        return (f"first_hearing AS (SELECT DISTINCT ON (cnr_number) cnr_number, {select} "
+                f"FROM hearings ORDER BY cnr_number, _row)")
+
+    # Home and Analytics
+    @timed("queries.home_stats")
+    @cached("aggregate", max_entries=2, copy=True)
+    def home_stats(_self, version):
+        row = _self.fetch(version, """
+            WITH bounds AS (SELECT greatest(max(date_filed), max(decision_date)) AS as_of FROM cases)
+            SELECT count(*) AS total_cases,
+                   count(*) FILTER (WHERE decision_date IS NULL
+                                    AND date_diff('day', date_filed, as_of) > 365) AS older_than_1
+            FROM cases, bounds
+        """).iloc[0]
+        return {"total_cases": int(row["total_cases"]), "older_than_1": int(row["older_than_1"])}
+
+    @cached("aggregate", max_entries=32, copy=True)
+    def case_metrics(_self, version, states=None, benches=None, years=None):
+        where, params = _where(states, benches, years)
+        row = _self.fetch(version, "SELECT count(*) AS cases, count(*) FILTER (WHERE disposal_days > 365) "
+                                   f"AS older_than_1yr FROM cases{where}", params).iloc[0]
+        return {"cases": int(row["cases"]), "older_than_1yr": int(row["older_than_1yr"])}
+
+    def _value_counts(self, version, table, column, names, selection):
+        where, params = _where(*selection, extra=[f"{_quoted(column)} IS NOT NULL"])
+        counts = self.fetch(version, f"SELECT {_quoted(column)} AS value, count(*) AS n FROM {table}{where} "
+                                     "GROUP BY 1 ORDER BY 2 DESC, 1", params)
+        counts.columns = list(names)
+        return counts
+
+    @cached("aggregate", max_entries=32, copy=True)
+    def stage_counts(_self, version, states=None, benches=None, years=None):
+        # Merged rows are the hearings, so stages are counted on the hearings table
+        if STAGE_COLUMN not in _self.columns(version, "hearings"):
+            return None
+        return _self._value_counts(version, "hearings", STAGE_COLUMN, ("Stage", "Count"),
+                                   (states, benches, years))
+
+    @timed("queries.judge_workload")
+    @cached("aggregate", max_entries=64, copy=True)
+    def judge_workload(_self, version, states=None, benches=None, years=None, by="judge", judge=None):
+        """benches.workload() with the bench columns split and exploded in the engine."""
+        from benches import WORKLOAD, bench_columns
+        from user_directory import _PLACEHOLDERS
+
+        hearings = _self.columns(version, "hearings")
+        columns = bench_columns(hearings)
+        _, counted, label = WORKLOAD[by]
+        if not columns or (counted is not None and counted not in hearings):
+            return None
+        where, where_params = _where(states, benches, years)
+        carried = "cnr_number" if counted is None else f"{_quoted(counted)} AS value"
+        params, scans = [], []
+        for col in columns:
+            scans.append(f"SELECT _row, {carried}, unnest({_split_names(_quoted(col))[1]}) AS judge "
+                         f"FROM hearings{where}")
+            params.extend(where_params)
+        # One pair per (hearing, judge), however many columns name the judge
+        keep = f"judge NOT IN ({', '.join('?' * len(_PLACEHOLDERS))})"
+        params.extend(sorted(_PLACEHOLDERS))
+        if judge is not None:
+            names = _self._judge_names(version, judge)
+            keep += f" AND judge IN ({', '.join('?' * len(names))})"
+            params.extend(names)
+        pairs = f"pairs AS (SELECT DISTINCT * FROM ({' UNION ALL '.join(scans)}) WHERE {keep})"
+        if counted is None:
+            return _self.fetch(version, f"""
+                WITH {pairs}
+                SELECT judge AS "Judge", count(*) AS "Hearings", count(DISTINCT cnr_number) AS "Cases"
+                FROM pairs GROUP BY 1 ORDER BY 2 DESC, 1
+            """, params)
+        return _self.fetch(version, f"""
+            WITH {pairs}
+            SELECT judge AS "Judge", value AS {_quoted(label)}, count(*) AS "Hearings"
+            FROM pairs WHERE value IS NOT NULL GROUP BY 1, 2 ORDER BY 1, 3 DESC, 2
+        """, params)
+
+    @cached("aggregate", max_entries=32, copy=True)
+    def disposal_histogram(_self, version, states=None, benches=None, years=None):
+        if "disposal_days" not in _self.columns(version, "cases"):
+            return None
+        where, params = _where(states, benches, years, extra=["disposal_days IS NOT NULL"])
+        bounds = _self.fetch(version, f"SELECT min(disposal_days) AS lo, max(disposal_days) AS hi "
+                                      f"FROM cases{where}", params).iloc[0]
+        if pd.isna(bounds["lo"]):
+            return histogram_frame(*np.histogram([], bins=HISTOGRAM_BINS)[::-1])
+        # Same bins as np.histogram over the values
+        edges = np.histogram_bin_edges([bounds["lo"], bounds["hi"]], bins=HISTOGRAM_BINS)
+        width = edges[1] - edges[0]
+        bins = _self.fetch(
+            version,
+            f"SELECT least(CAST(floor((disposal_days - ?) / ?) AS BIGINT), ?) AS bin, count(*) AS n "
+            f"FROM cases{where} GROUP BY 1",
+            [float(edges[0]), float(width), HISTOGRAM_BINS - 1, *params],
+        )
+        counts = np.bincount(bins["bin"].to_numpy(dtype=np.int64), weights=bins["n"].to_numpy(),
+                             minlength=HISTOGRAM_BINS)
+        return histogram_frame(edges, counts)
+
+    @timed("queries.adjournment_rates")
+    @cached("aggregate", max_entries=64, copy=True)
+    def adjournment_rates(_self, version, dimension, states=None, benches=None, years=None):
+        """
+        adjournments.rate_frame() with the next hearing of each row found by a
+        window over the case; by judge, over the (hearing, judge) pairs of the
+        split bench columns, as judge_workload().
+        """
+        from adjournments import DIMENSIONS, rate_frame
+        from user_directory import _PLACEHOLDERS
+
+        columns = [c for c in DIMENSIONS[dimension] if c in _self.columns(version, "hearings")]
+        if not columns:
+            return None
+        where, params = _where(states, benches, years)
+        if dimension == "Judge":
+            values = " UNION ALL ".join(
+                f"SELECT _row, unnest({_split_names(_quoted(c))[1]}) AS value, adjourned, gap FROM gaps"
+                for c in columns)
+            # One pair per (hearing, judge), however many columns name the judge
+            values = (f"SELECT DISTINCT * FROM ({values}) "
+                      f"WHERE value NOT IN ({', '.join('?' * len(_PLACEHOLDERS))})")
+            params = [*params, *sorted(_PLACEHOLDERS)]
+        else:
+            values = " UNION ALL ".join(
+                f"SELECT CAST({_quoted(c)} AS VARCHAR) AS value, adjourned, gap FROM gaps "
+                f"WHERE {_quoted(c)} IS NOT NULL" for c in columns)
+        rates = _self.fetch(version, f"""
+            WITH gaps AS (
+                SELECT _row, {', '.join(_quoted(c) for c in columns)},
+                       lead(_row) OVER w IS NOT NULL AS adjourned,
+                       date_diff('day', business_on_date, lead(business_on_date) OVER w) AS gap
+                FROM hearings{where}
+                WINDOW w AS (PARTITION BY cnr_number ORDER BY _row)
+            )
+            SELECT value, count(*) AS hearings, count(*) FILTER (WHERE adjourned) AS adjourned,
+                   CAST(sum(gap) AS DOUBLE) AS gap_sum, count(gap) AS gap_count,
+                   max(gap) AS longest
+            FROM ({values}) GROUP BY value
+        """, params)
+        return rate_frame(rates["value"], rates["hearings"], rates["adjourned"], rates["gap_sum"].fillna(0),
+                          rates["gap_count"], rates["longest"])
+
+    def table_batches(self, version, table, states=None, benches=None, years=None):
+        """Streamed from the engine, CHUNK_ROWS rows at a time, on the thread that iterates."""
+        import pyarrow as pa
+        from exports import CHUNK_ROWS
+
+        select = ", ".join(_quoted(c) for c in self.columns(version, table))
+        where, params = _where(states, benches, years)
+        reader = self._connection(version).execute(f"SELECT {select} FROM {table}{where} ORDER BY _row",
+                                                   params).to_arrow_reader(CHUNK_ROWS)
+        try:
+            empty = True
+            for batch in reader:
+                empty = False
+                yield batch
+            if empty:
+                yield pa.RecordBatch.from_pylist([], schema=reader.schema)
+        finally:
+            reader.close()
+
+    @timed("queries.survival")
+    @cached("aggregate", max_entries=32, copy=True)
+    def survival(_self, version, column, states=None, benches=None, years=None):
+        """survival.survival_by() from durations aggregated by (group, duration) in the engine."""
+        from survival import survival_tables
+
+        group, joined = _self._case_attribute(version, column)
+        if group is None:
+            return None
+        # Undecided cases are censored at the whole dataset's latest date, so the
+        # selection is applied after the bounds
+        where, params = _where(states, benches, years, extra=["duration > 0", "grp IS NOT NULL"])
+        counts = _self.fetch(version, f"""
+            WITH {_self._first_hearing([column]) + ',' if joined else ''}
+            durations AS (
+                SELECT {group} AS grp, {', '.join(f'c.{k}' for k in KEYS)}, c.date_filed, c.decision_date
+                FROM cases c {'LEFT JOIN first_hearing h USING (cnr_number)' if joined else ''}
+            ),
+            bounds AS (SELECT greatest(max(decision_date), max(date_filed)) AS as_of FROM durations),
+            spans AS (
+                SELECT grp, {', '.join(KEYS)}, decision_date IS NOT NULL AS event,
+                       date_diff('day', date_filed, coalesce(decision_date, as_of)) + 1 AS duration
+                FROM durations, bounds
+            )
+            SELECT grp, duration, count(*) FILTER (WHERE event) AS events, count(*) AS n
+            FROM spans{where}
+            GROUP BY grp, duration
+        """, params)
+        return survival_tables(counts["grp"], counts["duration"].to_numpy(), counts["events"].to_numpy(),
+                               counts["n"].to_numpy())
+
+    @timed("queries.backlog_forecast")
+    @cached("model", max_entries=16, copy=True, spinner="Forecasting filings and disposals...")
+    def backlog_forecast(_self, version, states=None, benches=None, years=None):
+        """forecasting.backlog_forecast() from monthly counts aggregated in the engine."""
+        from forecasting import SERIES_KEYS, forecast_series, monthly_arrays
+
+        select, joined = [], []
+        for key in SERIES_KEYS:
+            expr, from_hearings = _self._case_attribute(version, key)
+            if from_hearings:
+                joined.append(key)
+            # Series keys are strings, as in forecasting.monthly_counts()
+            select.append(f"coalesce(CAST({expr} AS VARCHAR), 'nan') AS {key}" if expr else f"'All' AS {key}")
+        keys = ", ".join(SERIES_KEYS)
+        where, params = _where(states, benches, years, alias="c", extra=["c.date_filed IS NOT NULL"])
+        counts = _self.fetch(version, f"""
+            WITH {_self._first_hearing(joined) + ',' if joined else ''}
+            series AS (
+                SELECT {', '.join(select)}, c.date_filed, c.decision_date
+                FROM cases c {'LEFT JOIN first_hearing h USING (cnr_number)' if joined else ''}
+                {where}
+            )
+            SELECT 'filed' AS kind, {keys}, year(date_filed) * 12 + month(date_filed) - 1 AS month, count(*) AS n
+            FROM series GROUP BY ALL
+            UNION ALL
+            SELECT 'decided', {keys}, year(decision_date) * 12 + month(decision_date) - 1, count(*)
+            FROM series WHERE decision_date IS NOT NULL GROUP BY ALL
+        """, params)
+        if counts.empty:
+            return None
+        filed, decided = (counts[counts["kind"] == kind] for kind in ("filed", "decided"))
+        return forecast_series(*monthly_arrays(filed, decided))
+
+    # Predictions
+    def _first_year(self, version):
+        return self.fetch(version, "SELECT min(filing_year) AS y FROM cases")["y"].iloc[0]
+
+    @timed("queries.error_surface")
+    @cached("model", max_entries=2, copy=True, spinner="Computing error surface...")
+    def error_surface(_self, version):
+        """predictor.error_surface() on at most MAX_MODEL_ROWS complete cases (a fixed-seed sample)."""
+        from predictor import compute_error_surface
+
+        sample = _self.fetch(version, f"""
+            SELECT * FROM (
+                SELECT CAST(total_hearings AS BIGINT) AS h, CAST(filing_year AS BIGINT) AS y,
+                       CAST(disposal_days AS BIGINT) AS d
+                FROM cases
+                WHERE total_hearings IS NOT NULL AND filing_year IS NOT NULL AND disposal_days IS NOT NULL
+            ) USING SAMPLE reservoir({MAX_MODEL_ROWS} ROWS) REPEATABLE (42)
+        """)
+        first_year = int(_self._first_year(version))
+        return compute_error_surface(sample["h"].to_numpy(), sample["y"].to_numpy() - first_year,
+                                     sample["d"].to_numpy())
+
+    @cached("view", max_entries=2, copy=True)
+    def prediction_rows(_self, version, limit=PREDICTION_ROWS):
+        rows = _self.fetch(version, "SELECT cnr_number, total_hearings, disposal_days, filing_year "
+                                    "FROM cases ORDER BY _row LIMIT ?", [limit])
+        return rows, _self._first_year(version)
+
+    @cached("model", max_entries=8, copy=True, spinner="Fitting anomaly model...")
+    def anomaly_frame(_self, version, contamination=None):
+        """anomaly.anomaly_frame() on a fixed-seed sample of ANOMALY_ROWS cases."""
+        from anomaly import DEFAULT_CONTAMINATION, detect_anomalies, prepare_cases
+
+        select = ", ".join(_quoted(c) for c in _self.columns(version, "cases"))
+        cases = _self.fetch(version, f"""
+            SELECT {select} FROM (
+                SELECT * FROM cases USING SAMPLE reservoir({ANOMALY_ROWS} ROWS) REPEATABLE (42)
+            ) ORDER BY _row
+        """)
+        return detect_anomalies(prepare_cases(cases), contamination or DEFAULT_CONTAMINATION)
+
+    # Dashboards and login
+    def _merge_select(self, version, left, right, left_on, right_on, suffixes, columns=None):
+        """
+        SELECT list reproducing pd.merge's columns: left then right, overlapping
+        names suffixed. Limited to output names in `columns` unless it is None.
+        """
+        tables = {"c": self.columns(version, "cases"), "h": self.columns(version, "hearings")}
+        overlap = set(tables[left]) & set(tables[right])
+        select = []
+        for alias, suffix in ((left, suffixes[0]), (right, suffixes[1])):
+            for col in tables[alias]:
+                # Joined on one shared name: the key appears once, from the left
+                if col == left_on == right_on and alias == right:
+                    continue
+                name = col + suffix if col in overlap and not col == left_on == right_on else col
+                if columns is None or name in columns:
+                    select.append(f"{alias}.{_quoted(col)} AS {_quoted(name)}")
+        return select
+
+    def _judge_join(self, version):
+        """(cases key, hearings key) as preprocessing.merge_case_hearings picks them; None where missing."""
+        from preprocessing import CASE_JOIN_KEYS, HEARING_JOIN_KEYS
+
+        cases, hearings = self.columns(version, "cases"), self.columns(version, "hearings")
+        return (next((k for k in CASE_JOIN_KEYS if k in cases), None),
+                next((k for k in HEARING_JOIN_KEYS if k in hearings), None))
+
+    @timed("queries.judge_view")
+    @cached("view", max_entries=64, copy=True)
+    def judge_view(_self, version, judge, columns=None):
+        """Only `columns` of the merged frame are selected (every column when None)."""
+        from benches import bench_columns
+        from user_directory import _PLACEHOLDERS
+        from views import judge_dates
+
+        hearings = _self.columns(version, "hearings")
+        left_key, right_key = _self._judge_join(version)
+        if not left_key or not right_key:
+            return None
+        judge_col = next((c for c in ("beforehonourablejudges", "njdg_judge_name") if c in hearings), None)
+        judge_expr = f"h.{_quoted(judge_col)}" if judge_col else "'unknown'"
+
+        # The hearings whose bench names the judge (benches.bench_pairs), one scan per column
+        params, names = [], _self._judge_names(version, judge)
+        scans = [f"SELECT _row FROM hearings WHERE {_name_match(_quoted(col), params, names, whole_field=False)}"
+                 for col in bench_columns(hearings)]
+        condition = f"h._row IN ({' UNION ALL '.join(scans)})" if scans and names[0] not in _PLACEHOLDERS else "false"
+        select = _self._merge_select(version, "c", "h", left_key, right_key, ("_case", "_hear"), columns)
+        frame = _self.fetch(version, f"""
+            SELECT {', '.join(select + [f'{judge_expr} AS judge'])}
+            FROM cases c JOIN hearings h ON c.{_quoted(left_key)} = h.{_quoted(right_key)}
+            WHERE {condition}
+            ORDER BY c._row, h._row
+        """, params)
+        return {"frame": frame, "rows": np.arange(len(frame)), **judge_dates(frame)}
+
+    @timed("queries.listed_cases")
+    def listed_cases(self, version, day):
+        """Only hearings dated `day` or naming it as the next date are read."""
+        from benches import bench_columns
+        from cause_lists import SOURCE_COLUMNS, listed_rows
+        from views import judge_dates
+
+        hearings = self.columns(version, "hearings")
+        left_key, right_key = self._judge_join(version)
+        terms = [f"CAST(h.{col} AS DATE) = ?" if col == "business_on_date" else f"TRY_CAST(h.{col} AS DATE) = ?"
+                 for col in ("business_on_date", "nexthearingdate") if col in hearings]
+        if not left_key or not right_key or not terms:
+            return pd.DataFrame()
+        columns = (*SOURCE_COLUMNS, *bench_columns(hearings))
+        select = self._merge_select(version, "c", "h", left_key, right_key, ("_case", "_hear"), columns)
+        frame = self.fetch(version, f"""
+            SELECT {', '.join(select)}
+            FROM cases c JOIN hearings h ON c.{_quoted(left_key)} = h.{_quoted(right_key)}
+            WHERE {' OR '.join(terms)}
+            ORDER BY c._row, h._row
+        """, [day.date()] * len(terms))
+        rows = listed_rows(frame, day, judge_dates(frame)["nexthearingdate"])
+        return frame.iloc[rows].reset_index(drop=True)
+
+    def _role_condition(self, version, names, role, params):
+        from user_directory import ROLE_COLUMNS
+
+        hearings = self.columns(version, "hearings")
+        # One scan per column: an OR across the columns defeats the cheap prefilter in _name_match
+        scans = [f"SELECT _row FROM hearings WHERE {_name_match(_quoted(col), params, names)}"
+                 for col in ROLE_COLUMNS[role] if col in hearings]
+        return f"h._row IN ({' UNION ALL '.join(scans)})" if scans else "false"
+
+    @timed("queries.advocate_view")
+    @cached("view", max_entries=64, copy=True)
+    def advocate_view(_self, version, name):
+        # preprocessing.merge_data: hearings left-joined with cases on the CNR
+        params = []
+        identity = _self.resolve_name(version, name, "Advocate")
+        condition = (_self._role_condition(version, identity["variants"], "Advocate", params)
+                     if identity else "false")
+        select = _self._merge_select(version, "h", "c", "cnr_number", "cnr_number", ("_x", "_y"))
+        frame = _self.fetch(version, f"""
+            SELECT {', '.join(select)}
+            FROM hearings h LEFT JOIN cases c ON h.cnr_number = c.cnr_number
+            WHERE {condition}
+            ORDER BY h._row
+        """, params)
+        return {"frame": frame, "rows": np.arange(len(frame))}
+
+    def identities(self, version):
+        """
+        Every normalized name per role with its case and hearing counts and
+        first / last hearing row, the columns of user_directory.directory_frame().
+        """
+        from user_directory import _PLACEHOLDERS, ROLE_COLUMNS
+
+        hearings = self.columns(version, "hearings")
+        scans = []
+        for role, columns in ROLE_COLUMNS.items():
+            for col in (c for c in columns if c in hearings):
+                normalized, split = _split_names(_quoted(col))
+                scans.append(f"SELECT _row, cnr_number, '{role}' AS role, "
+                             f"unnest(list_distinct(list_prepend({normalized}, {split}))) AS name FROM hearings")
+        if not scans:
+            return pd.DataFrame(columns=["name", "role", "cases", "hearings", "first_row", "last_row"])
+        return self.fetch(version, f"""
+            SELECT name, role, count(DISTINCT cnr_number) AS cases, count(DISTINCT _row) AS hearings,
+                   min(_row) AS first_row, max(_row) AS last_row
+            FROM ({' UNION ALL '.join(scans)})
+            WHERE name NOT IN ({', '.join('?' * len(_PLACEHOLDERS))})
+            GROUP BY 1, 2 ORDER BY 1, 2
+        """, sorted(_PLACEHOLDERS))
+
+    def schedule_hearing_alerts(self, version):
+        from scheduler import start_scheduler
+        from user_directory import ROLE_COLUMNS
+
+        scheduler = start_scheduler()
+        hearings = self.columns(version, "hearings")
+        if scheduler.needs_hearings(version) and "nexthearingdate" in hearings:
+            # Only hearings with a next date can raise an alert
+            columns = ["cnr_number", "nexthearingdate", *(c for cols in ROLE_COLUMNS.values() for c in cols)]
+            select = ", ".join(_quoted(c) for c in columns if c in hearings)
+            upcoming = self.fetch(version, f"SELECT {select} FROM hearings "
+                                           "WHERE nexthearingdate IS NOT NULL ORDER BY _row")
+            scheduler.load_hearings(upcoming, version)
+        return scheduler
+
+
+BACKENDS = {"pandas": PandasBackend, "duckdb": DuckDBBackend}
+
+
+@st.cache_resource(show_spinner=False)
+def backend():
+    """The process-wide backend selected by NYAYADRISHTI_BACKEND."""
+    if BACKEND not in BACKENDS:
+        raise ValueError(f"NYAYADRISHTI_BACKEND must be one of {sorted(BACKENDS)}, not {BACKEND!r}")
+    return BACKENDS[BACKEND]()
@@ -0,0 +1,213 @@
+"""
+Background alert scheduler for reminders and upcoming hearings.
+
+Due reminders and NextHearingDate events sit in a calendar queue (one bucket per
+day, a heap of the distinct days); each tick drains only the buckets that are
+due and writes the alerts to the inbox in notes.db, which the dashboards read.
+
+Runs inside the Streamlit process via start_scheduler(), or standalone:
+
+    python scheduler.py
+"""
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from profiling import timed
+from user_directory import ROLE_COLUMNS, role_names
+from utils import add_alerts, reminders_updated_since
+
+# Hearing alerts appear this many days before the hearing
+HEARING_ALERT_DAYS = 3
+TICK_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+class AlertScheduler:
+    def __init__(self, hearing_alert_days=HEARING_ALERT_DAYS):
+        self.hearing_alert_days = hearing_alert_days
+        self._days = []                      # heap of distinct due days
+        self._buckets = defaultdict(list)    # due day -> [(user, kind, cnr, event_day, message)]
+        self._pending = 0
+        self._reminder_dates = {}            # (user, cnr) -> current reminder date
+        self._reminders_seen = 0.0           # updated_at high-water mark
+        self._hearings_version = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------------------------------
+    # Queue
+    # -------------------------------
+    def schedule(self, due, user, kind, cnr, event_day, message):
+        """O(1) insert; a new day also pushes one entry onto the day heap."""
+        bucket = self._buckets.get(due)
+        if bucket is None:
+            bucket = self._buckets[due] = []
+            heapq.heappush(self._days, due)
+        bucket.append((user, kind, cnr, event_day, message))
+        self._pending += 1
+
+    def pending(self):
+        return self._pending
+
+    # -------------------------------
+    # Sources
+    # -------------------------------
+    def load_reminders(self):
+        """Queue reminders written since the last call (incremental via updated_at)."""
+        rows = reminders_updated_since(self._reminders_seen)
+        with self._lock:
+            for user, cnr, remind_on, updated_at in rows:
+                self._reminder_dates[(user, cnr)] = remind_on
+                self.schedule(date.fromisoformat(remind_on), user, "reminder", cnr, remind_on,
+                              f"Reminder for case {cnr}")
+                self._reminders_seen = max(self._reminders_seen, updated_at)
+        return len(rows)
+
+    def needs_hearings(self, dataset_version):
+        """True until the hearings of `dataset_version` have been queued."""
+        return dataset_version != self._hearings_version
+
+    @timed("scheduler.load_hearings")
+    def load_hearings(self, merged, dataset_version, today=None):
+        """
+        Queue an alert for every judge and advocate of each upcoming hearing; once per
+        dataset version, replacing the hearing alerts queued for the previous one.
+        """
+        if dataset_version == self._hearings_version:
+            return 0
+        cnr_col = next((c for c in ("cnr_number", "cnr_number_hear", "cnr_number_case") if c in merged.columns), None)
+        # Without next hearing dates the new version has no hearing alerts
+        events = pd.DataFrame(columns=["user", "cnr", "day"])
+        if cnr_col is not None and "nexthearingdate" in merged.columns:
+            today = today or date.today()
+            hearing_day = pd.to_datetime(merged["nexthearingdate"], errors="coerce")
+            upcoming = (hearing_day >= pd.Timestamp(today)).to_numpy()
+            per_role = []
+            for role in ROLE_COLUMNS:
+                names = role_names(merged, role)
+                names = names[upcoming[names["row"].to_numpy()]]
+                rows = names["row"].to_numpy()
+                per_role.append(pd.DataFrame({
+                    "user": names["name"].to_numpy(),
+                    "cnr": merged[cnr_col].to_numpy()[rows],
+                    "day": hearing_day.to_numpy()[rows],
+                }))
+            events = pd.concat(per_role, ignore_index=True).drop_duplicates()
+
+        lead = timedelta(days=self.hearing_alert_days)
+        with self._lock:
+            self._drop("hearing")
+            for user, cnr, day in events.itertuples(index=False):
+                day = pd.Timestamp(day).date()
+                self.schedule(day - lead, user, "hearing", cnr, day.isoformat(),
+                              f"Hearing for case {cnr} on {day:%d %b %Y}")
+            self._hearings_version = dataset_version
+        return len(events)
+
+    def _drop(self, kind):
+        """Remove every queued event of `kind` and rebuild the day heap; the caller holds the lock."""
+        for due, bucket in list(self._buckets.items()):
+            kept = [event for event in bucket if event[1] != kind]
+            self._pending -= len(bucket) - len(kept)
+            if kept:
+                self._buckets[due] = kept
+            else:
+                del self._buckets[due]
+        self._days = list(self._buckets)
+        heapq.heapify(self._days)
+
+    # -------------------------------
+    # Delivery
+    # -------------------------------
+    def run_due(self, today=None):
+        """Move every event due on or before today into the inbox; returns the number delivered."""
+        today = today or date.today()
+        alerts = []
+        with self._lock:
+            while self._days and self._days[0] <= today:
+                bucket = self._buckets.pop(heapq.heappop(self._days))
+                self._pending -= len(bucket)
+                for user, kind, cnr, event_day, message in bucket:
+                    if kind == "reminder" and self._reminder_dates.get((user, cnr)) != event_day:
+                        continue   # reminder was moved to another date since it was queued
+                    if kind == "hearing" and event_day < today.isoformat():
+                        continue   # hearing already passed
+                    alerts.append((user, kind, cnr, event_day, message))
+        if alerts:
+            add_alerts(alerts)
+        logger.debug("scheduler.tick delivered=%d pending=%d", len(alerts), self.pending())
+        return len(alerts)
+
+    @timed("scheduler.tick")
+    def tick(self):
+        self.load_reminders()
+        return self.run_due()
+
+    # -------------------------------
+    # Background thread
+    # -------------------------------
+    def start(self, interval=TICK_SECONDS):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), name="alert-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, interval, load=None):
+        """Tick every `interval` seconds; `load(scheduler)`, if given, runs first to (re)load sources."""
+        while not self._stop.is_set():
+            if load is not None:
+                try:
+                    load(self)
+                except Exception:
+                    logger.exception("scheduler.load failed")
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("scheduler.tick failed")
+            self._stop.wait(interval)
+
+
+@st.cache_resource(show_spinner=False)
+def _process_scheduler():
+    return AlertScheduler().start()
+
+
+def start_scheduler(merged=None, dataset_version=None):
+    """
+    Return the process-wide scheduler, starting its thread on first use.
+
+    Pass the merged frame to (re)load hearing events when the dataset version changes.
+    """
+    scheduler = _process_scheduler()
+    if merged is not None:
+        scheduler.load_hearings(merged, dataset_version)
+    return scheduler
+
+
+def load_current_hearings(scheduler):
+    """Queue the hearings of the current dataset version when it changes (standalone scheduler)."""
+    from preprocessing import dataset_version, prepared_data
+
+    version = dataset_version()
+    if scheduler.needs_hearings(version):
+        queued = scheduler.load_hearings(prepared_data(version)[2], version)
+        logger.info("scheduler.hearings version=%s events=%d", version, queued)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    # Hearings are reloaded on the first tick and whenever the CSVs change
+    AlertScheduler()._loop(TICK_SECONDS, load_current_hearings)
@@ -1,61 +1,132 @@
 import json
+import logging
+import sqlite3
+import time
 import uuid
-from pathlib import Path
 from typing import Optional
 
-SESSIONS_FILE = Path(__file__).parent / "sessions.json"
+from db import STATE_DIR, connect
 
-def _load_sessions() -> dict:
-    if SESSIONS_FILE.exists():
-        try:
-            with open(SESSIONS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+SESSIONS_DB = STATE_DIR / "sessions.db"
+# Legacy store, imported once into SESSIONS_DB
+SESSIONS_FILE = STATE_DIR / "sessions.json"
 
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+# How long a validated token is trusted without going back to the database
+VALIDATION_CACHE_SECONDS = 5.0
 
-def _save_sessions(sessions: dict) -> None:
-    try:
-        SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(SESSIONS_FILE, "w") as f:
-            json.dump(sessions, f, indent=2)
-        print(f"[SESSIONS] _save_sessions: saved {len(sessions)} tokens to {SESSIONS_FILE}")
-    except Exception as e:
-        print(f"[SESSIONS] _save_sessions: ERROR saving to {SESSIONS_FILE}: {e}")
+logger = logging.getLogger(__name__)
 
+# username -> (token, expires_at, cached_at)
+_validation_cache = {}
 
+
+# ----------------------------
+# Storage
+# ----------------------------
+def _init_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            username   TEXT PRIMARY KEY,
+            token      TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+    _migrate_json(conn)
+
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """Import tokens from the old sessions.json the first time the database is opened."""
+    with conn:
+        done = conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone()
+        if done:
+            return
+        imported = 0
+        if SESSIONS_FILE.exists():
+            try:
+                with open(SESSIONS_FILE, "r") as f:
+                    legacy = json.load(f)
+            except Exception:
+                legacy = {}
+            now = time.time()
+            rows = [(user.lower(), token, now, now + SESSION_TTL_SECONDS)
+                    for user, token in legacy.items() if token]
+            conn.executemany("INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?)", rows)
+            imported = len(rows)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_json', ?)", (str(time.time()),))
+    logger.info("sessions.migrate source=%s imported=%d", SESSIONS_FILE.name, imported)
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to SESSIONS_DB in WAL mode."""
+    return connect(SESSIONS_DB, _init_schema)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
 def create_token(username: str) -> str:
     """Create and store a session token for username, return token."""
-    sessions = _load_sessions()
+    user = username.lower()
     token = uuid.uuid4().hex
-    sessions[username.lower()] = token
-    _save_sessions(sessions)
-    print(f"[SESSIONS] create_token('{username}'): token created, sessions now: {list(sessions.keys())}")
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (username, token, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (user, token, now, now + SESSION_TTL_SECONDS),
+        )
+    _validation_cache[user] = (token, now + SESSION_TTL_SECONDS, now)
+    logger.debug("sessions.create user=%s", user)
     return token
 
 
+def _lookup(user: str):
+    """Return (token, expires_at) for user, served from the short-lived cache when fresh."""
+    now = time.time()
+    cached = _validation_cache.get(user)
+    if cached is not None and now - cached[2] < VALIDATION_CACHE_SECONDS:
+        return cached[0], cached[1]
+
+    row = _connect().execute(
+        "SELECT token, expires_at FROM sessions WHERE username = ?", (user,)
+    ).fetchone()
+    if row is None:
+        _validation_cache.pop(user, None)
+        return None, 0.0
+    _validation_cache[user] = (row[0], row[1], now)
+    return row
+
+
 def validate_token(username: str, token: Optional[str]) -> bool:
-    """Return True if stored token for username matches provided token."""
+    """Return True if stored token for username matches provided token and has not expired."""
     if not username or not token:
         return False
-    sessions = _load_sessions()
-    valid = sessions.get(username.lower()) == token
-    print(f"[SESSIONS] validate_token('{username}'): valid={valid}, has_token={username.lower() in sessions}")
+    user = username.lower()
+    stored, expires_at = _lookup(user)
+    valid = stored == token and expires_at > time.time()
+    logger.debug("sessions.validate user=%s valid=%s", user, valid)
     return valid
 
 
 def delete_token(username: str) -> None:
     """Delete stored token for username (logout)."""
-    sessions = _load_sessions()
-    was_present = username.lower() in sessions
-    sessions.pop(username.lower(), None)
-    _save_sessions(sessions)
-    print(f"[SESSIONS] delete_token('{username}'): was_present={was_present}, remaining_sessions={list(sessions.keys())}")
+    user = username.lower()
+    _validation_cache.pop(user, None)
+    conn = _connect()
+    with conn:
+        removed = conn.execute("DELETE FROM sessions WHERE username = ?", (user,)).rowcount
+    logger.debug("sessions.delete user=%s was_present=%s", user, bool(removed))
 
 
 def get_token(username: str) -> Optional[str]:
-    sessions = _load_sessions()
-    token = sessions.get(username.lower())
-    print(f"[SESSIONS] get_token('{username}'): token_present={token is not None}")
-    return token
\ No newline at end of file
+    user = username.lower()
+    token, expires_at = _lookup(user)
+    if token is None or expires_at <= time.time():
+        token = None
+    logger.debug("sessions.get user=%s token_present=%s", user, token is not None)
+    return token
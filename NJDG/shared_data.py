@@ -0,0 +1,170 @@
+"""
+Prepared frames published once as memory-mapped Arrow files for every worker process.
+
+When several Streamlit processes serve the app behind a proxy, each used to
+hold its own pandas copy of the prepared frames. Instead, the first process to
+need a dataset version builds the frames and writes them, uncompressed, to
+STATE_DIR/shared/<version>/; every process (the builder included) then maps the
+files read-only. Numeric and date columns become NumPy arrays over the mapped
+pages and string columns stay Arrow-backed, so attaching copies nothing and the
+page cache holds one copy of the data however many workers run.
+
+Only one process builds a version (an O_EXCL lock file); the others wait for
+its manifest, which is written last. Frames that cannot be written as Arrow
+are returned unshared.
+
+Environment:
+    NYAYADRISHTI_SHARED_DATA=0      keep the frames in process memory instead
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+from db import STATE_DIR
+from profiling import span
+
+ENABLED = os.environ.get("NYAYADRISHTI_SHARED_DATA", "1") != "0"
+SHARED_DIR = STATE_DIR / "shared"
+
+# Dataset versions kept on disk (matches the in-process caches' max_entries)
+KEEP_VERSIONS = 2
+# How long a worker waits for another one's build, and when a lock counts as abandoned
+WAIT_SECONDS = 300
+LOCK_STALE_SECONDS = 600
+
+logger = logging.getLogger(__name__)
+
+
+def version_dir(dataset_version):
+    return SHARED_DIR / hashlib.sha1(dataset_version.encode()).hexdigest()[:16]
+
+
+# -------------------------------
+# Write
+# -------------------------------
+def _to_table(frame):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    # Keep NaN as a value rather than a null so float columns map back without a copy
+    for i, name in enumerate(frame.columns):
+        if frame[name].dtype.kind == "f":
+            values = pa.array(frame[name].to_numpy(), from_pandas=False)
+            table = table.set_column(i, table.field(i), values)
+    return table
+
+
+def _write(directory, group, frames):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    files = {}
+    for name, frame in frames.items():
+        path = directory / f"{group}.{name}.arrow"
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        table = _to_table(frame)
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+        files[name] = path.name
+
+    manifest = directory / f"{group}.json"
+    tmp = manifest.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps({"files": files, "written_at": time.time()}))
+    os.replace(tmp, manifest)
+
+
+def _prune():
+    """Remove all but the KEEP_VERSIONS most recent version directories."""
+    versions = sorted((p for p in SHARED_DIR.iterdir() if p.is_dir()),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+    # Workers still mapping a removed file keep their pages until they let go of it
+    for stale in versions[KEEP_VERSIONS:]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+# -------------------------------
+# Attach
+# -------------------------------
+def attach(dataset_version, group):
+    """Map the published frames of `group`, or None if they have not been written yet."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    directory = version_dir(dataset_version)
+    manifest = directory / f"{group}.json"
+    if not manifest.exists():
+        return None
+    files = json.loads(manifest.read_text())["files"]
+    frames = {}
+    with span(f"shared_data.attach.{group}"):
+        for name, filename in files.items():
+            source = pa.memory_map(str(directory / filename), "r")
+            table = ipc.open_file(source).read_all()
+            frames[name] = table.to_pandas(split_blocks=True)
+    return frames
+
+
+def _acquire(lock):
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            stale = time.time() - lock.stat().st_mtime > LOCK_STALE_SECONDS
+        except FileNotFoundError:
+            stale = False
+        if stale:
+            lock.unlink(missing_ok=True)
+        return False
+
+
+def shared_frames(dataset_version, group, build):
+    """
+    Frames of `group` for `dataset_version`, mapped from SHARED_DIR.
+
+    `build()` returns {name: DataFrame}; it runs in one process per version and
+    group, while the others wait for the result. Falls back to the built frames
+    when sharing is disabled or the files cannot be written.
+    """
+    if not ENABLED:
+        return build()
+
+    frames = attach(dataset_version, group)
+    if frames is not None:
+        return frames
+
+    directory = version_dir(dataset_version)
+    directory.mkdir(parents=True, exist_ok=True)
+    lock = directory / f"{group}.lock"
+    deadline = time.monotonic() + WAIT_SECONDS
+    while not _acquire(lock):
+        time.sleep(0.2)
+        frames = attach(dataset_version, group)
+        if frames is not None:
+            return frames
+        if time.monotonic() > deadline:
+            logger.warning("shared_data.wait timed out group=%s; building locally", group)
+            return build()
+
+    try:
+        frames = attach(dataset_version, group)
+        if frames is not None:
+            return frames
+        built = build()
+        try:
+            with span(f"shared_data.publish.{group}"):
+                _write(directory, group, built)
+        except Exception:
+            logger.exception("shared_data.publish failed group=%s; serving unshared frames", group)
+            return built
+        _prune()
+        logger.info("shared_data.publish group=%s version=%s", group, directory.name)
+        # Map what was written so this process holds no private copy either
+        return attach(dataset_version, group)
+    finally:
+        lock.unlink(missing_ok=True)
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from caches import cached
+from preprocessing import case_attributes
+from profiling import timed
+
+# -------------------------------
+# Grouping columns for time-to-disposal curves
+# -------------------------------
+GROUP_COLUMNS = {
+    "Case Type": "casetype",
+    "Bench": "courtname",
+    "Judge": "beforehonourablejudges",
+    "Filing Year": "filing_year",
+}
+
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+# -------------------------------
+# Durations with censoring
+# -------------------------------
+@timed("survival.case_durations")
+def case_durations(cases, hearings=None, as_of=None):
+    """
+    One row per case with its disposal duration, event flag and grouping attributes.
+
+    Cases without a decision_date are censored at `as_of` (defaults to the latest
+    date seen in the data) instead of being dropped, which is what biases the raw
+    per-year means towards fast disposals for recent filings.
+    """
+    frame = cases[["cnr_number", "date_filed", "decision_date", "filing_year"]].copy()
+    if "casetype" not in cases.columns and "case_type" in cases.columns:
+        frame["casetype"] = cases["case_type"]
+
+    if hearings is not None:
+        frame = case_attributes(frame, hearings, GROUP_COLUMNS.values())
+
+    if as_of is None:
+        as_of = pd.concat([frame["decision_date"], frame["date_filed"]]).max()
+
+    frame["event"] = frame["decision_date"].notna()
+    end = frame["decision_date"].fillna(as_of)
+    frame["duration"] = (end - frame["date_filed"]).dt.days + 1
+    frame = frame[frame["duration"].notna() & (frame["duration"] > 0)]
+    frame["duration"] = frame["duration"].astype(np.int64)
+    return frame.reset_index(drop=True)
+
+
+# -------------------------------
+# Kaplan-Meier for many groups at once
+# -------------------------------
+def kaplan_meier_groups(durations, events, codes, weights=None):
+    """
+    Kaplan-Meier estimate for every group in one vectorized pass.
+
+    Rows are sorted by (group, duration); each distinct (group, time) gets its
+    event and at-risk counts from cumulative sums, and the survival product is
+    taken as a group-relative cumulative sum of logs. Returns a dict of flat
+    arrays (group, time, survival) plus `offsets` so group g spans
+    offsets[g]:offsets[g + 1].
+
+    With `weights`, each row stands for that many cases and `events` holds
+    event counts, so rows already aggregated by (group, duration) give the
+    same estimate as the individual cases.
+    """
+    durations = np.asarray(durations, dtype=np.int64)
+    events = np.asarray(events).astype(np.int64)
+    codes = np.asarray(codes, dtype=np.int64)
+    weights = np.ones(len(durations), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+
+    order = np.lexsort((durations, codes))
+    g, t, e, w = codes[order], durations[order], events[order], weights[order]
+
+    # Boundaries of each distinct (group, time)
+    new_key = np.ones(len(t), dtype=bool)
+    new_key[1:] = (g[1:] != g[:-1]) | (t[1:] != t[:-1])
+    key_start = np.flatnonzero(new_key)
+
+    deaths = np.add.reduceat(e, key_start) if len(t) else np.empty(0, np.int64)
+    key_group = g[key_start]
+
+    # At risk at time t = group size minus cases strictly before t within the group
+    group_size = np.bincount(g, weights=w, minlength=n_groups).astype(np.int64)
+    before = np.concatenate([[0], np.cumsum(w)])
+    group_start = np.searchsorted(g, np.arange(n_groups))
+    at_risk = group_size[key_group] - (before[key_start] - before[group_start[key_group]])
+
+    hazard = deaths / at_risk
+    # A step where every case at risk ends drops the curve to exactly 0; keep
+    # its log out of the sum and count it separately
+    extinct = hazard >= 1.0
+    log_step = np.log(np.where(extinct, 1.0, 1.0 - hazard))
+    cum = np.cumsum(log_step)
+    cum_extinct = np.cumsum(extinct)
+
+    # Make the cumulative sums restart at each group
+    key_counts = np.bincount(key_group, minlength=n_groups)
+    key_offsets = np.concatenate([[0], np.cumsum(key_counts)])
+    before_group = np.concatenate([[0.0], cum])[key_offsets[:-1]]
+    extinct_before = np.concatenate([[0], cum_extinct])[key_offsets[:-1]]
+    survival = np.exp(cum - before_group[key_group])
+    survival[cum_extinct > extinct_before[key_group]] = 0.0
+
+    return {
+        "group": key_group,
+        "time": t[key_start],
+        "survival": survival,
+        "offsets": key_offsets,
+        "n": group_size,
+        "events": np.bincount(g, weights=e, minlength=n_groups).astype(np.int64),
+    }
+
+
+def survival_quantiles(curves, quantiles=QUANTILES):
+    """Time at which each group's survival first drops to 1 - q (NaN if never reached)."""
+    n_groups = len(curves["n"])
+    out = {}
+    for q in quantiles:
+        reached = curves["survival"] <= 1.0 - q + 1e-12
+        idx = np.where(reached, np.arange(len(reached)), len(reached))
+        first = np.full(n_groups, len(reached), dtype=np.int64)
+        np.minimum.at(first, curves["group"], idx)
+        values = np.full(n_groups, np.nan)
+        hit = first < len(reached)
+        values[hit] = curves["time"][first[hit]]
+        out[q] = values
+    return out
+
+
+# -------------------------------
+# Cached per-grouping curves
+# -------------------------------
+@timed("survival.survival_by")
+@cached("aggregate", copy=True)
+def survival_by(_durations, column, dataset_version, selection=None):
+    """
+    Curves and quantile summary for every group of `column`.
+
+    Cached on (column, dataset version, partition selection), the selection
+    `_durations` holds the cases of, so switching tabs or groupings after the
+    first render is a lookup.
+    """
+    frame = _durations[_durations[column].notna()]
+    return survival_tables(frame[column], frame["duration"].to_numpy(), frame["event"].to_numpy())
+
+
+def survival_tables(values, durations, events, weights=None):
+    """(summary, curves) frames for the groups in `values`; see kaplan_meier_groups for `weights`."""
+    labels, uniques = pd.factorize(values, sort=True)
+    curves = kaplan_meier_groups(durations, events, labels, weights)
+    quantiles = survival_quantiles(curves)
+
+    summary = pd.DataFrame({
+        "group": uniques.astype(str),
+        "cases": curves["n"],
+        "disposed": curves["events"],
+        "p25_days": quantiles[0.25],
+        "median_days": quantiles[0.5],
+        "p75_days": quantiles[0.75],
+        "p90_days": quantiles[0.9],
+    })
+    curve_frame = pd.DataFrame({
+        "group": uniques.astype(str)[curves["group"]],
+        "days": curves["time"],
+        "survival": curves["survival"],
+    })
+    return summary, curve_frame
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import pytest
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="session")
+def version():
+    """Dataset version of the sample CSVs in data/, prepared once; tests using it skip without them."""
+    from preprocessing import DATA_FILES, prepared_data, source_version
+
+    if not all((DATA_DIR / name).exists() for name in DATA_FILES):
+        pytest.skip("sample CSVs not in data/")
+    version = source_version()
+    prepared_data(version)
+    return version
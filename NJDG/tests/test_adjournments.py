@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from adjournments import adjournment_rates, case_adjournments, combined_rate, next_hearing_gaps, rate_table
+from preprocessing import clean_hearings
+
+NAN = np.nan
+
+
+def _hearings():
+    """
+    Three cases, out of order as read; clean_hearings groups them by case, oldest first:
+    A on 1, 10 and 31 Jan (benches X & Y, X & Y, Y), B heard once, C once dated and once not.
+    """
+    return clean_hearings(pd.DataFrame({
+        "cnr_number": ["A", "B", "A", "C", "A", "C"],
+        "businessondate": ["2020-01-10", "2020-02-01", "2020-01-01", None, "2020-01-31", "2021-03-01"],
+        "beforehonourablejudges": ["X & Y", "X", "X & Y", "Z", "Y", "Z"],
+        "beforehonourablejudgeone": ["X", "NA", "Y", "NA", "NA", "NA"],
+        "purposeofhearing": ["ORDERS", "ADMISSION", "ADMISSION", "ORDERS", "ORDERS", None],
+    }))
+
+
+def test_hearings_sorted_by_case_then_date():
+    hearings = _hearings()
+    assert hearings["cnr_number"].tolist() == ["A", "A", "A", "B", "C", "C"]
+    assert hearings["businessondate"].tolist()[:3] == ["2020-01-01", "2020-01-10", "2020-01-31"]
+    # The undated hearing sorts last within its case
+    assert pd.isna(hearings["business_on_date"].iloc[5])
+
+
+def test_next_hearing_gaps():
+    adjourned, gaps = next_hearing_gaps(_hearings())
+    assert adjourned.tolist() == [True, True, False, False, True, False]
+    # A case's last hearing, a one-hearing case and a next hearing without a date have no gap
+    np.testing.assert_array_equal(gaps, [9, 21, NAN, NAN, NAN, NAN])
+
+
+def test_next_hearing_gaps_without_dates():
+    adjourned, gaps = next_hearing_gaps(pd.DataFrame({"cnr_number": ["A", "A", "B"]}))
+    assert adjourned.tolist() == [True, False, False]
+    assert np.isnan(gaps).all()
+
+
+def test_case_adjournments():
+    per_case = case_adjournments(_hearings())
+    assert per_case["cnr_number"].tolist() == ["A", "B", "C"]
+    assert per_case["adjournments"].tolist() == [2, 0, 1]
+    np.testing.assert_array_equal(per_case["longest_gap_days"], [21, NAN, NAN])
+
+
+def test_rate_table_skips_missing_values():
+    rates = rate_table(np.array(["P", None, "P"], dtype=object), np.array([True, True, False]),
+                       np.array([4.0, 8.0, NAN]))
+    assert rates["value"].tolist() == ["P"]
+    assert rates[["hearings", "adjourned", "dated_gaps"]].iloc[0].tolist() == [2, 1, 1]
+    assert rates["mean_gap_days"].iloc[0] == 4
+
+
+def test_judge_rates_count_a_division_bench_once_per_judge():
+    rates = adjournment_rates(_hearings(), "Judge", "test-adjournments").set_index("value")
+    # X sits on A's first two hearings (named twice on the second) and on B's
+    assert rates.index.tolist() == ["X", "Y", "Z"]
+    assert rates["hearings"].tolist() == [3, 3, 2]
+    assert rates["adjourned"].tolist() == [2, 2, 1]
+    assert rates.loc["X", "adjournment_rate"] == 2 / 3
+    assert rates.loc["X", "mean_gap_days"] == 15 and rates.loc["X", "longest_gap_days"] == 21
+    assert rates.loc["Z", "dated_gaps"] == 0 and np.isnan(rates.loc["Z", "mean_gap_days"])
+
+
+def test_purpose_rates():
+    rates = adjournment_rates(_hearings(), "Purpose of Hearing", "test-adjournments").set_index("value")
+    assert rates["hearings"].to_dict() == {"ADMISSION": 2, "ORDERS": 3}
+    assert rates["adjourned"].to_dict() == {"ADMISSION": 1, "ORDERS": 1}
+
+
+def test_combined_rate_over_spellings():
+    rates = adjournment_rates(_hearings(), "Judge", "test-adjournments")
+    combined = combined_rate(rates, ["X", "Z", "NOT LISTED"])
+    assert combined["hearings"] == 5 and combined["adjourned"] == 3
+    assert combined["adjournment_rate"] == 0.6
+    # Z has no dated gaps, so the mean is X's
+    assert combined["mean_gap_days"] == 15 and combined["dated_gaps"] == 2
+    assert combined["longest_gap_days"] == 21
+    assert combined_rate(rates, ["NOBODY"]) is None
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+import caches
+from caches import cached, retire
+
+
+def test_failed_build_releases_its_lock():
+    calls = []
+
+    @cached("aggregate")
+    def flaky(dataset_version):
+        calls.append(dataset_version)
+        if len(calls) == 1:
+            raise RuntimeError("source unavailable")
+        return len(calls)
+
+    with pytest.raises(RuntimeError):
+        flaky("failed-build")
+    assert not [key for key in caches._building if key[0] == flaky.__qualname__]
+    assert flaky("failed-build") == 2
+    assert flaky("failed-build") == 2
+
+
+
+def test_build_keeps_a_later_callers_lock():
+    later = threading.Lock()
+
+    @cached("aggregate")
+    def slow(dataset_version):
+        # As if this build's lock had been popped and another caller had registered its own
+        key = next(key for key in caches._building if key[0] == slow.__qualname__)
+        caches._building[key] = later
+        return 1
+
+    assert slow("later-lock") == 1
+    keys = [key for key, lock in caches._building.items() if lock is later]
+    assert keys
+    caches._building.pop(keys[0])
+
+def test_cached_functions_need_a_version():
+    with pytest.raises(TypeError):
+        @cached("aggregate")
+        def unversioned(column):
+            return column
+
+
+def test_retire_drops_other_versions():
+    @cached("aggregate")
+    def counted(dataset_version, column):
+        return object()
+
+    old, kept = counted("retire-old", "a"), counted("retire-new", "a")
+    retire("retire-new")
+    assert counted("retire-new", "a") is kept
+    assert counted("retire-old", "a") is not old
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+
+import exports
+from exports import ExportQueue, frame_batches, write_batches
+
+
+def _chunked_frame():
+    """A frame whose string columns have several Arrow chunks, as one concatenated from partitions has."""
+    names = pa.chunked_array([["A.G.NAGARAJA", None, "B.A.PATIL"], ["X Y Z"], ["P Q", "R"]])
+    return pd.DataFrame({
+        "name": pd.Series(pd.arrays.ArrowStringArray(names)),
+        "stage": pd.Series(pd.arrays.ArrowExtensionArray(pa.chunked_array([["ADMISSION"] * 3, ["ORDERS"] * 3]))),
+        "hearings": range(6),
+    })
+
+
+def test_frame_batches_multi_chunk_strings():
+    frame = _chunked_frame()
+    assert frame["name"].array._pa_array.num_chunks == 3
+
+    # One chunk of every row keeps the column's Arrow chunks
+    table = pa.Table.from_batches(frame_batches(frame))
+    assert table.column("name").to_pylist() == ["A.G.NAGARAJA", None, "B.A.PATIL", "X Y Z", "P Q", "R"]
+    assert [b.num_rows for b in frame_batches(frame, chunk_rows=4)] == [4, 2]
+
+
+def test_frame_batches_rows_and_columns():
+    batches = list(frame_batches(_chunked_frame(), rows=[5, 0, 3], columns=["hearings", "name"]))
+    assert pa.Table.from_batches(batches).to_pydict() == {"hearings": [5, 0, 3], "name": ["R", "A.G.NAGARAJA", "X Y Z"]}
+
+
+def test_frame_batches_empty_selection_keeps_schema():
+    batches = list(frame_batches(_chunked_frame(), rows=[]))
+    assert [b.num_rows for b in batches] == [0]
+    assert batches[0].schema.names == ["name", "stage", "hearings"]
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "Parquet"])
+def test_write_batches_multi_chunk_strings(tmp_path, fmt):
+    path = tmp_path / f"out.{fmt.lower()}"
+    assert write_batches(frame_batches(_chunked_frame()), path, fmt) == 6
+
+    table = (pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+             if fmt == "CSV" else pq.read_table(path))
+    assert table.column("name").to_pylist() == ["A.G.NAGARAJA", None, "B.A.PATIL", "X Y Z", "P Q", "R"]
+    assert not path.with_name(path.name + ".part").exists()
+
+
+def test_prune_keeps_partial_files_and_tolerates_vanished_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", tmp_path)
+    old = time.time() - 2 * exports.KEEP_SECONDS
+    for name in ("old.csv", "old.csv.part", "new.csv"):
+        (tmp_path / name).write_text("x")
+    for name in ("old.csv", "old.csv.part"):
+        os.utime(tmp_path / name, (old, old))
+    # A file another process deletes between the listing and the stat
+    listing = type(tmp_path).iterdir
+    monkeypatch.setattr(type(tmp_path), "iterdir", lambda self: [*listing(self), self / "gone.csv"])
+
+    ExportQueue(workers=1).prune()
+    assert sorted(p.name for p in listing(tmp_path)) == ["new.csv", "old.csv.part"]
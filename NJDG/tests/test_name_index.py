@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import auth
+from name_index import NameIndex, gram_codes, match_key
+
+
+@pytest.fixture
+def index():
+    return NameIndex(pd.DataFrame({
+        "name": ["A.G.NAGARAJA", "A G NAGARAJA", "A.G. NAGARAJAN", "PATIL", "B PATIL", "C PATIL", "AB", "..."],
+        "role": ["Judge", "Judge", "Advocate", "Advocate", "Advocate", "Advocate", "Advocate", "Advocate"],
+        "hearings": [10, 3, 5, 1, 2, 9, 4, 6],
+    }))
+
+
+def _grams(keys):
+    owners, codes = gram_codes(keys)
+    text = [bytes([(c >> 16) & 255, (c >> 8) & 255, c & 255]).decode() for c in codes]
+    return owners.tolist(), text
+
+
+def test_gram_codes_stay_inside_each_key():
+    owners, grams = _grams(["AB", "CD"])
+    assert owners == [0, 0, 1, 1]
+    # " AB " and " CD ": nothing spanning "B  C"
+    assert sorted(grams[:2]) == [" AB", "AB "] and sorted(grams[2:]) == [" CD", "CD "]
+
+
+def test_gram_codes_distinct_and_sorted():
+    owners, codes = gram_codes(["AAAA", "", "X"])
+    assert owners.tolist() == [0, 0, 0, 2]
+    assert np.all(np.diff(codes[owners == 0]) > 0)
+    assert gram_codes([])[0].size == 0 and gram_codes([""])[0].size == 0
+
+
+def test_match_key():
+    assert match_key(" a.g.  Nagaraja ") == "A G NAGARAJA"
+    assert match_key("...") == ""
+
+
+def test_resolve_spellings_to_one_identity(index):
+    typed, spaced = index.resolve("A.G.NAGARAJA"), index.resolve("a g  nagaraja")
+    assert typed == spaced
+    assert typed["name"] == "A.G.NAGARAJA" and typed["key"] == "A G NAGARAJA"
+    assert typed["variants"] == ("A.G.NAGARAJA", "A G NAGARAJA")
+    assert typed["hearings"] == 13
+    assert index.resolve("A.G. NAGARAJAN")["key"] == "A G NAGARAJAN"
+
+
+def test_resolve_filters_by_role(index):
+    assert index.resolve("a g nagaraja", "Judge")["name"] == "A.G.NAGARAJA"
+    assert index.resolve("a g nagaraja", "Advocate") is None
+    assert index.resolve("b patil", "Registrar") is None
+    assert [r["name"] for r in index.search("A G NAGARAJ", "Advocate")] == ["A.G. NAGARAJAN"]
+
+
+@pytest.mark.parametrize("query", ["", "...", "a", "ab", "A.B"])
+def test_short_or_empty_queries_find_nothing(index, query):
+    assert index.search(query) == []
+
+
+@pytest.mark.parametrize("query", ["", "...", "a"])
+def test_resolve_needs_a_known_key(index, query):
+    assert index.resolve(query) is None
+
+
+def test_empty_keys_are_not_identities(index):
+    assert "" not in index.keys
+    # A.G.NAGARAJA / A G NAGARAJA, A.G. NAGARAJAN, the three PATILs and AB
+    assert len(index) == 6
+
+
+def test_search_ranks_by_score_then_hearings(index):
+    results = index.search("patil")
+    # The exact key first, then equal scores by hearings
+    assert [r["name"] for r in results] == ["PATIL", "C PATIL", "B PATIL"]
+    assert results[0]["score"] == 1.0 and results[1]["score"] == results[2]["score"] < 1.0
+    assert len(index.search("patil", limit=2)) == 2
+
+
+def test_account_key_prefers_an_existing_password(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_FILE", tmp_path / "passwords.json")
+    monkeypatch.setattr(auth, "_password_cache", {"stamp": None, "passwords": {}})
+
+    # No password yet: the identity's match key
+    assert auth.account_key("A G NAGARAJA", ("A.G.NAGARAJA",)) == "a g nagaraja"
+    # A password set under a spelling typed before names were resolved keeps its account
+    auth._save_passwords({"a.g.nagaraja": auth._hash_password("secret")})
+    assert auth.account_key("A G NAGARAJA", ("A G NAGARAJA", "A.G.NAGARAJA")) == "a.g.nagaraja"
+    # The match key wins once it has a password of its own
+    auth._save_passwords({"a.g.nagaraja": "x", "a g nagaraja": "y"})
+    assert auth.account_key("A G NAGARAJA", ("A.G.NAGARAJA",)) == "a g nagaraja"
@@ -0,0 +1,246 @@
+"""
+Parity of the shared pipeline (preprocessing.prepared_data) with the loading
+paths it replaced, on the sample CSVs in data/.
+
+The old paths are kept below as they were:
+- the pages' own read / clean / merge sequence
+- the anomaly page's column-guessing clean
+- the rule predictor copy in model.py
+- the judge dashboard's pd.merge
+
+Each one is run on the raw CSVs, and the result is compared value by value
+with what the pages now get from the pipeline. Values must be equal; dtypes
+may differ, because the pipeline casts to preprocessing.CASE_SCHEMA /
+HEARING_SCHEMA.
+
+The old paths kept only the first hearing of each case, while the pipeline
+keeps every hearing. Hearing-level results are therefore compared on the
+first hearing of each case. The latest-hearing and adjournment columns, the
+adjournment rates by judge and the hearings per judge of benches.py are
+checked against a pandas groupby.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+CHECKS = [
+    "cases",
+    "hearings (first per case)",
+    "merged (first per case)",
+    "judge merge (first per case)",
+    "rule predictor",
+    "hearings (all)",
+    "latest hearing per case",
+    "adjournments per case",
+    "adjournment rates by judge",
+    "hearings per judge",
+    "anomaly features",
+    "anomaly scores",
+]
+
+
+# -------------------------------
+# The replaced paths
+# -------------------------------
+def legacy_read():
+    cases = pd.read_csv(DATA_DIR / "ISDMHack_Cases_students.csv")
+    hearings = pd.read_csv(DATA_DIR / "ISDMHack_Hear_students.csv")
+    return cases, hearings
+
+
+def legacy_clean_cases(cases):
+    cases.columns = [c.strip().lower().replace(' ', '_') for c in cases.columns]
+    for col in ['date_filed', 'decision_date', 'registration_date']:
+        if col in cases.columns:
+            cases[col] = pd.to_datetime(cases[col], errors='coerce')
+    if 'date_filed' in cases.columns and 'decision_date' in cases.columns:
+        cases['disposal_days'] = (cases['decision_date'] - cases['date_filed']).dt.days + 1
+    if 'date_filed' in cases.columns:
+        cases['filing_year'] = cases['date_filed'].dt.year
+    if 'total_hearings' not in cases.columns:
+        cases['total_hearings'] = 0
+    if 'cnr_number' in cases.columns:
+        cases = cases.drop_duplicates(subset='cnr_number')
+        cases['cnr_number'] = cases['cnr_number'].astype(str)
+    return cases
+
+
+def legacy_clean_hearings(hearings):
+    hearings.columns = [c.strip().lower().replace(' ', '_') for c in hearings.columns]
+    hearings = hearings.copy()
+    if 'businessondate' in hearings.columns:
+        hearings['business_on_date'] = pd.to_datetime(hearings['businessondate'], errors='coerce')
+    if 'cnr_number' in hearings.columns:
+        hearings = hearings.drop_duplicates(subset='cnr_number')
+        hearings.loc[:, 'cnr_number'] = hearings['cnr_number'].astype(str)
+    return hearings
+
+
+def legacy_merge(cases, hearings, chunk_size=100000):
+    chunks = [hearings.iloc[start:start + chunk_size].merge(cases, on='cnr_number', how='left')
+              for start in range(0, len(hearings), chunk_size)]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def legacy_judge_merge(cases, hearings):
+    merged = pd.merge(cases, hearings, left_on='combined_case_number', right_on='combinedcasenumber',
+                      how='left', suffixes=('_case', '_hear'))
+    merged['judge'] = merged.get('beforehonourablejudges', merged.get('njdg_judge_name', 'unknown'))
+    return merged
+
+
+def legacy_rule_predict(cases, hearing_weight, year_weight, baseline):
+    return (cases["total_hearings"] * hearing_weight +
+            (cases["filing_year"] - cases["filing_year"].min()) * year_weight +
+            baseline)
+
+
+def legacy_anomaly_clean(cases):
+    """The anomaly page's clean: guessed date columns, Case_Duration, median-filled numbers."""
+    possible_date_filed = ["Date_filed", "Filing_Date", "Filed_Date", "date_filed"]
+    possible_decision_date = ["Decision_date", "Disposed_Date", "DecisionDate", "decision_date"]
+    date_filed_col = next((c for c in possible_date_filed if c in cases.columns), None)
+    decision_date_col = next((c for c in possible_decision_date if c in cases.columns), None)
+    if date_filed_col:
+        cases[date_filed_col] = pd.to_datetime(cases[date_filed_col], errors="coerce")
+    if decision_date_col:
+        cases[decision_date_col] = pd.to_datetime(cases[decision_date_col], errors="coerce")
+    if date_filed_col and decision_date_col:
+        cases["Case_Duration"] = (cases[decision_date_col] - cases[date_filed_col]).dt.days
+    else:
+        cases["Case_Duration"] = np.nan
+    duration = cases["Case_Duration"]
+    cases["Case_Duration"] = duration.fillna(0 if duration.dropna().empty else duration.median())
+    for col in cases.select_dtypes(include=[np.number]).columns:
+        median_val = cases[col].median()
+        cases[col] = cases[col].fillna(0 if np.isnan(median_val) else median_val)
+    return cases
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+def differences(old, new):
+    """Columns whose values differ (missing values must line up; dtypes are ignored)."""
+    if list(old.columns) != list(new.columns):
+        return [f"columns: {list(old.columns)} != {list(new.columns)}"]
+    if len(old) != len(new):
+        return [f"rows: {len(old)} != {len(new)}"]
+    bad = []
+    for col in old.columns:
+        a, b = old[col].reset_index(drop=True), new[col].reset_index(drop=True)
+        missing = a.isna().to_numpy()
+        if not np.array_equal(missing, b.isna().to_numpy()):
+            bad.append(f"{col}: missing values differ")
+            continue
+        a, b = a[~missing], b[~missing]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            same = np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float))
+        elif pd.api.types.is_datetime64_any_dtype(a) and pd.api.types.is_datetime64_any_dtype(b):
+            same = np.array_equal(a.to_numpy("datetime64[ns]"), b.to_numpy("datetime64[ns]"))
+        else:
+            same = np.array_equal(a.astype(str).to_numpy(), b.astype(str).to_numpy())
+        if not same:
+            bad.append(f"{col}: values differ")
+    return bad
+
+
+def first_per_case(frame, key):
+    """First row of each run of equal `key` values (each case's oldest hearing)."""
+    keys = frame[key].to_numpy()
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    return frame[first]
+
+
+@pytest.fixture(scope="module")
+def checks(version):
+    """Check name -> (old result, pipeline result) on the sample CSVs."""
+    from adjournments import adjournment_rates
+    from anomaly import detect_anomalies, prepare_cases
+    from benches import BENCH_COLUMNS, bench_names, bench_table
+    from predictor import rule_predict
+    from preprocessing import merge_case_hearings, prepared_data
+    from queries import PandasBackend
+
+    old_cases, old_hearings = legacy_read()
+    old_cases, old_hearings = legacy_clean_cases(old_cases), legacy_clean_hearings(old_hearings)
+    cases, hearings, merged = prepared_data(version)
+
+    weights = (20, 10, 100)
+    old_merged = legacy_merge(old_cases, old_hearings)
+    old_judge = legacy_judge_merge(old_cases, old_hearings)
+    checks = {
+        "cases": (old_cases, cases[old_cases.columns]),
+        "hearings (first per case)": (old_hearings, first_per_case(hearings, "cnr_number")),
+        "merged (first per case)": (old_merged, first_per_case(merged, "cnr_number")[old_merged.columns]),
+        "judge merge (first per case)": (
+            old_judge, first_per_case(merge_case_hearings(cases, hearings), "case_number")[old_judge.columns]),
+        "rule predictor": (legacy_rule_predict(old_cases, *weights).to_frame("predicted"),
+                           rule_predict(cases, *weights).to_frame("predicted")),
+    }
+
+    # Every hearing is kept, and each case's latest one is read into the cases
+    raw_hearings = legacy_read()[1]
+    raw_hearings.columns = [c.lower() for c in raw_hearings.columns]
+    raw_hearings["last_hearing_date"] = pd.to_datetime(raw_hearings["businessondate"], errors="coerce")
+    # nth(-1) rather than last(), which would skip a latest hearing without a stage
+    latest = (raw_hearings.sort_values("last_hearing_date", kind="stable")
+              .groupby("cnr_number", sort=False).nth(-1).set_index("cnr_number")["remappedstages"])
+    last_date = raw_hearings.groupby("cnr_number")["last_hearing_date"].max()
+    expected = pd.DataFrame({"last_hearing_date": old_cases["cnr_number"].map(last_date),
+                             "current_stage": old_cases["cnr_number"].map(latest)})
+    checks["hearings (all)"] = (raw_hearings[["hearing_id"]].sort_values("hearing_id", ignore_index=True),
+                                hearings[["hearing_id"]].sort_values("hearing_id", ignore_index=True))
+    checks["latest hearing per case"] = (expected, cases[["last_hearing_date", "current_stage"]])
+
+    # Adjournments: every hearing but a case's last, with the days to the next one
+    by_date = raw_hearings.drop_duplicates("hearing_id").sort_values(["cnr_number", "last_hearing_date"],
+                                                                     kind="stable")
+    by_case = by_date.groupby("cnr_number")
+    gap = by_case["last_hearing_date"].shift(-1) - by_date["last_hearing_date"]
+    by_date["gap"], by_date["adjourned"] = gap.dt.days, by_case.cumcount(ascending=False) > 0
+    per_case = pd.DataFrame({"adjournments": by_case.size() - 1,
+                             "longest_gap_days": by_date.groupby("cnr_number")["gap"].max()})
+    expected = per_case.reindex(old_cases["cnr_number"]).fillna({"adjournments": 0}).reset_index(drop=True)
+    checks["adjournments per case"] = (expected, cases[["adjournments", "longest_gap_days"]])
+    # Every judge named in any bench column of a hearing counts it once
+    named = (by_date.reset_index(drop=True)[[c for c in BENCH_COLUMNS if c in by_date.columns]]
+             .stack().map(bench_names).explode().dropna().rename("Judge").reset_index())
+    named = named.drop_duplicates(["level_0", "Judge"])
+
+    judges = named.join(by_date.reset_index(drop=True)[["adjourned", "gap"]], on="level_0").groupby("Judge")
+    expected = pd.DataFrame({"hearings": judges.size(), "adjourned": judges["adjourned"].sum(),
+                             "mean_gap_days": judges["gap"].mean(), "longest_gap_days": judges["gap"].max()})
+    rates = adjournment_rates(hearings, "Judge", version).set_index("value")
+    checks["adjournment rates by judge"] = (expected.sort_index(),
+                                            rates.loc[expected.index, expected.columns].sort_index())
+    expected = named["Judge"].value_counts().rename("Hearings").sort_index()
+    per_judge = bench_table(hearings, version)["per_judge"].set_index("Judge")["Hearings"]
+    checks["hearings per judge"] = (expected.to_frame(), per_judge.sort_index().to_frame())
+
+    # The page guessed only lower-case date names, which the raw CSV headers are not
+    raw_cases, _ = legacy_read()
+    raw_cases.columns = [c.lower() for c in raw_cases.columns]
+    old_features = legacy_anomaly_clean(raw_cases)[["total_hearings", "disposaltime_adj", "Case_Duration"]]
+    new_input = prepare_cases(cases)
+    checks["anomaly features"] = (old_features, new_input[old_features.columns])
+    old_scores = detect_anomalies(old_features.copy())
+    new_scores = PandasBackend().anomaly_frame(version)
+    checks["anomaly scores"] = (old_scores[["Anomaly_Flag", "Anomaly_Score"]],
+                                new_scores[["Anomaly_Flag", "Anomaly_Score"]])
+    return checks
+
+
+@pytest.mark.parametrize("name", CHECKS)
+def test_pipeline_matches_replaced_path(checks, name):
+    old, new = checks[name]
+    assert differences(old, new) == []
+
+
+def test_every_check_runs(checks):
+    assert sorted(checks) == sorted(CHECKS)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing import CASE_SCHEMA, HEARING_SCHEMA, apply_schema
+
+
+def test_apply_schema_text_keeps_missing_values():
+    frame = pd.DataFrame({
+        "beforehonourablejudgetwo": pd.Series(["B.A.PATIL", np.nan, None], dtype=object),
+        "courthallnumber": ["7", "", None],
+    })
+    frame = apply_schema(frame, HEARING_SCHEMA)
+
+    judges = frame["beforehonourablejudgetwo"]
+    assert judges.iloc[0] == "B.A.PATIL"
+    assert judges.isna().tolist() == [False, True, True]
+    assert not (judges == "nan").any()
+    assert frame["courthallnumber"].isna().tolist() == [False, True, True]
+
+
+def test_apply_schema_text_from_numbers():
+    frame = apply_schema(pd.DataFrame({"cnr_number": [1, np.nan], "total_hearings": ["3", None]}), CASE_SCHEMA)
+    assert frame["cnr_number"].iloc[0] == "1"
+    assert frame["cnr_number"].isna().tolist() == [False, True]
+    assert frame["total_hearings"].tolist() == [3, 0]
+
+
+def test_apply_schema_text_keeps_fractions():
+    frame = apply_schema(pd.DataFrame({"casetype": [1.5, 2.0, np.nan], "courtname": [np.inf, 1.0, 2.0]}),
+                         HEARING_SCHEMA)
+    # Only columns of whole numbers lose the ".0"
+    assert frame["casetype"].tolist()[:2] == ["1.5", "2.0"]
+    assert frame["courtname"].tolist() == ["inf", "1.0", "2.0"]
+    assert frame["casetype"].isna().tolist() == [False, False, True]
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from adjournments import DIMENSIONS
+from preprocessing import merge_data
+from survival import GROUP_COLUMNS
+
+NO_PARTITION = [(("Nowhere",), None, None), (None, ("Nowhere",), None), (None, None, ("1900",))]
+
+
+def test_merge_data_without_hearings():
+    cases = pd.DataFrame({"cnr_number": ["KAHC01"], "total_hearings": [3]})
+    hearings = pd.DataFrame({"cnr_number": pd.Series(dtype=str), "courtname": pd.Series(dtype=str)})
+    merged = merge_data(cases, hearings)
+    assert merged.empty
+    assert list(merged.columns) == ["cnr_number", "courtname", "total_hearings"]
+
+
+@pytest.fixture(scope="module")
+def backends():
+    from queries import DuckDBBackend, PandasBackend
+
+    return PandasBackend(), DuckDBBackend()
+
+
+@pytest.mark.parametrize("selection", NO_PARTITION)
+def test_selection_without_partitions(version, backends, selection):
+    pandas_db, duckdb_db = backends
+    for db in backends:
+        assert db.case_metrics(version, *selection) == {"cases": 0, "older_than_1yr": 0}
+        assert db.backlog_forecast(version, *selection) is None
+        for column in GROUP_COLUMNS.values():
+            summary, curves = db.survival(version, column, *selection)
+            assert summary.empty and curves.empty
+        assert sum(batch.num_rows for batch in db.table_batches(version, "hearings", *selection)) == 0
+
+    for method in ("stage_counts", "judge_workload", "disposal_histogram"):
+        pd.testing.assert_frame_equal(getattr(pandas_db, method)(version, *selection).reset_index(drop=True),
+                                      getattr(duckdb_db, method)(version, *selection).reset_index(drop=True),
+                                      check_dtype=False)
+    for dimension in DIMENSIONS:
+        rates = [db.adjournment_rates(version, dimension, *selection) for db in backends]
+        assert [r.empty for r in rates] == [True, True]
+        assert list(rates[0].columns) == list(rates[1].columns)
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pandas as pd
+
+from scheduler import AlertScheduler
+
+TODAY = date(2024, 1, 1)
+
+
+def _merged(days):
+    """One hearing per day in `days`, each before judge J with advocates P and R."""
+    return pd.DataFrame({
+        "cnr_number": [f"C{i}" for i in range(len(days))],
+        "nexthearingdate": days,
+        "beforehonourablejudges": ["J"] * len(days),
+        "petitioneradvocate": ["P"] * len(days),
+        "respondentadvocate": ["R"] * len(days),
+    })
+
+
+def _queued(scheduler):
+    return sorted((due, event[1], event[2]) for due, bucket in scheduler._buckets.items() for event in bucket)
+
+
+def test_hearings_load_once_per_version():
+    scheduler = AlertScheduler(hearing_alert_days=3)
+    # The past hearing raises no alert
+    assert scheduler.load_hearings(_merged(["2024-01-10", "2023-12-01"]), "v1", TODAY) == 3
+    assert scheduler.load_hearings(_merged(["2024-01-20"]), "v1", TODAY) == 0
+    assert not scheduler.needs_hearings("v1") and scheduler.needs_hearings("v2")
+    assert _queued(scheduler) == [(date(2024, 1, 7), "hearing", "C0")] * 3
+
+
+def test_new_version_replaces_queued_hearings():
+    scheduler = AlertScheduler(hearing_alert_days=3)
+    scheduler.schedule(date(2024, 1, 7), "P", "reminder", "C9", "2024-01-07", "Reminder for case C9")
+    scheduler.load_hearings(_merged(["2024-01-10", "2024-02-10"]), "v1", TODAY)
+    assert scheduler.pending() == 7
+
+    assert scheduler.load_hearings(_merged(["2024-03-10"]), "v2", TODAY) == 3
+    # Reminders stay; only v2's hearings are queued
+    assert _queued(scheduler) == [(date(2024, 1, 7), "reminder", "C9")] + [(date(2024, 3, 7), "hearing", "C0")] * 3
+    assert scheduler.pending() == 4
+    assert sorted(scheduler._days) == [date(2024, 1, 7), date(2024, 3, 7)]
+
+    # A version without next hearing dates drops them all
+    assert scheduler.load_hearings(_merged(["2024-03-10"]).drop(columns="nexthearingdate"), "v3", TODAY) == 0
+    assert _queued(scheduler) == [(date(2024, 1, 7), "reminder", "C9")]
@@ -0,0 +1,56 @@
+import numpy as np
+
+from survival import kaplan_meier_groups
+
+# Group 0: events at 2, 3, 5, 7 and one case censored at 3
+#   t=2: 5 at risk, 1 event -> 4/5         = 0.8
+#   t=3: 4 at risk, 1 event -> 0.8 * 3/4   = 0.6
+#   t=5: 2 at risk, 1 event -> 0.6 * 1/2   = 0.3
+#   t=7: 1 at risk, 1 event -> 0
+# Group 1: censored at 1 and 6, two events at 4
+#   t=1: 4 at risk, 0 events -> 1
+#   t=4: 3 at risk, 2 events -> 1/3
+#   t=6: 1 at risk, 0 events -> 1/3
+DURATIONS = [6, 3, 2, 4, 7, 3, 1, 5, 4]
+EVENTS = [0, 1, 1, 1, 1, 0, 0, 1, 1]
+CODES = [1, 0, 0, 1, 0, 0, 1, 0, 1]
+
+
+def _check(curves):
+    np.testing.assert_array_equal(curves["offsets"], [0, 4, 7])
+    np.testing.assert_array_equal(curves["group"], [0, 0, 0, 0, 1, 1, 1])
+    np.testing.assert_array_equal(curves["time"], [2, 3, 5, 7, 1, 4, 6])
+    np.testing.assert_allclose(curves["survival"], [0.8, 0.6, 0.3, 0, 1, 1 / 3, 1 / 3])
+    np.testing.assert_array_equal(curves["n"], [5, 4])
+    np.testing.assert_array_equal(curves["events"], [4, 2])
+
+
+def test_kaplan_meier_by_hand():
+    curves = kaplan_meier_groups(DURATIONS, EVENTS, CODES)
+    _check(curves)
+    # The last case ending takes the curve to exactly 0, not a float floor
+    assert curves["survival"][3] == 0.0
+
+
+def test_kaplan_meier_weighted_rows():
+    # The same cases aggregated by (group, duration, event)
+    curves = kaplan_meier_groups(
+        durations=[2, 3, 3, 5, 7, 1, 4, 6],
+        events=[1, 1, 0, 1, 1, 0, 2, 0],
+        codes=[0, 0, 0, 0, 0, 1, 1, 1],
+        weights=[1, 1, 1, 1, 1, 1, 2, 1],
+    )
+    _check(curves)
+
+
+def test_ended_group_does_not_zero_the_next():
+    # Group 0 ends at t=2; group 1 starts again from 1
+    curves = kaplan_meier_groups([2, 2, 1, 3, 4], [1, 1, 1, 0, 1], [0, 0, 1, 1, 1])
+    np.testing.assert_allclose(curves["survival"], [0, 2 / 3, 2 / 3, 0])
+    assert curves["survival"][0] == curves["survival"][3] == 0.0
+
+
+def test_no_cases():
+    curves = kaplan_meier_groups([], [], [])
+    assert curves["survival"].size == 0
+    np.testing.assert_array_equal(curves["offsets"], [0])
@@ -0,0 +1,103 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from profiling import timed
+
+# -------------------------------
+# Roles and their source columns in the merged frame
+# -------------------------------
+ROLE_COLUMNS = {
+    "Judge": ["beforehonourablejudges"],
+    "Advocate": ["petitioneradvocate", "respondentadvocate"],
+}
+
+# Benches list several judges ("K.S.MUDAGAL , H.G.RAMESH"), advocates use "&" for associates
+_SEPARATORS = r"\s*[,&]\s*"
+_PLACEHOLDERS = {"", "NA", "NAN", "NONE", "UNKNOWN"}
+
+
+def normalize_name(name):
+    """Upper-case and collapse whitespace so 'Nagaraj  Patil ' and 'NAGARAJ PATIL' match."""
+    return re.sub(r"\s+", " ", str(name)).strip().upper()
+
+
+def _normalize_series(values):
+    return values.astype(str).str.replace(r"\s+", " ", regex=True).str.strip().str.upper()
+
+
+# -------------------------------
+# Directory build
+# -------------------------------
+def role_names(merged, role):
+    """
+    (name, row) pairs for every normalized name of `role` in `merged`.
+
+    Both the full field value and each name in a multi-name field are listed,
+    so a judge on a division bench is found under their own name.
+    """
+    parts = []
+    for col in ROLE_COLUMNS[role]:
+        if col not in merged.columns:
+            continue
+        full = _normalize_series(merged[col])
+        split = full.str.split(_SEPARATORS, regex=True).explode()
+        names = pd.concat([full, split.str.strip()])
+        positions = np.concatenate([np.arange(len(full)), split.index.to_numpy()])
+        parts.append(pd.DataFrame({"name": names.to_numpy(), "row": positions}))
+    if not parts:
+        return pd.DataFrame({"name": pd.Series(dtype=str), "row": pd.Series(dtype=np.int64)})
+
+    frame = pd.concat(parts, ignore_index=True)
+    return frame[~frame["name"].isin(_PLACEHOLDERS)].drop_duplicates()
+
+
+def build_directory(merged):
+    """
+    Map every normalized judge / advocate name to its roles, case counts and rows.
+
+    `rows` holds the sorted positional row numbers in `merged` for each role.
+    """
+    cnr = merged["cnr_number"].to_numpy() if "cnr_number" in merged.columns else None
+    directory = {}
+
+    for role in ROLE_COLUMNS:
+        frame = role_names(merged, role)
+        for name, rows in frame.groupby("name", sort=False)["row"]:
+            rows = np.sort(rows.to_numpy())
+            entry = directory.setdefault(name, {"name": name, "roles": {}})
+            entry["roles"][role] = {
+                "rows": rows,
+                "first_row": int(rows[0]),
+                "last_row": int(rows[-1]),
+                "hearings": int(len(rows)),
+                "cases": int(len(np.unique(cnr[rows]))) if cnr is not None else int(len(rows)),
+            }
+    return directory
+
+
+@timed("user_directory.load_directory")
+@cached("index", max_entries=2)
+def load_directory(_merged, dataset_version):
+    """Directory kept in memory for the process; rebuilt only when the dataset version changes."""
+    return build_directory(_merged)
+
+
+def role_rows(directory, names, role):
+    """Sorted rows of `role` for every spelling in `names` (a name_index identity's variants)."""
+    rows = [directory[name]["roles"][role]["rows"] for name in names
+            if name in directory and role in directory[name]["roles"]]
+    return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+
+def directory_frame(directory):
+    """Flat table of identities for display or export."""
+    rows = [
+        {"name": entry["name"], "role": role, "cases": info["cases"], "hearings": info["hearings"],
+         "first_row": info["first_row"], "last_row": info["last_row"]}
+        for entry in directory.values()
+        for role, info in entry["roles"].items()
+    ]
+    return pd.DataFrame(rows, columns=["name", "role", "cases", "hearings", "first_row", "last_row"])
@@ -1,42 +1,200 @@
 import json
 import os
+import sqlite3
+import time
 
-# File paths for storing notes and reminders
+from db import STATE_DIR, connect
+
+# Per-user notes and reminders
+NOTES_DB = STATE_DIR / "notes.db"
+
+# Legacy shared files (keyed only by CNR), migrated into NOTES_DB
 NOTES_FILE = "notes.json"
 REMINDERS_FILE = "reminders.json"
 
-# ----------------------------
-# Notes Functions
-# ----------------------------
-def load_notes():
-    """Load lawyer notes from JSON file."""
-    if os.path.exists(NOTES_FILE):
+
+def _load_json(path):
+    if os.path.exists(path):
         try:
-            with open(NOTES_FILE, "r") as f:
+            with open(path, "r") as f:
                 return json.load(f)
         except Exception:
             return {}
     return {}
 
-def save_notes(notes):
-    """Save lawyer notes to JSON file."""
-    with open(NOTES_FILE, "w") as f:
-        json.dump(notes, f)
+
+# ----------------------------
+# Storage
+# ----------------------------
+def _init_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS notes (
+            user       TEXT NOT NULL,
+            cnr        TEXT NOT NULL,
+            text       TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (user, cnr)
+        );
+        CREATE TABLE IF NOT EXISTS reminders (
+            user       TEXT NOT NULL,
+            cnr        TEXT NOT NULL,
+            remind_on  TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (user, cnr)
+        );
+        CREATE INDEX IF NOT EXISTS idx_reminders_user_date ON reminders (user, remind_on);
+        CREATE INDEX IF NOT EXISTS idx_reminders_updated ON reminders (updated_at);
+
+        -- Alert inbox filled by scheduler.py
+        CREATE TABLE IF NOT EXISTS alerts (
+            user       TEXT NOT NULL,
+            kind       TEXT NOT NULL,
+            cnr        TEXT NOT NULL,
+            due_on     TEXT NOT NULL,
+            message    TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            read       INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, kind, cnr, due_on)
+        );
+        CREATE INDEX IF NOT EXISTS idx_alerts_user_read ON alerts (user, read, due_on);
+
+        -- Shared entries from the old JSON files; each user claims the ones in their portfolio
+        CREATE TABLE IF NOT EXISTS legacy_notes (cnr TEXT PRIMARY KEY, text TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS legacy_reminders (cnr TEXT PRIMARY KEY, remind_on TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS legacy_claims (user TEXT PRIMARY KEY, claimed_at REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+    _import_legacy(conn)
+
+
+def _import_legacy(conn: sqlite3.Connection) -> None:
+    """Copy notes.json / reminders.json into the legacy tables once."""
+    with conn:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json'").fetchone():
+            return
+        notes = _load_json(NOTES_FILE)
+        reminders = _load_json(REMINDERS_FILE)
+        conn.executemany("INSERT OR REPLACE INTO legacy_notes VALUES (?, ?)",
+                         [(str(cnr), str(text)) for cnr, text in notes.items()])
+        conn.executemany("INSERT OR REPLACE INTO legacy_reminders VALUES (?, ?)",
+                         [(str(cnr), str(day)[:10]) for cnr, day in reminders.items()])
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported_json', ?)", (str(time.time()),))
+
+
+def _connect() -> sqlite3.Connection:
+    return connect(NOTES_DB, _init_schema)
+
+
+def claim_legacy(user, cnrs):
+    """
+    Give user a private copy of the old shared notes/reminders for their CNRs.
+
+    Runs once per user; rows the user already has are left untouched.
+    """
+    conn = _connect()
+    if conn.execute("SELECT 1 FROM legacy_claims WHERE user = ?", (user,)).fetchone():
+        return
+    now = time.time()
+    cnrs = [str(c) for c in cnrs]
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS claim_cnrs (cnr TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM claim_cnrs")
+        conn.executemany("INSERT OR IGNORE INTO claim_cnrs VALUES (?)", [(c,) for c in cnrs])
+        conn.execute("""
+            INSERT OR IGNORE INTO notes (user, cnr, text, updated_at)
+            SELECT ?, l.cnr, l.text, ? FROM legacy_notes l JOIN claim_cnrs c ON c.cnr = l.cnr
+        """, (user, now))
+        conn.execute("""
+            INSERT OR IGNORE INTO reminders (user, cnr, remind_on, updated_at)
+            SELECT ?, l.cnr, l.remind_on, ? FROM legacy_reminders l JOIN claim_cnrs c ON c.cnr = l.cnr
+        """, (user, now))
+        conn.execute("INSERT OR REPLACE INTO legacy_claims VALUES (?, ?)", (user, now))
+
+
+# ----------------------------
+# Notes Functions
+# ----------------------------
+def load_notes(user):
+    """Load this user's notes as {cnr: text}."""
+    rows = _connect().execute("SELECT cnr, text FROM notes WHERE user = ?", (user,))
+    return dict(rows.fetchall())
+
+
+def save_note(user, cnr, text):
+    """Insert or update a single note."""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO notes (user, cnr, text, updated_at) VALUES (?, ?, ?, ?)",
+            (user, str(cnr), text, time.time()),
+        )
+
 
 # ----------------------------
 # Reminders Functions
 # ----------------------------
-def load_reminders():
-    """Load lawyer reminders from JSON file."""
-    if os.path.exists(REMINDERS_FILE):
-        try:
-            with open(REMINDERS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+def load_reminders(user):
+    """Load this user's reminders as {cnr: 'YYYY-MM-DD'}."""
+    rows = _connect().execute(
+        "SELECT cnr, remind_on FROM reminders WHERE user = ? ORDER BY remind_on", (user,)
+    )
+    return dict(rows.fetchall())
+
+
+def save_reminder(user, cnr, remind_on):
+    """Insert or update a single reminder; remind_on is a date or ISO date string."""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO reminders (user, cnr, remind_on, updated_at) VALUES (?, ?, ?, ?)",
+            (user, str(cnr), str(remind_on)[:10], time.time()),
+        )
+
+
+def reminders_between(user, start=None, end=None):
+    """Reminders with start <= date <= end (either bound optional), ordered by date."""
+    query = "SELECT cnr, remind_on FROM reminders WHERE user = ?"
+    params = [user]
+    if start is not None:
+        query += " AND remind_on >= ?"
+        params.append(str(start)[:10])
+    if end is not None:
+        query += " AND remind_on <= ?"
+        params.append(str(end)[:10])
+    return _connect().execute(query + " ORDER BY remind_on", params).fetchall()
+
+
+def reminders_updated_since(updated_after):
+    """All users' reminders written after the given timestamp, for the alert scheduler."""
+    return _connect().execute(
+        "SELECT user, cnr, remind_on, updated_at FROM reminders WHERE updated_at > ? ORDER BY updated_at",
+        (updated_after,),
+    ).fetchall()
+
+
+# ----------------------------
+# Alert Inbox
+# ----------------------------
+def add_alerts(alerts):
+    """Insert (user, kind, cnr, due_on, message) rows; an alert already in the inbox is kept as is."""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO alerts (user, kind, cnr, due_on, message, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(*alert, now) for alert in alerts],
+        )
+
+
+def load_alerts(user, unread_only=True):
+    """This user's alerts as (kind, cnr, due_on, message) rows, soonest first."""
+    query = "SELECT kind, cnr, due_on, message FROM alerts WHERE user = ?"
+    if unread_only:
+        query += " AND read = 0"
+    return _connect().execute(query + " ORDER BY due_on", (user,)).fetchall()
+
 
-def save_reminders(reminders):
-    """Save lawyer reminders to JSON file."""
-    with open(REMINDERS_FILE, "w") as f:
-        json.dump(reminders, f)
\ No newline at end of file
+def mark_alerts_read(user):
+    conn = _connect()
+    with conn:
+        conn.execute("UPDATE alerts SET read = 1 WHERE user = ? AND read = 0", (user,))
@@ -0,0 +1,109 @@
+"""
+Read-only per-session views over the frames shared by all sessions.
+
+The base frames (preprocessing.prepared_data and judge_frame below) are built
+once per dataset version and never modified. A session keeps a row index array
+into them and materialises only the rows and columns it renders. Derived
+columns (parsed dates, upper-cased judge names) are computed once per version
+for every row and indexed with the same arrays, so nothing is assigned into a
+shared frame or a slice of one.
+"""
+import numpy as np
+import pandas as pd
+
+from caches import cached
+from preprocessing import prepared_data
+from shared_data import shared_frames
+from profiling import timed
+
+EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+# Columns of the judge frame the judge dashboard renders (plus `judge`)
+DASHBOARD_COLUMNS = ('case_number', 'current_status', 'current_stage', 'date_filed', 'decision_date',
+                     'nature_of_disposal', 'disposaltime_adj', 'appearancedate', 'purposeofhearing',
+                     'nexthearingdate', 'previoushearing', 'disposal_year', 'adjournments',
+                     'longest_gap_days')
+
+
+# -------------------------------
+# Row selection and materialisation
+# -------------------------------
+def column(frame, name, rows=None):
+    """Values of one column (a NumPy array, no copy of the frame), optionally at `rows`."""
+    values = frame[name].to_numpy()
+    return values if rows is None else values[rows]
+
+
+def view(frame, rows, columns=None, **derived):
+    """
+    Materialise `rows` (positional) of `frame`, limited to `columns`.
+
+    Keyword arguments add derived columns already aligned with `rows`; they are
+    set on the new, session-owned frame only.
+    """
+    if columns is None:
+        out = frame.take(rows)
+    else:
+        out = frame.iloc[rows, frame.columns.get_indexer(columns)]
+    for name, values in derived.items():
+        out[name] = values
+    return out
+
+
+def latest_per_case(frame, rows, key):
+    """
+    `rows` reduced to the last one of each case. Hearings are stored oldest first
+    and grouped by case, so that is each case's latest hearing among `rows`.
+    """
+    keys = column(frame, key, rows)
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = keys[1:] != keys[:-1]
+    return rows[last]
+
+
+# -------------------------------
+# Judge dashboard frame
+# -------------------------------
+@timed("views.judge_frame")
+@cached("clean", max_entries=2)
+def judge_frame(dataset_version):
+    """
+    Cases left-joined with hearings as the judge dashboard shows them, shared read-only.
+
+    Returns a dict with the merged `frame`, its (row, judge) `benches` (see
+    benches.bench_pairs; a judge on a division bench gets the bench's rows) and
+    the parsed `date_filed` / `nexthearingdate` arrays; None when no merge key
+    exists.
+    """
+    from benches import bench_pairs
+
+    frames = shared_frames(dataset_version, "judge", lambda: _judge_merge(dataset_version))
+    if not frames:
+        return None
+    merged = frames["frame"]
+    return {"frame": merged, "benches": bench_pairs(merged), **judge_dates(merged)}
+
+
+def judge_dates(merged):
+    """Parsed `date_filed` / `nexthearingdate` arrays for every row of a judge frame."""
+    n = len(merged)
+    return {
+        "date_filed": pd.to_datetime(merged['date_filed'], errors='coerce').to_numpy()
+        if 'date_filed' in merged.columns else np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]"),
+        "nexthearingdate": pd.to_datetime(merged['nexthearingdate'], errors='coerce').to_numpy()
+        if 'nexthearingdate' in merged.columns else None,
+    }
+
+
+def _judge_merge(dataset_version):
+    from preprocessing import merge_case_hearings
+
+    cases, hearings, _ = prepared_data(dataset_version)
+    merged = merge_case_hearings(cases, hearings)
+    return {} if merged is None else {"frame": merged}
+
+
+def age_days(filed, today=None):
+    """Whole days between each filing date and today (NaN where the date is missing)."""
+    today = np.datetime64(pd.Timestamp(today or pd.Timestamp.today()).normalize(), "ns")
+    return np.floor((today - filed) / np.timedelta64(1, "D"))
@@ -0,0 +1,140 @@
+"""
+Background warm-up of the dataset, indexes, aggregates and models.
+
+The first page run starts a process-wide thread that builds every cache the
+pages read for the current CSV version, as listed by the query backend
+(queries.py): with pandas, the prepared frames (memory-mapped and shared with
+other worker processes), the judge view and the user directory; with DuckDB,
+the partition store. Then, for both, the predictor error surface, Kaplan-Meier
+tables, the backlog forecast, hearing alerts and the default anomaly model.
+Only then is the version published (preprocessing.publish_version), so pages
+keep serving the previous version's caches while a changed CSV is rebuilt.
+Caches are keyed by version rather than a TTL (caches.py), so nothing expires
+underneath a request; the previous version's entries are dropped once the new
+one is published.
+
+Pages call wait_until_ready() before touching data; until the first build
+finishes they show a "warming" notice and poll instead of building in the
+request.
+"""
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from profiling import span
+
+# How often the thread checks the CSVs for changes
+POLL_SECONDS = 60
+# Stages of the default (pandas) backend; each backend lists its own (queries.Backend.warmup_stages)
+STAGES = ("prepare", "views", "directory", "alerts", "predictor", "forecast", "survival", "anomaly")
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self):
+        self.state = "cold"          # cold -> warming -> ready (or failed)
+        self.stage = None
+        self.version = None          # last published version
+        self.building = None         # version being built, if any
+        self.built_at = None
+        self.stage_seconds = {}
+        self.stages = STAGES
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.version is not None
+
+    # -------------------------------
+    # Build
+    # -------------------------------
+    def _stage(self, name, func):
+        self.stage = name
+        start = time.perf_counter()
+        with span(f"warmup.{name}"):
+            result = func()
+        self.stage_seconds[name] = time.perf_counter() - start
+        return result
+
+    def build(self, version):
+        """Fill every cache for `version`, publish it, then drop the other versions' entries."""
+        from caches import retire
+        from preprocessing import publish_version
+        from queries import backend
+
+        self.building = version
+        if not self.ready:
+            self.state = "warming"
+        self.stage_seconds = {}
+
+        stages = backend().warmup_stages(version)
+        self.stages = [name for name, _ in stages]
+        for name, func in stages:
+            self._stage(name, func)
+
+        publish_version(version)
+        retire(version)
+        self.version, self.building, self.stage = version, None, None
+        self.built_at = time.time()
+        self.state, self.error = "ready", None
+        logger.info("warmup.ready version=%s stages=%s", version,
+                    {k: round(v, 2) for k, v in self.stage_seconds.items()})
+
+    # -------------------------------
+    # Background thread
+    # -------------------------------
+    def start(self, interval=POLL_SECONDS):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, interval):
+        from preprocessing import source_version
+
+        while not self._stop.is_set():
+            version = source_version()
+            if version != self.version:
+                try:
+                    self.build(version)
+                except Exception as e:
+                    self.building, self.error = None, repr(e)
+                    if not self.ready:
+                        self.state = "failed"
+                    logger.exception("warmup.build failed version=%s", version)
+            self._stop.wait(interval)
+
+
+@st.cache_resource(show_spinner=False)
+def _process_warmup():
+    return Warmup().start()
+
+
+def start_warmup():
+    """Return the process-wide warm-up, starting its thread on first use."""
+    return _process_warmup()
+
+
+def wait_until_ready(poll_seconds=1.0):
+    """
+    Show a warming notice and rerun until the first build is published.
+
+    If the warm-up failed the page falls through and builds what it needs itself.
+    """
+    warmup = start_warmup()
+    if warmup.ready or warmup.state == "failed":
+        return warmup
+    st.info(f"Warming up the dataset ({warmup.stage or 'starting'})... this page will load automatically.")
+    st.progress(len(warmup.stage_seconds) / len(warmup.stages))
+    time.sleep(poll_seconds)
+    st.rerun()